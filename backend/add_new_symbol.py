@@ -257,6 +257,7 @@ def calculate_all_indicators_for_symbol(symbol, timeframe):
     import os
     sys.path.append(os.path.join(os.path.dirname(__file__), 'automation'))
     from indicator_runner import IndicatorRunner
+    from automation.candle_ref import CandleRef
     from sqlalchemy import text
     
     runner = IndicatorRunner()
@@ -279,43 +280,16 @@ def calculate_all_indicators_for_symbol(symbol, timeframe):
         print(f"   ✗ Error fetching candles: {e}")
         all_candles = []
     
+    comprehensive_count = 0
     if all_candles:
         print(f"   Processing {len(all_candles)} candles...")
         
-        comprehensive_count = 0
-        for i, candle_row in enumerate(all_candles):
-            # Progress indicator every 500 candles
-            if i > 0 and i % 500 == 0:
-                print(f"   Progress: {i}/{len(all_candles)} candles ({i*100//len(all_candles)}%)")
-            
-            # Convert row to candle dict (convert Decimal to float)
-            candle = {
-                'id': candle_row[0],
-                'symbol': candle_row[1],
-                'timeframe': candle_row[2],
-                'datetime': candle_row[3],
-                'open': float(candle_row[4]),
-                'high': float(candle_row[5]),
-                'low': float(candle_row[6]),
-                'close': float(candle_row[7]),
-                'volume': float(candle_row[8])
-            }
-            
-            # Get historical data for this candle
-            historical_df = runner.get_historical_candles(
-                symbol, timeframe, candle['datetime'], limit=250
-            )
-            
-            if len(historical_df) < 250:
-                continue
-            
-            # Calculate comprehensive indicators
-            indicators = runner.calculate_indicators_for_candle(candle, historical_df)
-            
-            if indicators:
-                # Update or insert indicators (handles both new and existing)
-                if runner.store_indicators(candle['id'], indicators):
-                    comprehensive_count += 1
+        candles = [CandleRef(*row[:4]) for row in all_candles]
+        
+        # One pass over the full history, loaded through COPY
+        indicators = runner.calculate_indicators_batch(symbol, timeframe, candles)
+        comprehensive_count = runner.store_indicators_bulk(indicators, bulk=True)
+        runner.clear_history_cache()
         
         print(f"   ✓ Calculated comprehensive indicators for {comprehensive_count} candles")
     else:
@@ -326,7 +300,7 @@ def calculate_all_indicators_for_symbol(symbol, timeframe):
         'macd': macd_stored,
         'ema': ema_stored,
         'bb': bb_stored,
-        'comprehensive': comprehensive_count if candles else 0
+        'comprehensive': comprehensive_count
     }
 def add_to_tracked_symbols(symbol, exchange='binance'):
     """
@@ -381,52 +355,24 @@ def add_to_tracked_symbols(symbol, exchange='binance'):
     except Exception as e:
         print(f"  ✗ Error adding to tracked_symbols: {e}")
         return False
-# ============================================
-# MAIN EXECUTION
-# ============================================
 
-if __name__ == "__main__":
-    """
-    Usage:
-        python backend/add_new_symbol.py SOL/USDT
-        python backend/add_new_symbol.py ADA/USDT
-        python backend/add_new_symbol.py MATIC/USDT
+# Define all timeframes to fetch (same as BTC/ETH)
+TIMEFRAMES = ['15m', '1h', '4h', '1d']  # ADD 4h timeframe
+DAYS = 180  # 6 months instead of 3
+
+def run(symbol: str) -> int:
     """
+    Fetch, store and calculate everything for a new symbol
     
-    # Parse command line arguments
-    if len(sys.argv) < 2:
-        print("=" * 80)
-        print("ADD NEW SYMBOL - Universal Crypto Data Fetcher")
-        print("=" * 80)
-        print("\n📚 Usage:")
-        print("  python backend/add_new_symbol.py SYMBOL")
-        print("\n💡 Examples:")
-        print("  python backend/add_new_symbol.py SOL/USDT")
-        print("  python backend/add_new_symbol.py ADA/USDT")
-        print("  python backend/add_new_symbol.py MATIC/USDT")
-        print("\n🪙 Popular Binance Pairs:")
-        print("  SOL/USDT  - Solana")
-        print("  ADA/USDT  - Cardano")
-        print("  MATIC/USDT - Polygon")
-        print("  DOT/USDT  - Polkadot")
-        print("  LINK/USDT - Chainlink")
-        print("  AVAX/USDT - Avalanche")
-        print("  ATOM/USDT - Cosmos")
-        print("  XRP/USDT  - Ripple")
-        print("  DOGE/USDT - Dogecoin")
-        print("\n⏱️  Timeframes:")
-        print("  Automatically fetches: 15m, 1h, 1d")
-        print("\n📅 Historical Period:")
-        print("  90 days (3 months) for each timeframe")
-        print("=" * 80)
-        sys.exit(1)
-    
-    symbol = sys.argv[1]
+    Entrypoint shared by the CLI and SmartLoader (which calls it
+    in-process instead of starting a new interpreter).
     
-    # Define all timeframes to fetch (same as BTC/ETH)
-    TIMEFRAMES = ['15m', '1h', '4h', '1d']  # ADD 4h timeframe
-    DAYS = 180  # 6 months instead of 3
+    Args:
+        symbol: Trading pair (e.g., 'SOL/USDT')
     
+    Returns:
+        Exit code (0 on success)
+    """
     print("=" * 80)
     print(f"ADDING NEW SYMBOL: {symbol}")
     print("=" * 80)
@@ -522,4 +468,48 @@ if __name__ == "__main__":
     print(f"      GROUP BY symbol, timeframe;")
     print(f"\n   2. Add '{symbol}' to your dashboard configuration")
     print(f"   3. Ready to generate signals and track entries!")
-    print("\n" + "=" * 80)
\ No newline at end of file
+    print("\n" + "=" * 80)
+    
+    return 0
+
+# ============================================
+# MAIN EXECUTION
+# ============================================
+
+if __name__ == "__main__":
+    """
+    Usage:
+        python backend/add_new_symbol.py SOL/USDT
+        python backend/add_new_symbol.py ADA/USDT
+        python backend/add_new_symbol.py MATIC/USDT
+    """
+    
+    # Parse command line arguments
+    if len(sys.argv) < 2:
+        print("=" * 80)
+        print("ADD NEW SYMBOL - Universal Crypto Data Fetcher")
+        print("=" * 80)
+        print("\n📚 Usage:")
+        print("  python backend/add_new_symbol.py SYMBOL")
+        print("\n💡 Examples:")
+        print("  python backend/add_new_symbol.py SOL/USDT")
+        print("  python backend/add_new_symbol.py ADA/USDT")
+        print("  python backend/add_new_symbol.py MATIC/USDT")
+        print("\n🪙 Popular Binance Pairs:")
+        print("  SOL/USDT  - Solana")
+        print("  ADA/USDT  - Cardano")
+        print("  MATIC/USDT - Polygon")
+        print("  DOT/USDT  - Polkadot")
+        print("  LINK/USDT - Chainlink")
+        print("  AVAX/USDT - Avalanche")
+        print("  ATOM/USDT - Cosmos")
+        print("  XRP/USDT  - Ripple")
+        print("  DOGE/USDT - Dogecoin")
+        print("\n⏱️  Timeframes:")
+        print("  Automatically fetches: 15m, 1h, 1d")
+        print("\n📅 Historical Period:")
+        print("  90 days (3 months) for each timeframe")
+        print("=" * 80)
+        sys.exit(1)
+    
+    sys.exit(run(sys.argv[1]))
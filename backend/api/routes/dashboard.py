@@ -177,13 +177,13 @@ async def get_dashboard_table(db: Session = Depends(get_db)):
     if not active_symbols_rows:
         return {'rows': [], 'count': 0}
     
-    # Initialize price fetcher
+    # Shared price fetcher (reuses its HTTPS connection pool)
     import sys
     import os
     sys.path.append(os.path.join(os.path.dirname(__file__), '../../automation'))
-    from price_fetcher import PriceFetcher
+    from price_fetcher import get_price_fetcher
     
-    price_fetcher = PriceFetcher()
+    price_fetcher = get_price_fetcher()
     
     # OPTIMIZATION: Fetch ALL live prices at once (not in loop!)
     all_symbols = [row[0] for row in active_symbols_rows]
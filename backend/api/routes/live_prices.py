@@ -12,7 +12,7 @@ import os
 
 # Add automation directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../automation'))
-from price_fetcher import PriceFetcher
+from price_fetcher import get_price_fetcher
 
 from database import get_db
 
@@ -21,8 +21,8 @@ router = APIRouter(
     tags=["live-prices"]
 )
 
-# Initialize price fetcher (singleton)
-price_fetcher = PriceFetcher()
+# Shared price fetcher (singleton)
+price_fetcher = get_price_fetcher()
 
 
 @router.get("/")
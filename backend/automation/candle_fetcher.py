@@ -5,9 +5,11 @@ Automatically fetch new candles from exchanges and store in database
 
 import sys
 import os
+import asyncio
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import text
-from typing import Optional, List, Dict
+from typing import Optional, List, Tuple
+import pandas as pd
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -58,26 +60,26 @@ class CandleFetcher:
             return None
     
     def insert_candles(self, symbol: str, timeframe: str, 
-                      candles: List[Dict]) -> int:
+                      candles: pd.DataFrame) -> int:
         """
         Insert candles into database (skip duplicates)
         
         Args:
             symbol: Trading pair
             timeframe: Candle timeframe
-            candles: List of candle dicts from exchange adapter
+            candles: Candle DataFrame from exchange adapter
         
         Returns:
             Number of candles inserted
         """
-        if not candles:
+        if candles.empty:
             return 0
         
         inserted_count = 0
         
         try:
             with self.engine.connect() as conn:
-                for candle in candles:
+                for candle in candles.itertuples(index=False):
                     # Check if candle already exists
                     check_query = text("""
                         SELECT id FROM candles
@@ -89,7 +91,7 @@ class CandleFetcher:
                     existing = conn.execute(check_query, {
                         'symbol': symbol,
                         'timeframe': timeframe,
-                        'datetime': candle['datetime']
+                        'datetime': candle.datetime.to_pydatetime()
                     }).fetchone()
                     
                     if existing:
@@ -106,19 +108,16 @@ class CandleFetcher:
                         )
                     """)
 
-                    # Convert datetime to Unix timestamp in milliseconds
-                    timestamp_ms = int(candle['datetime'].timestamp() * 1000)
-
                     conn.execute(insert_query, {
                         'symbol': symbol,
                         'timeframe': timeframe,
-                        'timestamp': timestamp_ms,
-                        'datetime': candle['datetime'],
-                        'open': candle['open'],
-                        'high': candle['high'],
-                        'low': candle['low'],
-                        'close': candle['close'],
-                        'volume': candle['volume']
+                        'timestamp': int(candle.timestamp),
+                        'datetime': candle.datetime.to_pydatetime(),
+                        'open': float(candle.open),
+                        'high': float(candle.high),
+                        'low': float(candle.low),
+                        'close': float(candle.close),
+                        'volume': float(candle.volume)
                     })
                     
                     inserted_count += 1
@@ -153,34 +152,12 @@ class CandleFetcher:
                 print(f"  ✗ Unknown exchange: {exchange_name}")
                 return 0
             
-            # Get last candle datetime from database
-            last_datetime = self.get_last_candle_datetime(symbol, timeframe)
-            
-            if last_datetime:
-                # Fetch candles after last datetime
-                since = last_datetime + timedelta(minutes=1)
-                print(f"  → Fetching {symbol} {timeframe} since {since.strftime('%Y-%m-%d %H:%M')}")
-            else:
-                # No candles in database, fetch recent candles
-                since = None
-                print(f"  → Fetching last {limit} candles for {symbol} {timeframe}")
+            since = self.get_fetch_since(symbol, timeframe, limit)
             
             # Fetch candles from exchange
             candles = exchange.get_candles(symbol, timeframe, since=since, limit=limit)
             
-            if not candles:
-                print(f"  ⚠️  No new candles fetched")
-                return 0
-            
-            # Insert into database
-            inserted = self.insert_candles(symbol, timeframe, candles)
-            
-            if inserted > 0:
-                print(f"  ✓ Stored {inserted} new candles ({candles[0]['datetime']} to {candles[-1]['datetime']})")
-            else:
-                print(f"  ✓ All {len(candles)} candles already in database")
-            
-            return inserted
+            return self.store_fetched(symbol, timeframe, candles)
         
         except Exception as e:
             print(f"  ✗ Error in fetch_and_store: {e}")
@@ -188,6 +165,124 @@ class CandleFetcher:
             traceback.print_exc()
             return 0
     
+    def get_fetch_since(self, symbol: str, timeframe: str, limit: int) -> Optional[datetime]:
+        """
+        Get the datetime to fetch new candles from
+        
+        Returns:
+            Datetime just after the last stored candle, or None to fetch
+            the most recent `limit` candles
+        """
+        # Get last candle datetime from database
+        last_datetime = self.get_last_candle_datetime(symbol, timeframe)
+        
+        if last_datetime:
+            # Fetch candles after last datetime
+            since = last_datetime + timedelta(minutes=1)
+            print(f"  → Fetching {symbol} {timeframe} since {since.strftime('%Y-%m-%d %H:%M')}")
+            return since
+        
+        # No candles in database, fetch recent candles
+        print(f"  → Fetching last {limit} candles for {symbol} {timeframe}")
+        return None
+    
+    def store_fetched(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> int:
+        """
+        Insert fetched candles and report the result
+        
+        Returns:
+            Number of new candles stored
+        """
+        if candles.empty:
+            print(f"  ⚠️  No new candles fetched for {symbol} {timeframe}")
+            return 0
+        
+        # Insert into database
+        inserted = self.insert_candles(symbol, timeframe, candles)
+        
+        if inserted > 0:
+            print(f"  ✓ Stored {inserted} new {symbol} {timeframe} candles ({candles['datetime'].iloc[0]} to {candles['datetime'].iloc[-1]})")
+        else:
+            print(f"  ✓ All {len(candles)} {symbol} {timeframe} candles already in database")
+        
+        return inserted
+    
+    def fetch_and_store_many(self, tasks: List[Tuple[str, str, str]], limit: int = 100) -> int:
+        """
+        Fetch new candles for many pairs concurrently and store them
+        
+        Exchange requests for all pairs overlap on one event loop, so the
+        wall time is about one round-trip instead of one per pair. Results
+        are stored from this thread once every fetch has finished.
+        
+        Args:
+            tasks: List of (exchange_name, symbol, timeframe)
+            limit: Maximum candles to fetch per pair
+        
+        Returns:
+            Total number of new candles stored
+        """
+        known = []
+        for task in tasks:
+            if task[0] in self.exchanges:
+                known.append(task)
+            else:
+                print(f"  ✗ Unknown exchange: {task[0]}")
+        tasks = known
+        
+        if not tasks:
+            return 0
+        
+        results = asyncio.run(self._fetch_all(tasks, limit))
+        
+        total_inserted = 0
+        for (exchange_name, symbol, timeframe), candles in zip(tasks, results):
+            if isinstance(candles, Exception):
+                print(f"  ✗ Error fetching {symbol} {timeframe}: {candles}")
+                continue
+            
+            try:
+                total_inserted += self.store_fetched(symbol, timeframe, candles)
+            except Exception as e:
+                print(f"  ✗ Error storing {symbol} {timeframe}: {e}")
+        
+        return total_inserted
+    
+    async def _fetch_all(self, tasks: List[Tuple[str, str, str]], limit: int) -> list:
+        """
+        Fetch candles for all tasks on one event loop
+        
+        Adapters with get_candles_async() share one async client each;
+        others run their blocking get_candles() in a thread.
+        
+        Returns:
+            One DataFrame (or the raised exception) per task, in task order
+        """
+        clients = {}
+        coroutines = []
+        
+        try:
+            for exchange_name, symbol, timeframe in tasks:
+                exchange = self.exchanges[exchange_name]
+                since = self.get_fetch_since(symbol, timeframe, limit)
+                
+                if hasattr(exchange, 'get_candles_async'):
+                    if exchange_name not in clients:
+                        clients[exchange_name] = exchange.create_async_client()
+                    coroutines.append(exchange.get_candles_async(
+                        clients[exchange_name], symbol, timeframe, since=since, limit=limit
+                    ))
+                else:
+                    coroutines.append(asyncio.to_thread(
+                        exchange.get_candles, symbol, timeframe, since=since, limit=limit
+                    ))
+            
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+        
+        finally:
+            for client in clients.values():
+                await client.close()
+    
     def fetch_all_symbols_timeframes(self, exchange_name: str = 'binance'):
         """
         Fetch candles for all symbols and timeframes from exchange
@@ -0,0 +1,19 @@
+"""
+Candle Reference
+Lightweight row type for candles queued for indicators or signals, and
+the process start method shared by the indicator/signal process pools
+"""
+
+import multiprocessing
+from collections import namedtuple
+
+# Fixed-slot row (no per-row dict); picklable for process pool tasks
+CandleRef = namedtuple('CandleRef', 'id symbol timeframe datetime')
+
+# Process pool workers start from a forkserver (spawn where unavailable),
+# never as a fork of the caller: the indicator pool is created while the
+# signal pool's management threads are running, and forking a threaded
+# process can deadlock children on inherited locks
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
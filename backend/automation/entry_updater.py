@@ -11,15 +11,128 @@ Matches your existing entry_tracking table schema with:
 
 import sys
 import os
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
 from datetime import datetime
+from itertools import chain, groupby
+from operator import attrgetter
 from sqlalchemy import text
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterator, Set
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import engine
 
+logger = logging.getLogger(__name__)
+
+
+class ValidationStatus(IntEnum):
+    """In-memory validation_status; stored as text in entry_tracking"""
+    VALIDATING = 0
+    VALIDATED = 1
+    INVALID = 2
+    # Written by calculations/entry_tracker.py
+    VALID = 3
+    INVALIDATED = 4
+
+
+class ExitStatus(IntEnum):
+    """In-memory exit_status; stored as text in entry_tracking"""
+    ACTIVE = 0
+    EXIT1 = 1
+    EXIT2 = 2
+    EXIT3 = 3
+    EXITED = 4
+    # Written by calculations/entry_tracker.py
+    TRAILING_STOP = 5
+    STOP_LOSS = 6
+    RECOVERY = 7
+    SIGNAL_EXIT = 8
+
+
+# Translation tables, applied once on load and once on write
+VALIDATION_STATUS_TO_STR = {status: status.name for status in ValidationStatus}
+STR_TO_VALIDATION_STATUS = {name: status for status, name in VALIDATION_STATUS_TO_STR.items()}
+
+EXIT_STATUS_TO_STR = {
+    ExitStatus.ACTIVE: 'ACTIVE',
+    ExitStatus.EXIT1: 'EXIT-1',
+    ExitStatus.EXIT2: 'EXIT-2',
+    ExitStatus.EXIT3: 'EXIT-3',
+    ExitStatus.EXITED: 'EXITED',
+    ExitStatus.TRAILING_STOP: 'TRAILING-STOP',
+    ExitStatus.STOP_LOSS: 'STOP-LOSS',
+    ExitStatus.RECOVERY: 'RECOVERY',
+    ExitStatus.SIGNAL_EXIT: 'SIGNAL-EXIT',
+}
+STR_TO_EXIT_STATUS = {name: status for status, name in EXIT_STATUS_TO_STR.items()}
+
+
+@dataclass(slots=True)
+class Entry:
+    """
+    Active entry_tracking row
+    
+    Field order matches the column projection in get_active_entries,
+    so rows are built positionally with Entry.from_row(row).
+    """
+    id: int
+    signal_id: int
+    symbol: str
+    timeframe: str
+    entry_signal: str
+    entry_datetime: datetime
+    entry_price: Optional[float]
+    entry_score: Optional[float]
+    stop_loss: Optional[float]
+    target_price: Optional[float]
+    atr_at_entry: Optional[float]
+    validation_status: ValidationStatus
+    validation_datetime: Optional[datetime]
+    validation_candles_count: int
+    max_validation_candles: int
+    exit_status: ExitStatus
+    exit_datetime: Optional[datetime]
+    exit_price: Optional[float]
+    exit_reason: Optional[str]
+    peak_price: Optional[float]
+    peak_datetime: Optional[datetime]
+    current_price: Optional[float]
+    current_profit_pct: Optional[float]
+    max_profit_pct: Optional[float]
+    final_profit_pct: Optional[float]
+    exit_1_hit: bool
+    exit_1_datetime: Optional[datetime]
+    exit_1_price: Optional[float]
+    exit_2_hit: bool
+    exit_2_datetime: Optional[datetime]
+    exit_2_price: Optional[float]
+    exit_3_hit: bool
+    exit_3_datetime: Optional[datetime]
+    exit_3_price: Optional[float]
+    trailing_stop_price: Optional[float]
+    trailing_stop_active: bool
+    recovery_attempt: bool
+    recovery_low_price: Optional[float]
+    recovery_datetime: Optional[datetime]
+    active: bool
+    
+    @classmethod
+    def from_row(cls, row) -> 'Entry':
+        """
+        Build an Entry from a DB row, mapping status strings to enums
+        
+        Raises:
+            KeyError: validation_status or exit_status is NULL or unknown
+        """
+        entry = cls(*row)
+        entry.validation_status = STR_TO_VALIDATION_STATUS[entry.validation_status]
+        entry.exit_status = STR_TO_EXIT_STATUS[entry.exit_status]
+        return entry
+
 
 class EntryUpdater:
     """
@@ -73,27 +186,60 @@ class EntryUpdater:
         self.zone5_exit2_drop = 1.0
         self.zone5_exit3_drop = 1.0
         
+        # State transitions buffered per cycle, flushed as one log line
+        self.events = []
+        
         print("✓ Entry Updater initialized")
     
-    def classify_timeframe(self, timeframe: str) -> str:
-        """Classify timeframe as Intraday or Swing"""
+    def timeframe_minutes(self, timeframe: str) -> int:
+        """Convert a timeframe string to minutes"""
         if timeframe.endswith('m'):
-            minutes = int(timeframe[:-1])
+            return int(timeframe[:-1])
         elif timeframe.endswith('h'):
-            minutes = int(timeframe[:-1]) * 60
+            return int(timeframe[:-1]) * 60
         elif timeframe.endswith('d') or timeframe == 'D':
-            minutes = 1440
+            return 1440
         else:
-            minutes = 60
+            return 60
+    
+    def classify_timeframe(self, timeframe: str) -> str:
+        """Classify timeframe as Intraday or Swing"""
+        return 'Intraday' if self.timeframe_minutes(timeframe) <= 240 else 'Swing'
+    
+    def get_validation_thresholds(self, timeframe: str) -> Tuple[float, float]:
+        """
+        Get (validation_pct, invalidation_pct) for a timeframe
+        """
+        if self.classify_timeframe(timeframe) == 'Intraday':
+            return self.intraday_validation_pct, self.intraday_invalidation_pct
+        return self.swing_validation_pct, self.swing_invalidation_pct
+    
+    @contextmanager
+    def _connection(self, conn=None, savepoint: bool = False):
+        """
+        Yield the caller's connection, or a pooled one committed on exit
         
-        return 'Intraday' if minutes <= 240 else 'Swing'
+        Helpers take an optional conn so a whole run can share one
+        connection and transaction. Writes on a shared connection go
+        through a SAVEPOINT, so one failed statement does not abort the
+        rest of the run.
+        """
+        if conn is None:
+            with self.engine.connect() as own:
+                yield own
+                own.commit()
+        elif savepoint:
+            with conn.begin_nested():
+                yield conn
+        else:
+            yield conn
     
-    def get_new_entry_signals(self) -> List[Dict]:
+    def get_new_entry_signals(self, conn=None) -> List[Dict]:
         """
         Find new BUY/A-BUY/EARLY-BUY signals without entries
         """
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 query = text("""
                     SELECT 
                         s.id as signal_id,
@@ -137,21 +283,22 @@ class EntryUpdater:
                 
                 return signals
         
-        except Exception as e:
-            print(f"  ✗ Error finding new entry signals: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error finding new entry signals")
             return []
     
-    def create_entry(self, signal: Dict) -> bool:
+    def create_entry(self, signal: Dict, conn=None) -> Optional[int]:
         """
         Create a new entry from a signal
+        
+        Returns:
+            ID of the new entry, or None if the insert failed
         """
         try:
             # Get ATR for this candle
-            atr = self.get_atr_for_candle(signal['candle_id'])
+            atr = self.get_atr_for_candle(signal['candle_id'], conn)
             
-            with self.engine.connect() as conn:
+            with self._connection(conn, savepoint=True) as conn:
                 query = text("""
                     INSERT INTO entry_tracking (
                         signal_id, symbol, timeframe, entry_signal,
@@ -178,9 +325,10 @@ class EntryUpdater:
                         TRUE,
                         CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
                     )
+                    RETURNING id
                 """)
                 
-                conn.execute(query, {
+                entry_id = conn.execute(query, {
                     'signal_id': signal['signal_id'],
                     'symbol': signal['symbol'],
                     'timeframe': signal['timeframe'],
@@ -194,21 +342,18 @@ class EntryUpdater:
                     'max_validation_candles': self.validation_window_bars,
                     'peak_price': signal['current_price'],
                     'current_price': signal['current_price']
-                })
+                }).scalar()
                 
-                conn.commit()
-                return True
+                return entry_id
         
-        except Exception as e:
-            print(f"  ✗ Error creating entry: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        except Exception:
+            logger.exception("Error creating entry")
+            return None
     
-    def get_atr_for_candle(self, candle_id: int) -> Optional[float]:
+    def get_atr_for_candle(self, candle_id: int, conn=None) -> Optional[float]:
         """Get ATR value for a candle"""
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 query = text("""
                     SELECT i.atr
                     FROM candles c
@@ -225,91 +370,76 @@ class EntryUpdater:
         except Exception as e:
             return None
     
-    def get_active_entries(self) -> List[Dict]:
+    def iter_active_entries(self, batch_size: int = 1000, conn=None) -> Iterator[List[Entry]]:
         """
-        Get all active entries
+        Stream active entries in batches over a server-side cursor
+        
+        Numeric columns are cast to float in SQL so rows map straight
+        onto Entry without per-field coercion.
+        
+        Args:
+            batch_size: Rows fetched from the cursor per batch
+            conn: Optional shared connection (see process_all_entries)
+        
+        Yields:
+            Lists of at most batch_size entries, ordered by
+            (symbol, timeframe) so callers can group them
         """
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 query = text("""
                     SELECT 
                         id, signal_id, symbol, timeframe, entry_signal,
-                        entry_datetime, entry_price, entry_score,
-                        stop_loss, target_price, atr_at_entry,
+                        entry_datetime, entry_price::float, entry_score::float,
+                        stop_loss::float, target_price::float, atr_at_entry::float,
                         validation_status, validation_datetime, 
                         validation_candles_count, max_validation_candles,
-                        exit_status, exit_datetime, exit_price, exit_reason,
-                        peak_price, peak_datetime,
-                        current_price, current_profit_pct, max_profit_pct, final_profit_pct,
-                        exit_1_hit, exit_1_datetime, exit_1_price,
-                        exit_2_hit, exit_2_datetime, exit_2_price,
-                        exit_3_hit, exit_3_datetime, exit_3_price,
-                        trailing_stop_price, trailing_stop_active,
-                        recovery_attempt, recovery_low_price, recovery_datetime,
+                        exit_status, exit_datetime, exit_price::float, exit_reason,
+                        peak_price::float, peak_datetime,
+                        current_price::float, current_profit_pct::float,
+                        max_profit_pct::float, final_profit_pct::float,
+                        exit_1_hit, exit_1_datetime, exit_1_price::float,
+                        exit_2_hit, exit_2_datetime, exit_2_price::float,
+                        exit_3_hit, exit_3_datetime, exit_3_price::float,
+                        trailing_stop_price::float, trailing_stop_active,
+                        recovery_attempt, recovery_low_price::float, recovery_datetime,
                         active
                     FROM entry_tracking
                     WHERE active = TRUE
-                    ORDER BY entry_datetime DESC
+                    ORDER BY symbol, timeframe, entry_datetime DESC
                 """)
                 
-                result = conn.execute(query).fetchall()
-                
-                entries = []
-                for row in result:
-                    entries.append({
-                        'id': row[0],
-                        'signal_id': row[1],
-                        'symbol': row[2],
-                        'timeframe': row[3],
-                        'entry_signal': row[4],
-                        'entry_datetime': row[5],
-                        'entry_price': float(row[6]) if row[6] else None,
-                        'entry_score': float(row[7]) if row[7] else None,
-                        'stop_loss': float(row[8]) if row[8] else None,
-                        'target_price': float(row[9]) if row[9] else None,
-                        'atr_at_entry': float(row[10]) if row[10] else None,
-                        'validation_status': row[11],
-                        'validation_datetime': row[12],
-                        'validation_candles_count': row[13],
-                        'max_validation_candles': row[14],
-                        'exit_status': row[15],
-                        'exit_datetime': row[16],
-                        'exit_price': float(row[17]) if row[17] else None,
-                        'exit_reason': row[18],
-                        'peak_price': float(row[19]) if row[19] else None,
-                        'peak_datetime': row[20],
-                        'current_price': float(row[21]) if row[21] else None,
-                        'current_profit_pct': float(row[22]) if row[22] else None,
-                        'max_profit_pct': float(row[23]) if row[23] else None,
-                        'final_profit_pct': float(row[24]) if row[24] else None,
-                        'exit_1_hit': row[25],
-                        'exit_1_datetime': row[26],
-                        'exit_1_price': float(row[27]) if row[27] else None,
-                        'exit_2_hit': row[28],
-                        'exit_2_datetime': row[29],
-                        'exit_2_price': float(row[30]) if row[30] else None,
-                        'exit_3_hit': row[31],
-                        'exit_3_datetime': row[32],
-                        'exit_3_price': float(row[33]) if row[33] else None,
-                        'trailing_stop_price': float(row[34]) if row[34] else None,
-                        'trailing_stop_active': row[35],
-                        'recovery_attempt': row[36],
-                        'recovery_low_price': float(row[37]) if row[37] else None,
-                        'recovery_datetime': row[38],
-                        'active': row[39]
-                    })
+                result = conn.execute(query, execution_options={
+                    'stream_results': True, 'yield_per': batch_size
+                })
                 
-                return entries
+                for partition in result.partitions(batch_size):
+                    entries = []
+                    for row in partition:
+                        # One bad row is skipped, not the rest of the stream
+                        try:
+                            entries.append(Entry.from_row(row))
+                        except KeyError:
+                            logger.warning(
+                                "Entry #%d: unknown status %r / %r, skipped",
+                                row.id, row.validation_status, row.exit_status
+                            )
+                    yield entries
         
-        except Exception as e:
-            print(f"  ✗ Error getting active entries: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
-    def get_latest_candle_price(self, symbol: str, timeframe: str) -> Optional[float]:
+        except Exception:
+            logger.exception("Error getting active entries")
+    
+    def get_active_entries(self) -> List[Entry]:
+        """
+        Get all active entries
+        """
+        return [entry for batch in self.iter_active_entries() for entry in batch]
+    
+    def get_latest_candle_price(self, symbol: str, timeframe: str,
+                                conn=None) -> Optional[float]:
         """Get the latest candle close price"""
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 query = text("""
                     SELECT close
                     FROM candles
@@ -328,14 +458,15 @@ class EntryUpdater:
                     return float(result[0])
                 return None
         
-        except Exception as e:
-            print(f"  ✗ Error getting latest price: {e}")
+        except Exception:
+            logger.exception("Error getting latest price")
             return None
     
-    def get_latest_signal(self, symbol: str, timeframe: str) -> Optional[str]:
+    def get_latest_signal(self, symbol: str, timeframe: str,
+                          conn=None) -> Optional[str]:
         """Get the latest signal"""
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 query = text("""
                     SELECT signal
                     FROM signals
@@ -354,10 +485,59 @@ class EntryUpdater:
                     return result[0]
                 return None
         
-        except Exception as e:
-            print(f"  ✗ Error getting latest signal: {e}")
+        except Exception:
+            logger.exception("Error getting latest signal")
             return None
     
+    def prefetch_latest(self, conn=None) -> Tuple[Dict[Tuple[str, str], float],
+                                                 Dict[Tuple[str, str], str]]:
+        """
+        Latest close and signal for every (symbol, timeframe) with active
+        entries
+        
+        Two DISTINCT ON queries replace one get_latest_candle_price and
+        one get_latest_signal lookup per pair.
+        
+        Returns:
+            (prices, signals), each keyed by (symbol, timeframe)
+        """
+        try:
+            with self._connection(conn) as conn:
+                price_query = text("""
+                    SELECT DISTINCT ON (c.symbol, c.timeframe)
+                        c.symbol, c.timeframe, c.close::float
+                    FROM candles c
+                    JOIN (
+                        SELECT DISTINCT symbol, timeframe
+                        FROM entry_tracking
+                        WHERE active = TRUE
+                    ) e ON e.symbol = c.symbol AND e.timeframe = c.timeframe
+                    ORDER BY c.symbol, c.timeframe, c.datetime DESC
+                """)
+                
+                signal_query = text("""
+                    SELECT DISTINCT ON (s.symbol, s.timeframe)
+                        s.symbol, s.timeframe, s.signal
+                    FROM signals s
+                    JOIN (
+                        SELECT DISTINCT symbol, timeframe
+                        FROM entry_tracking
+                        WHERE active = TRUE
+                    ) e ON e.symbol = s.symbol AND e.timeframe = s.timeframe
+                    ORDER BY s.symbol, s.timeframe, s.datetime DESC
+                """)
+                
+                prices = {(symbol, timeframe): close
+                          for symbol, timeframe, close in conn.execute(price_query)}
+                signals = {(symbol, timeframe): signal
+                           for symbol, timeframe, signal in conn.execute(signal_query)}
+                
+                return prices, signals
+        
+        except Exception:
+            logger.exception("Error prefetching latest prices/signals")
+            return {}, {}
+    
     def calculate_exit_levels(self, entry_price: float, peak_price: float) -> Tuple[float, float, float]:
         """
         Calculate EXIT-1, EXIT-2, EXIT-3 levels based on profit zones
@@ -407,101 +587,107 @@ class EntryUpdater:
             exit3 = exit2 * (1 - self.zone5_exit3_drop / 100)
             return (exit1, exit2, exit3)
     
-    def process_validating_entry(self, entry: Dict, current_price: float, 
-                                 current_signal: str) -> Dict:
+    def process_validating_entry(self, entry: Entry, current_price: float, 
+                                 current_signal: str,
+                                 thresholds: Optional[Tuple[float, float]] = None) -> Entry:
         """
         Process an entry in VALIDATING state
         
+        Args:
+            thresholds: Precomputed (validation_pct, invalidation_pct) for the
+                entry's timeframe; resolved from the timeframe if omitted
+        
         Returns:
-            Updated entry dict
+            Updated entry
         """
-        entry_price = entry['entry_price']
-        peak_price = entry['peak_price']
-        validation_candles = entry['validation_candles_count']
-        tf_type = self.classify_timeframe(entry['timeframe'])
+        entry_price = entry.entry_price
+        peak_price = entry.peak_price
+        validation_candles = entry.validation_candles_count
         
         # Update peak
         if current_price > peak_price:
             peak_price = current_price
-            entry['peak_price'] = peak_price
-            entry['peak_datetime'] = datetime.now()
+            entry.peak_price = peak_price
+            entry.peak_datetime = datetime.now()
         
         # Calculate percentages
         current_pct = ((current_price - entry_price) / entry_price) * 100
         peak_pct = ((peak_price - entry_price) / entry_price) * 100
         
         # Track lowest for invalidation
-        if entry['recovery_low_price'] is None or current_price < entry['recovery_low_price']:
-            entry['recovery_low_price'] = current_price
+        if entry.recovery_low_price is None or current_price < entry.recovery_low_price:
+            entry.recovery_low_price = current_price
         
-        lowest_pct = ((entry['recovery_low_price'] - entry_price) / entry_price) * 100
+        lowest_pct = ((entry.recovery_low_price - entry_price) / entry_price) * 100
         
         # Get thresholds
-        validation_pct = self.intraday_validation_pct if tf_type == 'Intraday' else self.swing_validation_pct
-        invalidation_pct = self.intraday_invalidation_pct if tf_type == 'Intraday' else self.swing_invalidation_pct
+        if thresholds is None:
+            thresholds = self.get_validation_thresholds(entry.timeframe)
+        validation_pct, invalidation_pct = thresholds
         
         # Check VALIDATION (reached +1%)
         if peak_pct >= validation_pct:
-            entry['validation_status'] = 'VALIDATED'
-            entry['validation_datetime'] = datetime.now()
-            entry['exit_status'] = 'ACTIVE'
-            print(f"    ✓ Entry #{entry['id']} VALIDATED at +{peak_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+            entry.validation_status = ValidationStatus.VALIDATED
+            entry.validation_datetime = datetime.now()
+            entry.exit_status = ExitStatus.ACTIVE
+            self.events.append((entry.id, 'VALIDATED', round(peak_pct, 2)))
         
         # Check INVALIDATION
         elif lowest_pct <= -invalidation_pct:
-            entry['validation_status'] = 'INVALID'
-            entry['exit_status'] = 'EXITED'
-            entry['exit_reason'] = 'PRICE_DROP'
-            entry['exit_datetime'] = datetime.now()
-            entry['exit_price'] = current_price
-            entry['final_profit_pct'] = current_pct
-            entry['active'] = False
-            print(f"    ✗ Entry #{entry['id']} INVALIDATED - Price drop {lowest_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+            entry.validation_status = ValidationStatus.INVALID
+            entry.exit_status = ExitStatus.EXITED
+            entry.exit_reason = 'PRICE_DROP'
+            entry.exit_datetime = datetime.now()
+            entry.exit_price = current_price
+            entry.final_profit_pct = current_pct
+            entry.active = False
+            self.events.append((entry.id, 'INVALIDATED', round(lowest_pct, 2)))
         
         elif current_signal == 'CAUTION':
-            entry['validation_status'] = 'INVALID'
-            entry['exit_status'] = 'EXITED'
-            entry['exit_reason'] = 'CAUTION_SIGNAL'
-            entry['exit_datetime'] = datetime.now()
-            entry['exit_price'] = current_price
-            entry['final_profit_pct'] = current_pct
-            entry['active'] = False
-            print(f"    ✗ Entry #{entry['id']} INVALIDATED - CAUTION signal ({entry['symbol']} {entry['timeframe']})")
+            entry.validation_status = ValidationStatus.INVALID
+            entry.exit_status = ExitStatus.EXITED
+            entry.exit_reason = 'CAUTION_SIGNAL'
+            entry.exit_datetime = datetime.now()
+            entry.exit_price = current_price
+            entry.final_profit_pct = current_pct
+            entry.active = False
+            self.events.append((entry.id, 'INVALIDATED', round(current_pct, 2)))
         
         elif current_signal == 'WATCH' and lowest_pct <= -(invalidation_pct * 1.1):
-            entry['validation_status'] = 'INVALID'
-            entry['exit_status'] = 'EXITED'
-            entry['exit_reason'] = 'WATCH_PRICE_DROP'
-            entry['exit_datetime'] = datetime.now()
-            entry['exit_price'] = current_price
-            entry['final_profit_pct'] = current_pct
-            entry['active'] = False
-            print(f"    ✗ Entry #{entry['id']} INVALIDATED - WATCH + price drop ({entry['symbol']} {entry['timeframe']})")
+            entry.validation_status = ValidationStatus.INVALID
+            entry.exit_status = ExitStatus.EXITED
+            entry.exit_reason = 'WATCH_PRICE_DROP'
+            entry.exit_datetime = datetime.now()
+            entry.exit_price = current_price
+            entry.final_profit_pct = current_pct
+            entry.active = False
+            self.events.append((entry.id, 'INVALIDATED', round(lowest_pct, 2)))
         
         # Update counters
-        entry['validation_candles_count'] = validation_candles + 1
-        entry['current_price'] = current_price
-        entry['current_profit_pct'] = current_pct
-        entry['max_profit_pct'] = max(entry['max_profit_pct'] or 0.0, peak_pct)
+        entry.validation_candles_count = validation_candles + 1
+        entry.current_price = current_price
+        entry.current_profit_pct = current_pct
+        entry.max_profit_pct = max(entry.max_profit_pct or 0.0, peak_pct)
         
         return entry
-    def process_validated_entry(self, entry: Dict, current_price: float, 
-                                current_signal: str) -> Dict:
+    
+    def process_validated_entry(self, entry: Entry, current_price: float, 
+                                current_signal: str) -> Entry:
         """
         Process an entry in VALIDATED state (exit tracking)
         
         Returns:
-            Updated entry dict
+            Updated entry
         """
-        entry_price = entry['entry_price']
-        peak_price = entry['peak_price']
-        exit_status = entry['exit_status']
+        entry_price = entry.entry_price
+        peak_price = entry.peak_price
+        exit_status = entry.exit_status
         
         # Update peak
         if current_price > peak_price:
             peak_price = current_price
-            entry['peak_price'] = peak_price
-            entry['peak_datetime'] = datetime.now()
+            entry.peak_price = peak_price
+            entry.peak_datetime = datetime.now()
         
         current_pct = ((current_price - entry_price) / entry_price) * 100
         peak_pct = ((peak_price - entry_price) / entry_price) * 100
@@ -510,23 +696,23 @@ class EntryUpdater:
         
         # Check SIGNAL-BASED EXITS (highest priority)
         if current_signal == 'SELL':
-            entry['exit_status'] = 'EXITED'
-            entry['exit_reason'] = 'SELL_SIGNAL'
-            entry['exit_datetime'] = datetime.now()
-            entry['exit_price'] = current_price
-            entry['final_profit_pct'] = current_pct
-            entry['active'] = False
-            print(f"    🔴 Entry #{entry['id']} EXITED - SELL signal at +{current_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+            entry.exit_status = ExitStatus.EXITED
+            entry.exit_reason = 'SELL_SIGNAL'
+            entry.exit_datetime = datetime.now()
+            entry.exit_price = current_price
+            entry.final_profit_pct = current_pct
+            entry.active = False
+            self.events.append((entry.id, 'EXITED', round(current_pct, 2)))
             return entry
         
         elif current_signal == 'CAUTION':
-            entry['exit_status'] = 'EXITED'
-            entry['exit_reason'] = 'CAUTION_SIGNAL'
-            entry['exit_datetime'] = datetime.now()
-            entry['exit_price'] = current_price
-            entry['final_profit_pct'] = current_pct
-            entry['active'] = False
-            print(f"    🔴 Entry #{entry['id']} EXITED - CAUTION signal at +{current_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+            entry.exit_status = ExitStatus.EXITED
+            entry.exit_reason = 'CAUTION_SIGNAL'
+            entry.exit_datetime = datetime.now()
+            entry.exit_price = current_price
+            entry.final_profit_pct = current_pct
+            entry.active = False
+            self.events.append((entry.id, 'EXITED', round(current_pct, 2)))
             return entry
         
         # ==================== CALCULATE EXIT LEVELS ====================
@@ -535,77 +721,80 @@ class EntryUpdater:
         
         # Store trailing stop (EXIT-1 is the trailing stop)
         if exit1 > 0:
-            entry['trailing_stop_price'] = exit1
-            entry['trailing_stop_active'] = True
+            entry.trailing_stop_price = exit1
+            entry.trailing_stop_active = True
         
         # ==================== EXIT LEVEL TRACKING ====================
         
         # Check EXIT-1
-        if exit1 > 0 and current_price <= exit1 and not entry['exit_1_hit']:
-            entry['exit_1_hit'] = True
-            entry['exit_1_datetime'] = datetime.now()
-            entry['exit_1_price'] = current_price
-            entry['exit_status'] = 'EXIT-1'
-            print(f"    🟠 Entry #{entry['id']} → EXIT-1 at +{current_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+        if exit1 > 0 and current_price <= exit1 and not entry.exit_1_hit:
+            entry.exit_1_hit = True
+            entry.exit_1_datetime = datetime.now()
+            entry.exit_1_price = current_price
+            entry.exit_status = ExitStatus.EXIT1
+            self.events.append((entry.id, 'EXIT-1', round(current_pct, 2)))
         
         # Check EXIT-2
-        if exit2 > 0 and current_price <= exit2 and not entry['exit_2_hit']:
-            entry['exit_2_hit'] = True
-            entry['exit_2_datetime'] = datetime.now()
-            entry['exit_2_price'] = current_price
-            entry['exit_status'] = 'EXIT-2'
-            print(f"    🟠 Entry #{entry['id']} → EXIT-2 at +{current_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+        if exit2 > 0 and current_price <= exit2 and not entry.exit_2_hit:
+            entry.exit_2_hit = True
+            entry.exit_2_datetime = datetime.now()
+            entry.exit_2_price = current_price
+            entry.exit_status = ExitStatus.EXIT2
+            self.events.append((entry.id, 'EXIT-2', round(current_pct, 2)))
         
         # Check EXIT-3
-        if exit3 > 0 and current_price <= exit3 and not entry['exit_3_hit']:
-            entry['exit_3_hit'] = True
-            entry['exit_3_datetime'] = datetime.now()
-            entry['exit_3_price'] = current_price
-            entry['exit_status'] = 'EXIT-3'
-            print(f"    🔴 Entry #{entry['id']} → EXIT-3 CRITICAL at +{current_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+        if exit3 > 0 and current_price <= exit3 and not entry.exit_3_hit:
+            entry.exit_3_hit = True
+            entry.exit_3_datetime = datetime.now()
+            entry.exit_3_price = current_price
+            entry.exit_status = ExitStatus.EXIT3
+            self.events.append((entry.id, 'EXIT-3', round(current_pct, 2)))
         
         # Check RECOVERY (price moving back up)
-        if entry['exit_3_hit'] and current_price > exit3:
-            entry['exit_status'] = 'EXIT-2'
-            entry['recovery_attempt'] = True
-            entry['recovery_datetime'] = datetime.now()
-            print(f"    🟢 Entry #{entry['id']} RECOVERING from EXIT-3 ({entry['symbol']} {entry['timeframe']})")
-        
-        elif entry['exit_2_hit'] and not entry['exit_3_hit'] and current_price > exit2:
-            entry['exit_status'] = 'EXIT-1'
-            entry['recovery_attempt'] = True
-            entry['recovery_datetime'] = datetime.now()
-            print(f"    🟢 Entry #{entry['id']} RECOVERING from EXIT-2 ({entry['symbol']} {entry['timeframe']})")
-        
-        elif entry['exit_1_hit'] and not entry['exit_2_hit'] and current_price > exit1:
-            entry['exit_status'] = 'ACTIVE'
-            entry['recovery_attempt'] = True
-            entry['recovery_datetime'] = datetime.now()
-            print(f"    🟢 Entry #{entry['id']} RECOVERED to ACTIVE ({entry['symbol']} {entry['timeframe']})")
+        if entry.exit_3_hit and current_price > exit3:
+            entry.exit_status = ExitStatus.EXIT2
+            entry.recovery_attempt = True
+            entry.recovery_datetime = datetime.now()
+            self.events.append((entry.id, 'RECOVERING', round(current_pct, 2)))
+        
+        elif entry.exit_2_hit and not entry.exit_3_hit and current_price > exit2:
+            entry.exit_status = ExitStatus.EXIT1
+            entry.recovery_attempt = True
+            entry.recovery_datetime = datetime.now()
+            self.events.append((entry.id, 'RECOVERING', round(current_pct, 2)))
+        
+        elif entry.exit_1_hit and not entry.exit_2_hit and current_price > exit1:
+            entry.exit_status = ExitStatus.ACTIVE
+            entry.recovery_attempt = True
+            entry.recovery_datetime = datetime.now()
+            self.events.append((entry.id, 'RECOVERED', round(current_pct, 2)))
         
         # Check EXIT-3 + weak signal = FINAL EXIT
-        if entry['exit_3_hit'] and current_signal in ['WATCH', 'CAUTION']:
-            entry['exit_status'] = 'EXITED'
-            entry['exit_reason'] = f'EXIT3_{current_signal}'
-            entry['exit_datetime'] = datetime.now()
-            entry['exit_price'] = current_price
-            entry['final_profit_pct'] = current_pct
-            entry['active'] = False
-            print(f"    🔴 Entry #{entry['id']} FINAL EXIT - EXIT-3 + {current_signal} at +{current_pct:.2f}% ({entry['symbol']} {entry['timeframe']})")
+        if entry.exit_3_hit and current_signal in ['WATCH', 'CAUTION']:
+            entry.exit_status = ExitStatus.EXITED
+            entry.exit_reason = f'EXIT3_{current_signal}'
+            entry.exit_datetime = datetime.now()
+            entry.exit_price = current_price
+            entry.final_profit_pct = current_pct
+            entry.active = False
+            self.events.append((entry.id, 'FINAL-EXIT', round(current_pct, 2)))
         
         # Update entry
-        entry['current_price'] = current_price
-        entry['current_profit_pct'] = current_pct
-        entry['max_profit_pct'] = max(entry['max_profit_pct'] or 0.0, peak_pct)
+        entry.current_price = current_price
+        entry.current_profit_pct = current_pct
+        entry.max_profit_pct = max(entry.max_profit_pct or 0.0, peak_pct)
         
         return entry
     
-    def update_entry_in_db(self, entry: Dict) -> bool:
+    def update_entry_in_db(self, entry: Entry, conn=None) -> bool:
         """
         Update entry in database
+        
+        Returns:
+            True if the entry row was updated (confirmed via RETURNING)
         """
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn, savepoint=True) as conn:
                 query = text("""
                     UPDATE entry_tracking SET
                         validation_status = :validation_status,
@@ -638,125 +827,269 @@ class EntryUpdater:
                         active = :active,
                         updated_at = CURRENT_TIMESTAMP
                     WHERE id = :id
+                    RETURNING id
                 """)
                 
-                conn.execute(query, {
-                    'id': entry['id'],
-                    'validation_status': entry['validation_status'],
-                    'validation_datetime': entry.get('validation_datetime'),
-                    'validation_candles_count': entry['validation_candles_count'],
-                    'exit_status': entry['exit_status'],
-                    'exit_datetime': entry.get('exit_datetime'),
-                    'exit_price': entry.get('exit_price'),
-                    'exit_reason': entry.get('exit_reason'),
-                    'peak_price': entry['peak_price'],
-                    'peak_datetime': entry.get('peak_datetime'),
-                    'current_price': entry['current_price'],
-                    'current_profit_pct': entry['current_profit_pct'],
-                    'max_profit_pct': entry['max_profit_pct'],
-                    'final_profit_pct': entry.get('final_profit_pct'),
-                    'exit_1_hit': entry['exit_1_hit'],
-                    'exit_1_datetime': entry.get('exit_1_datetime'),
-                    'exit_1_price': entry.get('exit_1_price'),
-                    'exit_2_hit': entry['exit_2_hit'],
-                    'exit_2_datetime': entry.get('exit_2_datetime'),
-                    'exit_2_price': entry.get('exit_2_price'),
-                    'exit_3_hit': entry['exit_3_hit'],
-                    'exit_3_datetime': entry.get('exit_3_datetime'),
-                    'exit_3_price': entry.get('exit_3_price'),
-                    'trailing_stop_price': entry.get('trailing_stop_price'),
-                    'trailing_stop_active': entry.get('trailing_stop_active'),
-                    'recovery_attempt': entry.get('recovery_attempt'),
-                    'recovery_low_price': entry.get('recovery_low_price'),
-                    'recovery_datetime': entry.get('recovery_datetime'),
-                    'active': entry['active']
-                })
+                updated = conn.execute(query, {
+                    'id': entry.id,
+                    'validation_status': VALIDATION_STATUS_TO_STR[entry.validation_status],
+                    'validation_datetime': entry.validation_datetime,
+                    'validation_candles_count': entry.validation_candles_count,
+                    'exit_status': EXIT_STATUS_TO_STR[entry.exit_status],
+                    'exit_datetime': entry.exit_datetime,
+                    'exit_price': entry.exit_price,
+                    'exit_reason': entry.exit_reason,
+                    'peak_price': entry.peak_price,
+                    'peak_datetime': entry.peak_datetime,
+                    'current_price': entry.current_price,
+                    'current_profit_pct': entry.current_profit_pct,
+                    'max_profit_pct': entry.max_profit_pct,
+                    'final_profit_pct': entry.final_profit_pct,
+                    'exit_1_hit': entry.exit_1_hit,
+                    'exit_1_datetime': entry.exit_1_datetime,
+                    'exit_1_price': entry.exit_1_price,
+                    'exit_2_hit': entry.exit_2_hit,
+                    'exit_2_datetime': entry.exit_2_datetime,
+                    'exit_2_price': entry.exit_2_price,
+                    'exit_3_hit': entry.exit_3_hit,
+                    'exit_3_datetime': entry.exit_3_datetime,
+                    'exit_3_price': entry.exit_3_price,
+                    'trailing_stop_price': entry.trailing_stop_price,
+                    'trailing_stop_active': entry.trailing_stop_active,
+                    'recovery_attempt': entry.recovery_attempt,
+                    'recovery_low_price': entry.recovery_low_price,
+                    'recovery_datetime': entry.recovery_datetime,
+                    'active': entry.active
+                }).fetchone()
                 
-                conn.commit()
-                return True
+                return updated is not None
         
-        except Exception as e:
-            print(f"  ✗ Error updating entry #{entry['id']}: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error updating entry #%d", entry.id)
             return False
+    
+    def flush_events(self):
+        """
+        Emit the buffered state transitions of this cycle as a single log line
+        """
+        if self.events:
+            logger.info("cycle_events=%s", self.events)
+            self.events = []
+    
+    def advance_validating_entries(self, conn=None) -> Set[int]:
+        """
+        Apply trivial VALIDATING updates in a single set-based UPDATE
+        
+        Entries whose latest price and signal cross no validation or
+        invalidation threshold only need their counters, peak/low and
+        profit fields refreshed. That arithmetic runs in the database;
+        entries that do cross a threshold are left for Python.
+        
+        Returns:
+            IDs of the entries updated
+        """
+        try:
+            with self._connection(conn, savepoint=True) as conn:
+                query = text("""
+                    WITH candidates AS (
+                        SELECT
+                            e.id,
+                            c.close,
+                            s.signal,
+                            GREATEST(e.peak_price::float, c.close) AS new_peak,
+                            LEAST(COALESCE(e.recovery_low_price::float, c.close), c.close) AS new_low,
+                            (c.close - e.entry_price::float) / e.entry_price::float * 100 AS current_pct,
+                            (GREATEST(e.peak_price::float, c.close) - e.entry_price::float)
+                                / e.entry_price::float * 100 AS peak_pct,
+                            (LEAST(COALESCE(e.recovery_low_price::float, c.close), c.close) - e.entry_price::float)
+                                / e.entry_price::float * 100 AS lowest_pct,
+                            -- Mirrors classify_timeframe()
+                            CASE
+                                WHEN e.timeframe LIKE '%m' THEN CAST(RTRIM(e.timeframe, 'm') AS INTEGER) <= 240
+                                WHEN e.timeframe LIKE '%h' THEN CAST(RTRIM(e.timeframe, 'h') AS INTEGER) * 60 <= 240
+                                WHEN e.timeframe LIKE '%d' OR e.timeframe = 'D' THEN FALSE
+                                ELSE TRUE
+                            END AS is_intraday
+                        FROM entry_tracking e
+                        -- Latest candle/signal per VALIDATING entry, one index
+                        -- probe each on (symbol, timeframe, datetime DESC)
+                        CROSS JOIN LATERAL (
+                            SELECT close::float AS close
+                            FROM candles
+                            WHERE symbol = e.symbol
+                              AND timeframe = e.timeframe
+                            ORDER BY datetime DESC
+                            LIMIT 1
+                        ) c
+                        CROSS JOIN LATERAL (
+                            SELECT signal
+                            FROM signals
+                            WHERE symbol = e.symbol
+                              AND timeframe = e.timeframe
+                            ORDER BY datetime DESC
+                            LIMIT 1
+                        ) s
+                        WHERE e.active = TRUE
+                          AND e.validation_status = 'VALIDATING'
+                    ),
+                    thresholds AS (
+                        SELECT
+                            candidates.*,
+                            CASE WHEN is_intraday THEN :intraday_validation_pct
+                                 ELSE :swing_validation_pct END AS validation_pct,
+                            CASE WHEN is_intraday THEN :intraday_invalidation_pct
+                                 ELSE :swing_invalidation_pct END AS invalidation_pct
+                        FROM candidates
+                    )
+                    UPDATE entry_tracking e SET
+                        validation_candles_count = e.validation_candles_count + 1,
+                        current_price = t.close,
+                        peak_price = t.new_peak,
+                        peak_datetime = CASE WHEN t.close > e.peak_price THEN LOCALTIMESTAMP
+                                             ELSE e.peak_datetime END,
+                        recovery_low_price = t.new_low,
+                        current_profit_pct = t.current_pct,
+                        max_profit_pct = GREATEST(COALESCE(e.max_profit_pct::float, 0.0), t.peak_pct),
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM thresholds t
+                    WHERE e.id = t.id
+                      AND t.peak_pct < t.validation_pct
+                      AND t.lowest_pct > -t.invalidation_pct
+                      AND t.signal <> 'CAUTION'
+                      AND NOT (t.signal = 'WATCH' AND t.lowest_pct <= -(t.invalidation_pct * 1.1))
+                    RETURNING e.id
+                """)
+                
+                result = conn.execute(query, {
+                    'intraday_validation_pct': self.intraday_validation_pct,
+                    'intraday_invalidation_pct': self.intraday_invalidation_pct,
+                    'swing_validation_pct': self.swing_validation_pct,
+                    'swing_invalidation_pct': self.swing_invalidation_pct
+                })
+                
+                return {row[0] for row in result}
+        
+        except Exception:
+            logger.exception("Error advancing validating entries")
+            return set()
+    
+    def update_active_entries(self, conn=None) -> int:
+        """
+        Update all active entries with the latest price and signal
+        
+        Trivial VALIDATING updates are applied in SQL first; the remaining
+        entries are streamed in batches so memory stays flat regardless
+        of how many entries are active. Per-entry status lines are logged
+        at DEBUG level.
+        
+        Args:
+            conn: Optional shared connection (see process_all_entries)
+        
+        Returns:
+            Number of entries updated
+        """
+        with self._connection(conn) as conn:
+            advanced = self.advance_validating_entries(conn)
+            updated_count = len(advanced)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
+            # Latest price/signal for every pair in two queries up front
+            prices, signals = self.prefetch_latest(conn)
+            
+            # Entries arrive sorted by (symbol, timeframe): price, signal and
+            # thresholds are resolved once per group instead of once per entry
+            entries = chain.from_iterable(self.iter_active_entries(conn=conn))
+            
+            for (symbol, timeframe), group in groupby(entries, key=attrgetter('symbol', 'timeframe')):
+                # Get latest price and signal
+                current_price = prices.get((symbol, timeframe))
+                current_signal = signals.get((symbol, timeframe))
+                thresholds = self.get_validation_thresholds(timeframe)
+                
+                for entry in group:
+                    if entry.id in advanced:
+                        continue
+                    
+                    if current_price is None or current_signal is None:
+                        logger.warning("Entry #%d: missing price/signal data", entry.id)
+                        continue
+                    
+                    # Show entry info
+                    if debug:
+                        entry_pct = ((current_price - entry.entry_price) / entry.entry_price) * 100
+                        logger.debug(
+                            "Entry #%d: %s %s | %s / %s | %.2f -> %.2f (%+.2f%%) | %s",
+                            entry.id, symbol, timeframe,
+                            VALIDATION_STATUS_TO_STR[entry.validation_status],
+                            EXIT_STATUS_TO_STR[entry.exit_status],
+                            entry.entry_price, current_price, entry_pct, current_signal
+                        )
+                    
+                    # Process based on validation status
+                    if entry.validation_status == ValidationStatus.VALIDATING:
+                        updated_entry = self.process_validating_entry(
+                            entry, current_price, current_signal, thresholds
+                        )
+                    elif entry.validation_status == ValidationStatus.VALIDATED:
+                        updated_entry = self.process_validated_entry(entry, current_price, current_signal)
+                    else:
+                        # INVALID or EXITED - skip
+                        continue
+                    
+                    # Update in database
+                    if self.update_entry_in_db(updated_entry, conn):
+                        updated_count += 1
+            
+        self.flush_events()
+        return updated_count
+    
     def process_all_entries(self):
         """
         Main processing loop for all entries
         
         1. Create new entries from signals
         2. Update all active entries
+        
+        Both steps share one connection and commit once at the end; each
+        write runs in its own SAVEPOINT.
         """
         print("=" * 80)
         print("ENTRY UPDATER")
         print("=" * 80)
         
-        # Step 1: Create new entries
-        print("\n📥 Step 1: Creating new entries from BUY/A-BUY/EARLY-BUY signals")
-        print("-" * 80)
-        
-        new_signals = self.get_new_entry_signals()
-        
-        if new_signals:
-            print(f"Found {len(new_signals)} new entry signals")
-            
-            created_count = 0
-            for signal in new_signals:
-                if self.create_entry(signal):
-                    print(f"  ✓ Created entry: {signal['symbol']} {signal['timeframe']} ({signal['signal']}) @ {signal['entry_price']}")
-                    created_count += 1
+        with self.engine.connect() as conn:
+            # Step 1: Create new entries
+            print("\n📥 Step 1: Creating new entries from BUY/A-BUY/EARLY-BUY signals")
+            print("-" * 80)
             
-            print(f"\n✅ Created {created_count} new entries")
-        else:
-            print("  → No new entry signals")
-        
-        # Step 2: Update active entries
-        print("\n🔄 Step 2: Updating active entries")
-        print("-" * 80)
-        
-        active_entries = self.get_active_entries()
-        
-        if active_entries:
-            print(f"Found {len(active_entries)} active entries to update\n")
+            new_signals = self.get_new_entry_signals(conn)
             
-            updated_count = 0
-            for entry in active_entries:
-                symbol = entry['symbol']
-                timeframe = entry['timeframe']
-                
-                # Get latest price and signal
-                current_price = self.get_latest_candle_price(symbol, timeframe)
-                current_signal = self.get_latest_signal(symbol, timeframe)
+            if new_signals:
+                print(f"Found {len(new_signals)} new entry signals")
                 
-                if current_price is None or current_signal is None:
-                    print(f"  ⚠️  Entry #{entry['id']}: Missing price/signal data")
-                    continue
+                created_count = 0
+                for signal in new_signals:
+                    if self.create_entry(signal, conn):
+                        logger.debug("Created entry: %s %s (%s) @ %s", signal['symbol'],
+                                     signal['timeframe'], signal['signal'], signal['entry_price'])
+                        created_count += 1
                 
-                # Show entry info
-                entry_pct = ((current_price - entry['entry_price']) / entry['entry_price']) * 100
-                print(f"  Entry #{entry['id']}: {symbol} {timeframe}")
-                print(f"    Status: {entry['validation_status']} / {entry['exit_status']}")
-                print(f"    Price: {entry['entry_price']:.2f} → {current_price:.2f} ({entry_pct:+.2f}%)")
-                print(f"    Signal: {current_signal}")
-                
-                # Process based on validation status
-                if entry['validation_status'] == 'VALIDATING':
-                    updated_entry = self.process_validating_entry(entry, current_price, current_signal)
-                elif entry['validation_status'] == 'VALIDATED':
-                    updated_entry = self.process_validated_entry(entry, current_price, current_signal)
-                else:
-                    # INVALID or EXITED - skip
-                    continue
-                
-                # Update in database
-                if self.update_entry_in_db(updated_entry):
-                    updated_count += 1
-                
-                print()  # Blank line between entries
+                print(f"\n✅ Created {created_count} new entries")
+            else:
+                print("  → No new entry signals")
             
-            print(f"✅ Updated {updated_count} entries")
-        else:
-            print("  → No active entries to update")
+            # Step 2: Update active entries
+            print("\n🔄 Step 2: Updating active entries")
+            print("-" * 80)
+            
+            updated_count = self.update_active_entries(conn)
+            
+            if updated_count:
+                print(f"✅ Updated {updated_count} entries")
+            else:
+                print("  → No active entries updated")
+            
+            conn.commit()
         
         print("\n" + "=" * 80)
         print("✅ ENTRY UPDATER COMPLETE")
@@ -768,6 +1101,8 @@ class EntryUpdater:
 # ============================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     print("=" * 80)
     print("ENTRY UPDATER TEST")
     print("=" * 80)
@@ -6,6 +6,7 @@ Abstract interface for all exchange adapters (Binance, PSX, etc.)
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 from datetime import datetime
+import pandas as pd
 
 
 class BaseExchange(ABC):
@@ -22,7 +23,7 @@ class BaseExchange(ABC):
     @abstractmethod
     def get_candles(self, symbol: str, timeframe: str, 
                    since: Optional[datetime] = None, 
-                   limit: int = 100) -> List[Dict]:
+                   limit: int = 100) -> pd.DataFrame:
         """
         Fetch OHLCV candles from exchange
         
@@ -33,8 +34,9 @@ class BaseExchange(ABC):
             limit: Maximum number of candles to fetch
         
         Returns:
-            List of candle dicts with keys:
-            - datetime: Candle datetime
+            DataFrame (oldest first) with columns:
+            - timestamp: Unix timestamp in milliseconds
+            - datetime: Candle datetime (UTC)
             - open: Open price
             - high: High price
             - low: Low price
@@ -43,6 +45,13 @@ class BaseExchange(ABC):
         """
         pass
     
+    @staticmethod
+    def empty_candles() -> pd.DataFrame:
+        """
+        Get an empty candle DataFrame with the columns get_candles() returns
+        """
+        return pd.DataFrame(columns=['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume'])
+    
     @abstractmethod
     def get_supported_symbols(self) -> List[str]:
         """
@@ -4,9 +4,13 @@ Fetches OHLCV data from Binance using ccxt
 """
 
 import ccxt
-from typing import List, Dict, Optional
+import ccxt.async_support as ccxt_async
+from typing import List, Optional
 from datetime import datetime, timezone
 import os
+import numpy as np
+import pandas as pd
+import diskcache
 from dotenv import load_dotenv
 
 try:
@@ -17,12 +21,21 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+# On-disk cache for closed historical OHLCV windows (backend/.cache/binance)
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    '.cache', 'binance'
+)
+
 
 class BinanceAdapter(BaseExchange):
     """
     Binance exchange adapter for fetching cryptocurrency data
     """
     
+    # Shared ccxt client: created and market-loaded once per process
+    _CLIENT = None
+    
     def __init__(self):
         super().__init__()
         self.exchange_name = 'binance'
@@ -32,20 +45,33 @@ class BinanceAdapter(BaseExchange):
         api_key = os.getenv('BINANCE_API_KEY', '')
         api_secret = os.getenv('BINANCE_API_SECRET', '')
         
-        self.client = ccxt.binance({
-            'apiKey': api_key,
-            'secret': api_secret,
-            'enableRateLimit': True,  # Respect rate limits
-            'options': {
-                'defaultType': 'spot',  # Use spot market
-            }
-        })
+        if BinanceAdapter._CLIENT is None:
+            BinanceAdapter._CLIENT = ccxt.binance({
+                'apiKey': api_key,
+                'secret': api_secret,
+                'enableRateLimit': True,  # Respect rate limits
+                'enableLastHttpResponse': False,  # Don't retain response bodies
+                'options': {
+                    'defaultType': 'spot',  # Use spot market
+                    'warnOnFetchOHLCVLimitArgument': False,
+                }
+            })
+            
+            # Pre-warm the markets table so the first fetch doesn't pay for it
+            try:
+                BinanceAdapter._CLIENT.load_markets()
+            except Exception as e:
+                print(f"  ⚠️  Could not preload Binance markets: {e}")
+        
+        self.client = BinanceAdapter._CLIENT
+        
+        self.cache = diskcache.Cache(CACHE_DIR)
         
         print(f"✓ Binance adapter initialized (API key: {'Yes' if api_key else 'No - using public access'})")
     
     def get_candles(self, symbol: str, timeframe: str, 
                    since: Optional[datetime] = None, 
-                   limit: int = 100) -> List[Dict]:
+                   limit: int = 100) -> pd.DataFrame:
         """
         Fetch OHLCV candles from Binance
         
@@ -56,39 +82,140 @@ class BinanceAdapter(BaseExchange):
             limit: Maximum number of candles (max 1000 for Binance)
         
         Returns:
-            List of candle dicts
+            DataFrame with timestamp (ms), datetime (UTC) and OHLCV columns
         """
         try:
-            # Convert datetime to milliseconds timestamp
-            since_ms = None
-            if since:
-                since_ms = int(since.replace(tzinfo=timezone.utc).timestamp() * 1000)
+            since_ms, limit, cache_key = self._window(symbol, timeframe, since, limit)
             
-            # Fetch OHLCV data
-            ohlcv = self.client.fetch_ohlcv(
-                symbol=symbol,
-                timeframe=timeframe,
-                since=since_ms,
-                limit=min(limit, 1000)  # Binance max is 1000
-            )
+            ohlcv = self.cache.get(cache_key) if cache_key else None
             
-            # Convert to our format
-            candles = []
-            for candle in ohlcv:
-                candles.append({
-                    'datetime': datetime.fromtimestamp(candle[0] / 1000, tz=timezone.utc),
-                    'open': float(candle[1]),
-                    'high': float(candle[2]),
-                    'low': float(candle[3]),
-                    'close': float(candle[4]),
-                    'volume': float(candle[5])
-                })
+            if ohlcv is None:
+                # Fetch OHLCV data
+                ohlcv = self.client.fetch_ohlcv(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    since=since_ms,
+                    limit=limit
+                )
+                
+                if cache_key and ohlcv:
+                    self.cache.set(cache_key, ohlcv)
             
-            return candles
+            return self._to_frame(ohlcv)
         
         except Exception as e:
             print(f"✗ Error fetching candles from Binance ({symbol} {timeframe}): {e}")
-            return []
+            return self.empty_candles()
+    
+    def create_async_client(self):
+        """
+        Create an asyncio ccxt client for concurrent fetches
+        
+        Uses the same settings as the shared client and reuses its loaded
+        markets. The caller must `await client.close()` when done.
+        
+        Returns:
+            ccxt.async_support.binance instance
+        """
+        client = ccxt_async.binance({
+            'apiKey': self.client.apiKey,
+            'secret': self.client.secret,
+            'enableRateLimit': True,
+            'enableLastHttpResponse': False,
+            'options': {
+                'defaultType': 'spot',
+                'warnOnFetchOHLCVLimitArgument': False,
+            }
+        })
+        
+        if self.client.markets:
+            client.set_markets(self.client.markets, self.client.currencies)
+        
+        return client
+    
+    async def get_candles_async(self, client, symbol: str, timeframe: str,
+                                since: Optional[datetime] = None,
+                                limit: int = 100) -> pd.DataFrame:
+        """
+        get_candles() over an asyncio client from create_async_client()
+        
+        Args:
+            client: Async ccxt client
+            symbol: Trading pair (e.g., 'BTC/USDT')
+            timeframe: Candle timeframe (e.g., '1h', '1d')
+            since: Fetch candles after this datetime (UTC)
+            limit: Maximum number of candles (max 1000 for Binance)
+        
+        Returns:
+            DataFrame with timestamp (ms), datetime (UTC) and OHLCV columns
+        """
+        try:
+            since_ms, limit, cache_key = self._window(symbol, timeframe, since, limit)
+            
+            ohlcv = self.cache.get(cache_key) if cache_key else None
+            
+            if ohlcv is None:
+                ohlcv = await client.fetch_ohlcv(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    since=since_ms,
+                    limit=limit
+                )
+                
+                if cache_key and ohlcv:
+                    self.cache.set(cache_key, ohlcv)
+            
+            return self._to_frame(ohlcv)
+        
+        except Exception as e:
+            print(f"✗ Error fetching candles from Binance ({symbol} {timeframe}): {e}")
+            return self.empty_candles()
+    
+    def _window(self, symbol: str, timeframe: str, since: Optional[datetime],
+                limit: int):
+        """
+        Resolve the request window of a candle fetch
+        
+        Windows that ended well before now are immutable and get a disk
+        cache key; windows touching the current candle always hit the API.
+        
+        Returns:
+            (since_ms or None, capped limit, cache key or None)
+        """
+        # Convert datetime to milliseconds timestamp
+        since_ms = None
+        if since:
+            since_ms = int(since.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        
+        limit = min(limit, 1000)  # Binance max is 1000
+        
+        cache_key = None
+        if since_ms is not None:
+            timeframe_ms = self.client.parse_timeframe(timeframe) * 1000
+            window_end_ms = since_ms + limit * timeframe_ms
+            
+            if window_end_ms < self.client.milliseconds() - 2 * timeframe_ms:
+                cache_key = f"{symbol}:{timeframe}:{since_ms}:{limit}"
+        
+        return since_ms, limit, cache_key
+    
+    def _to_frame(self, ohlcv: List[list]) -> pd.DataFrame:
+        """Convert raw ccxt OHLCV rows to our format in one shot (no per-row dicts)"""
+        if not ohlcv:
+            return self.empty_candles()
+        
+        arr = np.asarray(ohlcv, dtype=np.float64)
+        timestamps = arr[:, 0].astype(np.int64)
+        
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'datetime': pd.to_datetime(timestamps, unit='ms', utc=True),
+            'open': arr[:, 1],
+            'high': arr[:, 2],
+            'low': arr[:, 3],
+            'close': arr[:, 4],
+            'volume': arr[:, 5]
+        })
     
     def get_supported_symbols(self) -> List[str]:
         """
@@ -139,9 +266,9 @@ if __name__ == "__main__":
     
     print(f"\nFetched {len(candles)} candles:\n")
     
-    for candle in candles:
-        print(f"{candle['datetime']} | O: ${candle['open']:,.2f} | H: ${candle['high']:,.2f} | "
-              f"L: ${candle['low']:,.2f} | C: ${candle['close']:,.2f} | V: {candle['volume']:,.0f}")
+    for candle in candles.itertuples(index=False):
+        print(f"{candle.datetime} | O: ${candle.open:,.2f} | H: ${candle.high:,.2f} | "
+              f"L: ${candle.low:,.2f} | C: ${candle.close:,.2f} | V: {candle.volume:,.0f}")
     
     # Test fetching with since parameter
     print("\n" + "=" * 80)
@@ -153,5 +280,5 @@ if __name__ == "__main__":
     
     print(f"\nFetched {len(candles)} candles:\n")
     
-    for candle in candles:
-        print(f"{candle['datetime'].date()} | C: ${candle['close']:,.2f}")
\ No newline at end of file
+    for candle in candles.itertuples(index=False):
+        print(f"{candle.datetime.date()} | C: ${candle.close:,.2f}")
\ No newline at end of file
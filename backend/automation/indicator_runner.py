@@ -5,15 +5,22 @@ Automatically calculate indicators for new candles
 
 import sys
 import os
+import io
+import re
 from datetime import datetime, timedelta
 from sqlalchemy import text
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Iterator
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
+import numpy as np
+from psycopg2.extras import execute_batch, execute_values
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import engine
+from automation.candle_ref import CandleRef, POOL_CONTEXT
 
 # Import all individual indicator calculators
 from indicators import (
@@ -28,6 +35,147 @@ from indicators import (
     VWAPCalculator,
     SuperTrendCalculator
 )
+from indicators.supertrend import warm_up_kernel
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+INDICATOR_FLOAT_COLUMNS = [
+    'rsi', 'rsi_ema',
+    'macd_line', 'macd_signal', 'macd_histogram',
+    'ema_44', 'ema_100', 'ema_200',
+    'bb_basis', 'bb_upper_1', 'bb_lower_1', 'bb_upper_2', 'bb_lower_2',
+    'bb_upper_3', 'bb_lower_3',
+    'adx', 'di_plus', 'di_minus',
+    'atr', 'obv', 'obv_ma', 'vwap',
+    'volume_avg',
+    'supertrend_1', 'supertrend_2'
+]
+
+# Bounded 0-100 oscillators stored as REAL; float32 holds their 4 stored
+# decimals. Price-scaled columns stay float64 to keep 8 decimals on large prices.
+INDICATOR_FLOAT32_COLUMNS = ['rsi', 'rsi_ema', 'adx', 'di_plus', 'di_minus']
+
+# One record per candle in a batch result; NaN / '' mark missing values
+INDICATOR_DTYPE = np.dtype(
+    [('candle_id', 'i8')]
+    + [(name, 'f4' if name in INDICATOR_FLOAT32_COLUMNS else 'f8')
+       for name in INDICATOR_FLOAT_COLUMNS]
+    + [
+        ('bb_squeeze', '?'),
+        ('bb_position', 'i1'),
+        ('volume_signal', 'U1'),
+        ('supertrend_1_direction', 'i1'),
+        ('supertrend_2_direction', 'i1')
+    ]
+)
+
+# Flag/direction columns are stored as NULL when the value they derive from is
+INDICATOR_DERIVED_FROM = {
+    'bb_squeeze': 'bb_basis',
+    'bb_position': 'bb_basis',
+    'supertrend_1_direction': 'supertrend_1',
+    'supertrend_2_direction': 'supertrend_2'
+}
+
+# Upsert of one indicator set, keyed on the UNIQUE(candle_id) constraint
+UPSERT_INDICATORS_SQL = """
+    INSERT INTO indicators (
+        candle_id,
+        rsi, rsi_ema,
+        macd_line, macd_signal, macd_histogram,
+        ema_44, ema_100, ema_200,
+        bb_basis, bb_upper_1, bb_lower_1, bb_upper_2, bb_lower_2,
+        bb_upper_3, bb_lower_3, bb_squeeze, bb_position,
+        adx, di_plus, di_minus,
+        atr, obv, obv_ma, vwap,
+        volume_avg, volume_signal,
+        supertrend_1, supertrend_1_direction,
+        supertrend_2, supertrend_2_direction
+    ) VALUES (
+        :candle_id,
+        :rsi, :rsi_ema,
+        :macd_line, :macd_signal, :macd_histogram,
+        :ema_44, :ema_100, :ema_200,
+        :bb_basis, :bb_upper_1, :bb_lower_1, :bb_upper_2, :bb_lower_2,
+        :bb_upper_3, :bb_lower_3, :bb_squeeze, :bb_position,
+        :adx, :di_plus, :di_minus,
+        :atr, :obv, :obv_ma, :vwap,
+        :volume_avg, :volume_signal,
+        :supertrend_1, :supertrend_1_direction,
+        :supertrend_2, :supertrend_2_direction
+    )
+    ON CONFLICT (candle_id) DO UPDATE SET
+        rsi = EXCLUDED.rsi,
+        rsi_ema = EXCLUDED.rsi_ema,
+        macd_line = EXCLUDED.macd_line,
+        macd_signal = EXCLUDED.macd_signal,
+        macd_histogram = EXCLUDED.macd_histogram,
+        ema_44 = EXCLUDED.ema_44,
+        ema_100 = EXCLUDED.ema_100,
+        ema_200 = EXCLUDED.ema_200,
+        bb_basis = EXCLUDED.bb_basis,
+        bb_upper_1 = EXCLUDED.bb_upper_1,
+        bb_lower_1 = EXCLUDED.bb_lower_1,
+        bb_upper_2 = EXCLUDED.bb_upper_2,
+        bb_lower_2 = EXCLUDED.bb_lower_2,
+        bb_upper_3 = EXCLUDED.bb_upper_3,
+        bb_lower_3 = EXCLUDED.bb_lower_3,
+        bb_squeeze = EXCLUDED.bb_squeeze,
+        bb_position = EXCLUDED.bb_position,
+        adx = EXCLUDED.adx,
+        di_plus = EXCLUDED.di_plus,
+        di_minus = EXCLUDED.di_minus,
+        atr = EXCLUDED.atr,
+        obv = EXCLUDED.obv,
+        obv_ma = EXCLUDED.obv_ma,
+        vwap = EXCLUDED.vwap,
+        volume_avg = EXCLUDED.volume_avg,
+        volume_signal = EXCLUDED.volume_signal,
+        supertrend_1 = EXCLUDED.supertrend_1,
+        supertrend_1_direction = EXCLUDED.supertrend_1_direction,
+        supertrend_2 = EXCLUDED.supertrend_2,
+        supertrend_2_direction = EXCLUDED.supertrend_2_direction,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Server-side prepared form of the upsert: :name placeholders become $n
+UPSERT_PARAM_NAMES = list(dict.fromkeys(re.findall(r':(\w+)', UPSERT_INDICATORS_SQL)))
+PREPARE_UPSERT_SQL = 'PREPARE upsert_indicators AS ' + re.sub(
+    r':(\w+)', lambda m: f'${UPSERT_PARAM_NAMES.index(m.group(1)) + 1}', UPSERT_INDICATORS_SQL
+)
+EXECUTE_UPSERT_SQL = 'EXECUTE upsert_indicators ({})'.format(
+    ', '.join(f'%({name})s' for name in UPSERT_PARAM_NAMES)
+)
+
+# Multi-row form for execute_values: one VALUES list per page of rows
+UPSERT_VALUES_SQL = re.sub(
+    r'VALUES \(.*?\)\s*ON CONFLICT', 'VALUES %s\n    ON CONFLICT', UPSERT_INDICATORS_SQL, flags=re.S
+)
+UPSERT_VALUES_TEMPLATE = '({})'.format(
+    ', '.join(f'%({name})s' for name in UPSERT_PARAM_NAMES)
+)
+
+
+def indicator_params(out: np.ndarray) -> List[Dict]:
+    """
+    Convert a structured indicator array into executemany parameters
+    
+    Values become native Python types, with None for NaN floats, empty
+    volume signals and flags derived from a missing value.
+    """
+    columns = {}
+    for name in out.dtype.names:
+        values = out[name].astype(object)
+        if out.dtype[name].kind == 'f':
+            values[np.isnan(out[name])] = None
+        elif out.dtype[name].kind == 'U':
+            values[out[name] == ''] = None
+        columns[name] = values
+    
+    for name, source in INDICATOR_DERIVED_FROM.items():
+        columns[name][np.isnan(out[source])] = None
+    
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
 
 
 class IndicatorRunner:
@@ -35,8 +183,17 @@ class IndicatorRunner:
     Calculate and store technical indicators for candles
     """
     
-    def __init__(self):
+    def __init__(self, price_dtype=np.float64, banner: bool = True):
+        """
+        Args:
+            price_dtype: dtype of cached OHLCV windows. np.float32 halves
+                their memory; oscillators stay within ~1e-5 relative of
+                float64, but MACD near its zero line drifts more, so
+                float64 stays the default.
+            banner: Print the "initialized" line (off in pool workers)
+        """
         self.engine = engine
+        self.price_dtype = np.dtype(price_dtype)
         # Initialize all indicator calculators
         self.calculators = {
             'rsi': RSICalculator(),
@@ -50,10 +207,13 @@ class IndicatorRunner:
             'vwap': VWAPCalculator(),
             'supertrend': SuperTrendCalculator()
         }
-        print("✓ Indicator Runner initialized with 10 calculators")
+        # Candle windows per (symbol, timeframe), extended instead of re-fetched
+        self._history_cache = {}
+        if banner:
+            print("✓ Indicator Runner initialized with 10 calculators")
     
     def get_candles_without_indicators(self, symbol: str, timeframe: str, 
-                                      limit: int = 100) -> List[Dict]:
+                                      limit: int = 100) -> List[CandleRef]:
         """
         Find candles that don't have indicators calculated yet
         
@@ -63,14 +223,13 @@ class IndicatorRunner:
             limit: Maximum candles to return
         
         Returns:
-            List of candle dicts that need indicators
+            List of CandleRefs that need indicators
         """
         try:
             with self.engine.connect() as conn:
                 # Find candles without indicators
                 query = text("""
-                    SELECT c.id, c.symbol, c.timeframe, c.datetime,
-                           c.open, c.high, c.low, c.close, c.volume
+                    SELECT c.id, c.symbol, c.timeframe, c.datetime
                     FROM candles c
                     LEFT JOIN indicators i ON c.id = i.candle_id
                     WHERE c.symbol = :symbol
@@ -86,25 +245,56 @@ class IndicatorRunner:
                     'limit': limit
                 }).fetchall()
                 
-                candles = []
+                return [CandleRef(*row) for row in result]
+        
+        except Exception as e:
+            print(f"  ✗ Error finding candles without indicators: {e}")
+            return []
+    
+    def get_all_candles_without_indicators(self, limit_per_pair: int = 500) -> Dict[Tuple[str, str], List[CandleRef]]:
+        """
+        Find candles without indicators for every symbol/timeframe in one query
+        
+        Args:
+            limit_per_pair: Maximum candles to return per (symbol, timeframe)
+        
+        Returns:
+            Dict mapping (symbol, timeframe) to list of CandleRefs,
+            oldest first
+        """
+        pending = defaultdict(list)
+        
+        try:
+            with self.engine.connect() as conn:
+                query = text("""
+                    SELECT id, symbol, timeframe, datetime
+                    FROM (
+                        SELECT c.id, c.symbol, c.timeframe, c.datetime,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY c.symbol, c.timeframe
+                                   ORDER BY c.datetime ASC
+                               ) AS rn
+                        FROM candles c
+                        LEFT JOIN indicators i ON c.id = i.candle_id
+                        WHERE i.id IS NULL
+                    ) pending
+                    WHERE rn <= :limit
+                    ORDER BY symbol, timeframe, datetime ASC
+                """)
+                
+                # Stream rows instead of materializing the whole result first
+                result = conn.execution_options(stream_results=True, yield_per=1000).execute(
+                    query, {'limit': limit_per_pair}
+                )
+                
                 for row in result:
-                    candles.append({
-                        'id': row[0],
-                        'symbol': row[1],
-                        'timeframe': row[2],
-                        'datetime': row[3],
-                        'open': float(row[4]),
-                        'high': float(row[5]),
-                        'low': float(row[6]),
-                        'close': float(row[7]),
-                        'volume': float(row[8])
-                    })
+                    pending[(row.symbol, row.timeframe)].append(CandleRef(*row))
                 
-                return candles
+                return pending
         
         except Exception as e:
             print(f"  ✗ Error finding candles without indicators: {e}")
-            return []
+            return pending
     
     def get_historical_candles(self, symbol: str, timeframe: str, 
                               before_datetime: datetime, limit: int = 250) -> pd.DataFrame:
@@ -119,204 +309,316 @@ class IndicatorRunner:
         
         Returns:
             DataFrame with OHLCV data
+        
+        Windows are sliced from the per-run history cache: the first call
+        for a symbol/timeframe loads the window in one query, and calls for
+        later candles only fetch the candles added since.
+        """
+        window = self.get_or_load_history(
+            symbol, timeframe, before_datetime, before_datetime, warmup=limit
+        )
+        
+        if window.empty:
+            return pd.DataFrame()
+        
+        end = int(window['datetime'].searchsorted(before_datetime, side='left'))
+        return window.loc[max(end - limit, 0):end - 1, [
+            'datetime', 'open', 'high', 'low', 'close', 'volume'
+        ]].reset_index(drop=True)
+    
+    def get_candle_window(self, symbol: str, timeframe: str, start_datetime: datetime,
+                          end_datetime: datetime, warmup: int = 250) -> pd.DataFrame:
+        """
+        Get candles from `warmup` candles before start_datetime up to end_datetime
+        
+        Args:
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            start_datetime: First candle that needs indicators
+            end_datetime: Last candle that needs indicators
+            warmup: Number of historical candles to load before start_datetime
+        
+        Returns:
+            DataFrame with id and OHLCV data, oldest first
         """
         try:
             with self.engine.connect() as conn:
                 query = text("""
-                    SELECT datetime, open, high, low, close, volume
+                    SELECT id, datetime, open, high, low, close, volume
                     FROM candles
                     WHERE symbol = :symbol
                       AND timeframe = :timeframe
-                      AND datetime < :before_datetime
-                    ORDER BY datetime DESC
-                    LIMIT :limit
+                      AND datetime <= :end_datetime
+                      AND datetime >= COALESCE((
+                          SELECT datetime
+                          FROM candles
+                          WHERE symbol = :symbol
+                            AND timeframe = :timeframe
+                            AND datetime < :start_datetime
+                          ORDER BY datetime DESC
+                          OFFSET :offset
+                          LIMIT 1
+                      ), '-infinity'::timestamp)
+                    ORDER BY datetime ASC
                 """)
                 
-                result = conn.execute(query, {
-                    'symbol': symbol,
-                    'timeframe': timeframe,
-                    'before_datetime': before_datetime,
-                    'limit': limit
-                }).fetchall()
-                
-                if not result:
-                    return pd.DataFrame()
+                # Read through a server-side cursor in chunks and build the
+                # DataFrame once, without an intermediate list of row tuples
+                chunks = list(pd.read_sql(
+                    query,
+                    conn.execution_options(stream_results=True),
+                    params={
+                        'symbol': symbol,
+                        'timeframe': timeframe,
+                        'start_datetime': start_datetime,
+                        'end_datetime': end_datetime,
+                        'offset': warmup - 1
+                    },
+                    chunksize=1000
+                ))
                 
-                # Convert to DataFrame
-                df = pd.DataFrame(result, columns=['datetime', 'open', 'high', 'low', 'close', 'volume'])
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
                 
-                # Sort chronologically (oldest first)
-                df = df.sort_values('datetime').reset_index(drop=True)
+                if df.empty:
+                    return pd.DataFrame()
                 
-                # Convert to float
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = df[col].astype(float)
+                # Convert to float in one block cast
+                df[OHLCV_COLUMNS] = df[OHLCV_COLUMNS].astype(self.price_dtype)
                 
                 return df
         
         except Exception as e:
-            print(f"  ✗ Error getting historical candles: {e}")
+            print(f"  ✗ Error getting candle window: {e}")
             return pd.DataFrame()
     
-    def calculate_indicators_for_candle(self, candle: Dict, 
-                                   historical_df: pd.DataFrame) -> Optional[Dict]:
+    def get_or_load_history(self, symbol: str, timeframe: str, start_datetime: datetime,
+                            end_datetime: datetime, warmup: int = 250) -> pd.DataFrame:
+        """
+        Get a candle window through the per-run history cache
+        
+        The first call for a symbol/timeframe loads the window from the
+        database. Later calls only fetch candles newer than the cached ones,
+        as long as the cache still holds `warmup` candles before
+        start_datetime.
+        
+        Args:
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            start_datetime: First candle that needs indicators
+            end_datetime: Last candle that needs indicators
+            warmup: Number of historical candles needed before start_datetime
+        
+        Returns:
+            DataFrame with id and OHLCV data, oldest first (a copy, safe for
+            calculators to add columns to)
+        """
+        key = (symbol, timeframe)
+        cached = self._history_cache.get(key)
+        
+        if cached is not None:
+            start = int(cached['datetime'].searchsorted(start_datetime, side='left'))
+            
+            if start >= warmup:
+                last_datetime = cached['datetime'].iloc[-1]
+                
+                if last_datetime < end_datetime:
+                    try:
+                        with self.engine.connect() as conn:
+                            query = text("""
+                                SELECT id, datetime, open, high, low, close, volume
+                                FROM candles
+                                WHERE symbol = :symbol
+                                  AND timeframe = :timeframe
+                                  AND datetime > :after_datetime
+                                  AND datetime <= :end_datetime
+                                ORDER BY datetime ASC
+                            """)
+                            
+                            result = conn.execute(query, {
+                                'symbol': symbol,
+                                'timeframe': timeframe,
+                                'after_datetime': last_datetime,
+                                'end_datetime': end_datetime
+                            }).fetchall()
+                    
+                    except Exception as e:
+                        print(f"  ✗ Error extending candle history: {e}")
+                        result = []
+                    
+                    if result:
+                        newer = pd.DataFrame(result, columns=cached.columns)
+                        # Convert to float in one block cast
+                        newer[OHLCV_COLUMNS] = newer[OHLCV_COLUMNS].astype(self.price_dtype)
+                        cached = pd.concat([cached, newer], ignore_index=True)
+                        self._history_cache[key] = cached
+                
+                end = int(cached['datetime'].searchsorted(end_datetime, side='right'))
+                return cached.iloc[start - warmup:end].reset_index(drop=True)
+        
+        df = self.get_candle_window(symbol, timeframe, start_datetime, end_datetime, warmup)
+        
+        if not df.empty:
+            self._history_cache[key] = df
+        
+        return df.copy()
+    
+    def clear_history_cache(self):
+        """
+        Drop all cached candle windows (call at the end of a run)
+        """
+        self._history_cache.clear()
+    
+    def calculate_indicators_batch(self, symbol: str, timeframe: str,
+                                   candles: List[CandleRef]) -> np.ndarray:
         """
-        Calculate all indicators for a single candle
+        Calculate all indicators for many candles of one symbol/timeframe
+        
+        Loads the pending candles plus 250 candles of history in one query
+        and runs each calculator once over the whole window, instead of
+        recalculating a 250-candle window for every candle.
         
         Args:
-            candle: Candle dict with OHLCV data
-            historical_df: Historical candles DataFrame
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            candles: CandleRefs that need indicators, oldest first
         
         Returns:
-            Dict with all indicator values, or None if failed
+            Structured array of INDICATOR_DTYPE, one record per candle,
+            ready for store_indicators_bulk(). Candles with fewer than 250
+            historical candles are skipped.
         """
+        empty = np.empty(0, dtype=INDICATOR_DTYPE)
+        
+        if not candles:
+            return empty
+        
         try:
-            # Append current candle to historical data
-            current_row = pd.DataFrame([{
-                'datetime': candle['datetime'],
-                'open': candle['open'],
-                'high': candle['high'],
-                'low': candle['low'],
-                'close': candle['close'],
-                'volume': candle['volume']
-            }])
+            df = self.get_or_load_history(
+                symbol, timeframe, candles[0].datetime, candles[-1].datetime, warmup=250
+            )
             
-            df = pd.concat([historical_df, current_row], ignore_index=True)
+            if df.empty:
+                return empty
             
-            if len(df) < 250:
-                print(f"    ⚠️  Only {len(df)} historical candles, need 250+ for accurate indicators")
-                return None
+            # Row position of each pending candle inside the window
+            positions = pd.Series(np.arange(len(df)), index=df['id']).reindex(
+                [candle.id for candle in candles]
+            )
+            positions = positions[positions >= 250]
             
-            # Calculate all indicators using individual calculators
-            results = {}
+            skipped = len(candles) - len(positions)
+            if skipped:
+                print(f"    ⚠️  {skipped} candles have fewer than 250 historical candles, skipping")
             
-            # RSI
-            rsi_df = self.calculators['rsi'].calculate(df)
-            if not rsi_df.empty and 'rsi' in rsi_df.columns:
-                results['rsi'] = float(rsi_df['rsi'].iloc[-1])
-                results['rsi_ema'] = float(rsi_df['rsi_ema'].iloc[-1]) if 'rsi_ema' in rsi_df.columns else None
-            else:
-                results['rsi'] = results['rsi_ema'] = None
+            if positions.empty:
+                return empty
             
-            # MACD
-            macd_df = self.calculators['macd'].calculate(df)
-            if not macd_df.empty and 'macd_line' in macd_df.columns:
-                results['macd_line'] = float(macd_df['macd_line'].iloc[-1])
-                results['macd_signal'] = float(macd_df['macd_signal'].iloc[-1])
-                results['macd_histogram'] = float(macd_df['macd_histogram'].iloc[-1])
-            else:
-                results['macd_line'] = results['macd_signal'] = results['macd_histogram'] = None
+            rows = positions.to_numpy(dtype=int)
+            close = df['close'].to_numpy()[rows]
             
-            # EMA Stack
-            ema_df = self.calculators['ema'].calculate(df)
-            if not ema_df.empty and 'ema_44' in ema_df.columns:
-                results['ema_44'] = float(ema_df['ema_44'].iloc[-1])
-                results['ema_100'] = float(ema_df['ema_100'].iloc[-1])
-                results['ema_200'] = float(ema_df['ema_200'].iloc[-1])
-            else:
-                results['ema_44'] = results['ema_100'] = results['ema_200'] = None
+            # Allocated once per batch; calculator outputs are copied in by column
+            out = np.empty(len(rows), dtype=INDICATOR_DTYPE)
+            out['candle_id'] = positions.index.to_numpy()
             
-            # Bollinger Bands
-            bb_df = self.calculators['bb'].calculate(df)
-            if not bb_df.empty and 'bb_basis' in bb_df.columns:
-                results['bb_basis'] = float(bb_df['bb_basis'].iloc[-1])
-                results['bb_upper_1'] = float(bb_df['bb_upper_1'].iloc[-1])
-                results['bb_lower_1'] = float(bb_df['bb_lower_1'].iloc[-1])
-                results['bb_upper_2'] = float(bb_df['bb_upper_2'].iloc[-1])
-                results['bb_lower_2'] = float(bb_df['bb_lower_2'].iloc[-1])
-                results['bb_upper_3'] = float(bb_df['bb_upper_3'].iloc[-1]) if 'bb_upper_3' in bb_df.columns else None
-                results['bb_lower_3'] = float(bb_df['bb_lower_3'].iloc[-1]) if 'bb_lower_3' in bb_df.columns else None
-                
-                # Calculate BB squeeze and position (not provided by calculator)
-                bb_width = (results['bb_upper_1'] - results['bb_lower_1']) / results['bb_basis'] * 100
-                results['bb_squeeze'] = True if bb_width < 2.0 else False  # Boolean for database
-                
-                # BB position: where price is relative to bands
-                close_price = candle['close']
-                if close_price > results['bb_upper_1']:
-                    results['bb_position'] = 1  # Above upper band
-                elif close_price < results['bb_lower_1']:
-                    results['bb_position'] = -1  # Below lower band
-                else:
-                    results['bb_position'] = 0  # Between bands
-            else:
-                results['bb_basis'] = results['bb_upper_1'] = results['bb_lower_1'] = None
-                results['bb_upper_2'] = results['bb_lower_2'] = None
-                results['bb_upper_3'] = results['bb_lower_3'] = None
-                results['bb_squeeze'] = results['bb_position'] = None
+            def take(frame: pd.DataFrame, columns: List[str]):
+                for col in columns:
+                    if not frame.empty and col in frame.columns:
+                        out[col] = frame[col].to_numpy()[rows]
+                    else:
+                        out[col] = np.nan if out.dtype[col].kind == 'f' else ''
             
-            # ADX
-            adx_df = self.calculators['adx'].calculate(df)
-            if not adx_df.empty and 'adx' in adx_df.columns:
-                results['adx'] = float(adx_df['adx'].iloc[-1])
-                results['di_plus'] = float(adx_df['di_plus'].iloc[-1])
-                results['di_minus'] = float(adx_df['di_minus'].iloc[-1])
-            else:
-                results['adx'] = results['di_plus'] = results['di_minus'] = None
+            # Each calculator runs once over the full window
+            take(self.calculators['rsi'].calculate(df), ['rsi', 'rsi_ema'])
+            take(self.calculators['macd'].calculate(df), ['macd_line', 'macd_signal', 'macd_histogram'])
+            take(self.calculators['ema'].calculate(df), ['ema_44', 'ema_100', 'ema_200'])
+            take(self.calculators['bb'].calculate(df), [
+                'bb_basis', 'bb_upper_1', 'bb_lower_1', 'bb_upper_2', 'bb_lower_2',
+                'bb_upper_3', 'bb_lower_3'
+            ])
+            take(self.calculators['adx'].calculate(df), ['adx', 'di_plus', 'di_minus'])
             
             # ATR (needed for SuperTrend)
-            atr_df = self.calculators['atr'].calculate(df)
-            if not atr_df.empty and 'atr' in atr_df.columns:
-                results['atr'] = float(atr_df['atr'].iloc[-1])
-                # Add ATR to df for SuperTrend calculation
-                df['atr'] = atr_df['atr']
-            else:
-                results['atr'] = None
-            
-            # Volume Analysis
-            vol_df = self.calculators['volume'].calculate(df)
-            if not vol_df.empty and 'volume_avg' in vol_df.columns and 'volume_signal' in vol_df.columns:
-                results['volume_avg'] = float(vol_df['volume_avg'].iloc[-1])
-                # Volume signal: H/N/L (matches TradingView exactly)
-                results['volume_signal'] = str(vol_df['volume_signal'].iloc[-1])
-            else:
-                results['volume_avg'] = results['volume_signal'] = None
+            take(self.calculators['atr'].calculate(df), ['atr'])
             
-            # OBV
-            obv_df = self.calculators['obv'].calculate(df)
-            if not obv_df.empty and 'obv' in obv_df.columns:
-                results['obv'] = float(obv_df['obv'].iloc[-1])
-                results['obv_ma'] = float(obv_df['obv_ma'].iloc[-1]) if 'obv_ma' in obv_df.columns else None
-            else:
-                results['obv'] = results['obv_ma'] = None
+            take(self.calculators['volume'].calculate(df), ['volume_avg', 'volume_signal'])
+            take(self.calculators['obv'].calculate(df), ['obv', 'obv_ma'])
+            take(self.calculators['vwap'].calculate(df), ['vwap'])
             
-            # VWAP
-            vwap_df = self.calculators['vwap'].calculate(df)
-            if not vwap_df.empty and 'vwap' in vwap_df.columns:
-                results['vwap'] = float(vwap_df['vwap'].iloc[-1])
-            else:
-                results['vwap'] = None
+            # BB squeeze and position (not provided by calculator)
+            bb_width = (out['bb_upper_1'] - out['bb_lower_1']) / out['bb_basis'] * 100
+            out['bb_squeeze'] = bb_width < 2.0
+            out['bb_position'] = (
+                (close > out['bb_upper_1']).view(np.int8) - (close < out['bb_lower_1']).view(np.int8)
+            )
             
             # SuperTrend (requires ATR to be already calculated)
-            if results['atr'] is not None:
-                st_df = self.calculators['supertrend'].calculate(df)
-                if not st_df.empty and 'supertrend_1' in st_df.columns:
-                    results['supertrend_1'] = float(st_df['supertrend_1'].iloc[-1])
-                    results['supertrend_2'] = float(st_df['supertrend_2'].iloc[-1])
-                    
-                    # Calculate direction: 1 if price > supertrend (uptrend), -1 if below (downtrend)
-                    close_price = candle['close']
-                    results['supertrend_1_direction'] = 1 if close_price > results['supertrend_1'] else -1
-                    results['supertrend_2_direction'] = 1 if close_price > results['supertrend_2'] else -1
-                else:
-                    results['supertrend_1'] = results['supertrend_1_direction'] = None
-                    results['supertrend_2'] = results['supertrend_2_direction'] = None
+            if np.isnan(out['atr']).all():
+                out['supertrend_1'] = out['supertrend_2'] = np.nan
             else:
-                results['supertrend_1'] = results['supertrend_1_direction'] = None
-                results['supertrend_2'] = results['supertrend_2_direction'] = None
+                take(self.calculators['supertrend'].calculate(df), ['supertrend_1', 'supertrend_2'])
+            
+            # Direction: 1 if price > supertrend (uptrend), -1 if below (downtrend)
+            for name in ['supertrend_1', 'supertrend_2']:
+                out[f'{name}_direction'] = np.where(close > out[name], np.int8(1), np.int8(-1))
             
-            return results
+            return out
         
         except Exception as e:
             print(f"  ✗ Error calculating indicators: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return empty
+    
+    def calculate_indicators_parallel(self, tasks: List[Tuple[str, str, List[CandleRef]]],
+                                      max_workers: Optional[int] = None
+                                      ) -> Iterator[Tuple[str, str, np.ndarray]]:
+        """
+        Calculate indicators for many symbol/timeframe partitions in a process pool
+        
+        Each partition is independent, so the pandas work runs on all cores.
+        Workers only calculate; results come back to the caller, which
+        stores them from the main process.
+        
+        Args:
+            tasks: List of (symbol, timeframe, pending CandleRefs)
+            max_workers: Worker processes (default: CPU count)
+        
+        Yields:
+            (symbol, timeframe, structured indicator array) as partitions complete
+        """
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        
+        # Not worth starting a pool for a single partition
+        if workers <= 1:
+            for symbol, timeframe, candles in tasks:
+                yield symbol, timeframe, self.calculate_indicators_batch(symbol, timeframe, candles)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT,
+                                 initializer=_init_worker,
+                                 initargs=(self.price_dtype,)) as executor:
+            futures = {
+                executor.submit(_calculate_partition, symbol, timeframe, candles): (symbol, timeframe)
+                for symbol, timeframe, candles in tasks
+            }
+            
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    print(f"  ✗ Error calculating indicators for {symbol} {timeframe}: {e}")
+                    rows = np.empty(0, dtype=INDICATOR_DTYPE)
+                
+                yield symbol, timeframe, rows
     
     def store_indicators(self, candle_id: int, indicators: Dict) -> bool:
         """
         Store calculated indicators in database
         
+        Inserts or updates in a single INSERT ... ON CONFLICT (candle_id)
+        statement, so there is no separate existence check.
+        
         Args:
             candle_id: ID of the candle
             indicators: Dict of indicator values
@@ -325,99 +627,179 @@ class IndicatorRunner:
             True if successful, False otherwise
         """
         try:
-            with self.engine.connect() as conn:
-                # Check if indicators already exist
-                check_query = text("""
-                    SELECT id FROM indicators WHERE candle_id = :candle_id
-                """)
-                
-                existing = conn.execute(check_query, {'candle_id': candle_id}).fetchone()
-                
-                if existing:
-                    # Update existing
-                    update_query = text("""
-                        UPDATE indicators SET
-                            rsi = :rsi,
-                            rsi_ema = :rsi_ema,
-                            macd_line = :macd_line,
-                            macd_signal = :macd_signal,
-                            macd_histogram = :macd_histogram,
-                            ema_44 = :ema_44,
-                            ema_100 = :ema_100,
-                            ema_200 = :ema_200,
-                            bb_basis = :bb_basis,
-                            bb_upper_1 = :bb_upper_1,
-                            bb_lower_1 = :bb_lower_1,
-                            bb_upper_2 = :bb_upper_2,
-                            bb_lower_2 = :bb_lower_2,
-                            bb_upper_3 = :bb_upper_3,
-                            bb_lower_3 = :bb_lower_3,
-                            bb_squeeze = :bb_squeeze,
-                            bb_position = :bb_position,
-                            adx = :adx,
-                            di_plus = :di_plus,
-                            di_minus = :di_minus,
-                            atr = :atr,
-                            obv = :obv,
-                            obv_ma = :obv_ma,
-                            vwap = :vwap,
-                            volume_avg = :volume_avg,
-                            volume_signal = :volume_signal,
-                            supertrend_1 = :supertrend_1,
-                            supertrend_1_direction = :supertrend_1_direction,
-                            supertrend_2 = :supertrend_2,
-                            supertrend_2_direction = :supertrend_2_direction,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE candle_id = :candle_id
-                    """)
-                    
-                    conn.execute(update_query, {
-                        'candle_id': candle_id,
-                        **indicators
-                    })
-                else:
-                    # Insert new
-                    insert_query = text("""
-                        INSERT INTO indicators (
-                            candle_id,
-                            rsi, rsi_ema,
-                            macd_line, macd_signal, macd_histogram,
-                            ema_44, ema_100, ema_200,
-                            bb_basis, bb_upper_1, bb_lower_1, bb_upper_2, bb_lower_2,
-                            bb_upper_3, bb_lower_3, bb_squeeze, bb_position,
-                            adx, di_plus, di_minus,
-                            atr, obv, obv_ma, vwap,
-                            volume_avg, volume_signal,
-                            supertrend_1, supertrend_1_direction,
-                            supertrend_2, supertrend_2_direction
-                        ) VALUES (
-                            :candle_id,
-                            :rsi, :rsi_ema,
-                            :macd_line, :macd_signal, :macd_histogram,
-                            :ema_44, :ema_100, :ema_200,
-                            :bb_basis, :bb_upper_1, :bb_lower_1, :bb_upper_2, :bb_lower_2,
-                            :bb_upper_3, :bb_lower_3, :bb_squeeze, :bb_position,
-                            :adx, :di_plus, :di_minus,
-                            :atr, :obv, :obv_ma, :vwap,
-                            :volume_avg, :volume_signal,
-                            :supertrend_1, :supertrend_1_direction,
-                            :supertrend_2, :supertrend_2_direction
-                        )
-                    """)
-                    
-                    conn.execute(insert_query, {
-                        'candle_id': candle_id,
-                        **indicators
-                    })
-                
-                conn.commit()
-                return True
+            with self.engine.begin() as conn:
+                self.execute_upsert(conn, [{
+                    'candle_id': candle_id,
+                    **indicators
+                }])
+            
+            return True
         
         except Exception as e:
             print(f"  ✗ Error storing indicators: {e}")
             import traceback
             traceback.print_exc()
             return False
+    
+    def execute_upsert(self, conn, params: List[Dict], page_size: int = 1000):
+        """
+        Run the indicator upsert through a server-side prepared statement
+        
+        The statement is prepared once per pooled connection (tracked in
+        the connection's info dict), so Postgres parses and plans it once
+        per session instead of once per row.
+        
+        Args:
+            conn: SQLAlchemy connection inside an open transaction
+            params: List of dicts with 'candle_id' plus all indicator values
+            page_size: Number of EXECUTEs sent per round trip
+        """
+        info = conn.connection.info
+        dbapi_conn = conn.connection.dbapi_connection
+        
+        try:
+            with dbapi_conn.cursor() as cursor:
+                if not info.get('upsert_indicators_prepared'):
+                    cursor.execute(
+                        "SELECT 1 FROM pg_prepared_statements WHERE name = 'upsert_indicators'"
+                    )
+                    if cursor.fetchone() is None:
+                        cursor.execute(PREPARE_UPSERT_SQL)
+                    info['upsert_indicators_prepared'] = True
+                
+                execute_batch(cursor, EXECUTE_UPSERT_SQL, params, page_size=page_size)
+        
+        except Exception:
+            # Re-check on next use rather than trusting the flag
+            info.pop('upsert_indicators_prepared', None)
+            raise
+    
+    def store_indicators_bulk(self, rows: np.ndarray, batch_size: int = 1000,
+                              copy_threshold: int = 10000, bulk: bool = False) -> int:
+        """
+        Store many indicator sets in one transaction
+        
+        Uses an upsert on candle_id instead of the SELECT-then-INSERT/UPDATE
+        check, and sends each batch as one multi-row INSERT (execute_values).
+        Batches larger than copy_threshold, or any batch when bulk=True
+        (backfill entrypoints), go through copy_indicators().
+        
+        Args:
+            rows: Structured array of INDICATOR_DTYPE
+            batch_size: Number of rows per INSERT statement
+            copy_threshold: Row count above which COPY is used instead
+            bulk: Always use COPY (one-off historical loads)
+        
+        Returns:
+            Number of rows stored (0 if the transaction failed)
+        """
+        if len(rows) == 0:
+            return 0
+        
+        if bulk or len(rows) > copy_threshold:
+            return self.copy_indicators(rows)
+        
+        try:
+            params = indicator_params(rows)
+            
+            with self.engine.begin() as conn:
+                with conn.connection.dbapi_connection.cursor() as cursor:
+                    execute_values(
+                        cursor, UPSERT_VALUES_SQL, params,
+                        template=UPSERT_VALUES_TEMPLATE, page_size=batch_size
+                    )
+            
+            return len(rows)
+        
+        except Exception as e:
+            print(f"  ✗ Error bulk storing indicators: {e}")
+            import traceback
+            traceback.print_exc()
+            return 0
+    
+    def copy_indicators(self, rows: np.ndarray) -> int:
+        """
+        Store a large batch of indicator sets through COPY
+        
+        Rows are streamed as CSV into a temporary staging table and upserted
+        from there in a single statement, so there is no per-row parse/plan
+        overhead. Meant for backfills; incremental runs use the executemany
+        upsert in store_indicators_bulk().
+        
+        Args:
+            rows: Structured array of INDICATOR_DTYPE
+        
+        Returns:
+            Number of rows stored (0 if the transaction failed)
+        """
+        columns = ', '.join(INDICATOR_DTYPE.names)
+        updates = ',\n                    '.join(
+            f'{name} = EXCLUDED.{name}' for name in INDICATOR_DTYPE.names[1:]
+        )
+        
+        # Empty CSV fields are loaded as NULL
+        frame = pd.DataFrame(rows)
+        for name, source in INDICATOR_DERIVED_FROM.items():
+            frame[name] = frame[name].astype(object).where(frame[source].notna(), None)
+        
+        buffer = io.StringIO()
+        frame.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute(f"""
+                CREATE TEMP TABLE indicators_stage ON COMMIT DROP AS
+                SELECT {columns} FROM indicators WITH NO DATA
+            """)
+            cursor.copy_expert(f"COPY indicators_stage ({columns}) FROM STDIN WITH CSV", buffer)
+            cursor.execute(f"""
+                INSERT INTO indicators ({columns})
+                SELECT {columns} FROM indicators_stage
+                ON CONFLICT (candle_id) DO UPDATE SET
+                    {updates},
+                    updated_at = CURRENT_TIMESTAMP
+            """)
+            raw.commit()
+            return len(rows)
+        
+        except Exception as e:
+            raw.rollback()
+            print(f"  ✗ Error copying indicators: {e}")
+            import traceback
+            traceback.print_exc()
+            return 0
+        
+        finally:
+            raw.close()
+
+
+# ============================================
+# PROCESS POOL WORKERS
+# ============================================
+
+_worker_runner = None
+
+
+def _init_worker(price_dtype=np.float64):
+    """
+    Set up one IndicatorRunner per worker process
+    
+    Workers start from POOL_CONTEXT, not a fork of the caller; any pooled
+    connections they still inherit are dropped (without closing them) so
+    each worker opens its own. The SuperTrend kernel is
+    warmed up here so no task pays for loading it.
+    """
+    global _worker_runner
+    engine.dispose(close=False)
+    _worker_runner = IndicatorRunner(price_dtype, banner=False)
+    warm_up_kernel()
+
+
+def _calculate_partition(symbol: str, timeframe: str, candles: List[CandleRef]) -> np.ndarray:
+    """Calculate indicator rows for one symbol/timeframe in a worker"""
+    return _worker_runner.calculate_indicators_batch(symbol, timeframe, candles)
 
 
 # ============================================
@@ -446,50 +828,41 @@ if __name__ == "__main__":
         print("-" * 80)
         
         test_candle = candles[0]
-        print(f"Processing Candle #{test_candle['id']}: {test_candle['datetime']}")
-        
-        # Get historical data
-        historical_df = runner.get_historical_candles(
-            test_candle['symbol'],
-            test_candle['timeframe'],
-            test_candle['datetime'],
-            limit=250
-        )
+        print(f"Processing Candle #{test_candle.id}: {test_candle.datetime}")
         
-        print(f"  → Loaded {len(historical_df)} historical candles")
+        # Calculate indicators (loads the 250-candle warm-up window itself)
+        rows = runner.calculate_indicators_batch(
+            test_candle.symbol, test_candle.timeframe, [test_candle]
+        )
         
-        if len(historical_df) >= 250:
-            # Calculate indicators
-            indicators = runner.calculate_indicators_for_candle(test_candle, historical_df)
+        if len(rows):
+            indicators = indicator_params(rows)[0]
             
-            if indicators:
-                print(f"  ✓ Calculated indicators:")
-                print(f"    RSI: {indicators.get('rsi', 'N/A')}")
-                print(f"    MACD Line: {indicators.get('macd_line', 'N/A')}")
-                print(f"    MACD Signal: {indicators.get('macd_signal', 'N/A')}")
-                print(f"    EMA 44: {indicators.get('ema_44', 'N/A')}")
-                print(f"    EMA 100: {indicators.get('ema_100', 'N/A')}")
-                print(f"    BB Upper 1: {indicators.get('bb_upper_1', 'N/A')}")
-                print(f"    BB Basis: {indicators.get('bb_basis', 'N/A')}")
-                print(f"    ADX: {indicators.get('adx', 'N/A')}")
-                print(f"    ATR: {indicators.get('atr', 'N/A')}")
-                print(f"    SuperTrend 1: {indicators.get('supertrend_1', 'N/A')}")
-                print(f"    SuperTrend 2: {indicators.get('supertrend_2', 'N/A')}")
-                
-                # Test storing indicators
-                print("\nTest 3: Store indicators in database")
-                print("-" * 80)
-                
-                success = runner.store_indicators(test_candle['id'], indicators)
-                
-                if success:
-                    print(f"  ✓ Successfully stored indicators for Candle #{test_candle['id']}")
-                else:
-                    print(f"  ✗ Failed to store indicators")
+            print(f"  ✓ Calculated indicators:")
+            print(f"    RSI: {indicators.get('rsi', 'N/A')}")
+            print(f"    MACD Line: {indicators.get('macd_line', 'N/A')}")
+            print(f"    MACD Signal: {indicators.get('macd_signal', 'N/A')}")
+            print(f"    EMA 44: {indicators.get('ema_44', 'N/A')}")
+            print(f"    EMA 100: {indicators.get('ema_100', 'N/A')}")
+            print(f"    BB Upper 1: {indicators.get('bb_upper_1', 'N/A')}")
+            print(f"    BB Basis: {indicators.get('bb_basis', 'N/A')}")
+            print(f"    ADX: {indicators.get('adx', 'N/A')}")
+            print(f"    ATR: {indicators.get('atr', 'N/A')}")
+            print(f"    SuperTrend 1: {indicators.get('supertrend_1', 'N/A')}")
+            print(f"    SuperTrend 2: {indicators.get('supertrend_2', 'N/A')}")
+            
+            # Test storing indicators
+            print("\nTest 3: Store indicators in database")
+            print("-" * 80)
+            
+            success = runner.store_indicators_bulk(rows) == len(rows)
+            
+            if success:
+                print(f"  ✓ Successfully stored indicators for Candle #{test_candle.id}")
             else:
-                print("  ✗ Failed to calculate indicators")
+                print(f"  ✗ Failed to store indicators")
         else:
-            print(f"  ⚠️  Not enough historical data ({len(historical_df)} candles)")
+            print("  ✗ Failed to calculate indicators (not enough historical data?)")
     
     print("\n" + "=" * 80)
     print("✅ TEST COMPLETE")
@@ -4,7 +4,11 @@ Fetches real-time prices from Binance exchange for tracked symbols
 """
 
 import ccxt
+import time
 import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List
 from datetime import datetime
 
@@ -21,6 +25,15 @@ class PriceFetcher:
                 'defaultType': 'spot',
             }
         })
+        
+        # Keep-alive connection pool so repeat calls skip the TCP/TLS handshake
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
+        self.exchange.session = session
     
     def get_live_price(self, symbol: str) -> float:
         """
@@ -48,12 +61,30 @@ class PriceFetcher:
         
         Returns:
             Dictionary with symbol as key and price data as value
+        
+        All symbols are requested in a single fetch_tickers call; only
+        symbols missing from that response are fetched one by one.
         """
         results = {}
         
+        if not symbols:
+            return results
+        
+        start = time.perf_counter()
+        timestamp = datetime.utcnow().isoformat()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        try:
+            tickers = self.exchange.fetch_tickers(symbols)
+        except Exception as e:
+            logger.error(f"✗ Error fetching tickers: {e}")
+            tickers = {}
+        
         for symbol in symbols:
             try:
-                ticker = self.exchange.fetch_ticker(symbol)
+                ticker = tickers.get(symbol)
+                if ticker is None:
+                    ticker = self.exchange.fetch_ticker(symbol)
                 
                 results[symbol] = {
                     'price': float(ticker['last']),
@@ -62,25 +93,53 @@ class PriceFetcher:
                     'high_24h': float(ticker['high']) if ticker['high'] else 0.0,
                     'low_24h': float(ticker['low']) if ticker['low'] else 0.0,
                     'volume_24h': float(ticker['quoteVolume']) if ticker['quoteVolume'] else 0.0,
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': timestamp
                 }
                 
-                logger.info(f"✓ Fetched live price for {symbol}: ${results[symbol]['price']:.2f}")
+                if debug:
+                    logger.debug("✓ Fetched live price for %s: $%.2f", symbol, results[symbol]['price'])
                 
             except Exception as e:
                 logger.error(f"✗ Error fetching {symbol}: {e}")
                 results[symbol] = {
                     'price': 0.0,
                     'error': str(e),
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': timestamp
                 }
         
+        # One summary line per batch; per-symbol lines only at DEBUG
+        prices = [data['price'] for data in results.values() if 'error' not in data]
+        if prices:
+            logger.info("✓ Fetched %d/%d live prices in %.1f ms (min $%.2f, max $%.2f)",
+                        len(prices), len(symbols), (time.perf_counter() - start) * 1000,
+                        min(prices), max(prices))
+        else:
+            logger.info("✗ Fetched 0/%d live prices in %.1f ms",
+                        len(symbols), (time.perf_counter() - start) * 1000)
+        
         return results
 
 
+# Shared instance (and HTTPS session) per process
+_price_fetcher = None
+
+
+def get_price_fetcher() -> PriceFetcher:
+    """
+    Get the process-wide PriceFetcher, creating it on first use
+    
+    Returns:
+        Shared PriceFetcher instance
+    """
+    global _price_fetcher
+    if _price_fetcher is None:
+        _price_fetcher = PriceFetcher()
+    return _price_fetcher
+
+
 # Test function
 if __name__ == "__main__":
-    fetcher = PriceFetcher()
+    fetcher = get_price_fetcher()
     
     # Test with a few symbols
     test_symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
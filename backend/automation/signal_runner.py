@@ -5,29 +5,39 @@ Automatically generate signals for candles with indicators
 
 import sys
 import os
+import logging
 from datetime import datetime
 from sqlalchemy import text
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Iterator, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import engine
+from automation.candle_ref import CandleRef, POOL_CONTEXT
 from calculations.signal_generator import SignalGenerator
 
+logger = logging.getLogger(__name__)
+
 
 class SignalRunner:
     """
     Generate and store trading signals for candles
     """
     
-    def __init__(self):
+    def __init__(self, banner: bool = True):
+        """
+        Args:
+            banner: Print the "initialized" line (off in pool workers)
+        """
         self.engine = engine
         self.signal_generator = SignalGenerator()
-        print("✓ Signal Runner initialized")
+        if banner:
+            print("✓ Signal Runner initialized")
     
     def get_candles_without_signals(self, symbol: str, timeframe: str, 
-                                    limit: int = 100) -> List[Dict]:
+                                    limit: int = 100) -> List[CandleRef]:
         """
         Find candles that have indicators but no signals
         
@@ -37,7 +47,7 @@ class SignalRunner:
             limit: Maximum candles to return
         
         Returns:
-            List of candle dicts that need signals
+            List of CandleRefs that need signals
         """
         try:
             with self.engine.connect() as conn:
@@ -61,22 +71,56 @@ class SignalRunner:
                     'limit': limit
                 }).fetchall()
                 
-                candles = []
-                for row in result:
-                    candles.append({
-                        'id': row[0],
-                        'symbol': row[1],
-                        'timeframe': row[2],
-                        'datetime': row[3]
-                    })
-                
-                return candles
+                return [CandleRef(*row) for row in result]
         
         except Exception as e:
             print(f"  ✗ Error finding candles without signals: {e}")
             return []
     
-    def generate_signal_for_candle(self, candle: Dict) -> Optional[Dict]:
+    def iter_candles_without_signals(self, symbol: str, timeframe: str,
+                                     batch_size: int = 500) -> Iterator[List[CandleRef]]:
+        """
+        Stream candles that have indicators but no signals
+        
+        Rows come from a server-side cursor, so memory stays at one batch
+        however large the backlog is.
+        
+        Args:
+            symbol: Trading pair (e.g., 'BTC/USDT')
+            timeframe: Candle timeframe (e.g., '1h')
+            batch_size: Rows fetched from the cursor per batch
+        
+        Yields:
+            Lists of at most batch_size CandleRefs, oldest first
+        """
+        try:
+            with self.engine.connect() as conn:
+                query = text("""
+                    SELECT c.id, c.symbol, c.timeframe, c.datetime
+                    FROM candles c
+                    INNER JOIN indicators i ON c.id = i.candle_id
+                    LEFT JOIN signals s ON c.id = s.candle_id
+                    WHERE c.symbol = :symbol
+                      AND c.timeframe = :timeframe
+                      AND i.rsi IS NOT NULL
+                      AND s.id IS NULL
+                    ORDER BY c.datetime ASC
+                """)
+                
+                result = conn.execute(query, {
+                    'symbol': symbol,
+                    'timeframe': timeframe
+                }, execution_options={
+                    'stream_results': True, 'yield_per': batch_size
+                })
+                
+                for partition in result.partitions(batch_size):
+                    yield [CandleRef(*row) for row in partition]
+        
+        except Exception as e:
+            print(f"  ✗ Error streaming candles without signals: {e}")
+    
+    def generate_signal_for_candle(self, candle: CandleRef) -> Optional[Dict]:
         """
         Generate signal for a specific candle
         ...
@@ -84,15 +128,15 @@ class SignalRunner:
         try:
             # Use the signal generator to create signal for THIS specific candle
             signal_data = self.signal_generator.generate_signal(
-                candle['symbol'],
-                candle['timeframe'],
-                candle_id=candle['id']  # Pass the specific candle ID
+                candle.symbol,
+                candle.timeframe,
+                candle_id=candle.id  # Pass the specific candle ID
             )
             
             return signal_data
         
         except Exception as e:
-            print(f"  ✗ Error generating signal for candle {candle['id']}: {e}")
+            print(f"  ✗ Error generating signal for candle {candle.id}: {e}")
             return None
     
     def store_signal(self, signal_data: Dict) -> bool:
@@ -125,24 +169,63 @@ class SignalRunner:
         Returns:
             Number of signals generated
         """
-        # Find candles needing signals
-        candles = self.get_candles_without_signals(symbol, timeframe, limit=100)
-        
-        if not candles:
-            return 0
-        
-        print(f"  → Processing {len(candles)} candles...")
-        
         generated_count = 0
-        for candle in candles:
-            signal_data = self.generate_signal_for_candle(candle)
+        
+        # Score and store each streamed batch of pending candles in one pass
+        for candles in self.iter_candles_without_signals(symbol, timeframe, batch_size=500):
+            logger.debug("%s %s: processing %d candles", symbol, timeframe, len(candles))
+            
+            signals = self.signal_generator.generate_signals_batch(
+                symbol, timeframe, [candle.id for candle in candles]
+            )
             
-            if signal_data:
-                if self.store_signal(signal_data):
-                    generated_count += 1
+            generated_count += self.signal_generator.store_signals_bulk(signals)
         
         return generated_count
     
+    def process_parallel(self, tasks: Iterable[Tuple[str, str]],
+                         max_workers: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+        """
+        Process many symbol/timeframe pairs in a process pool
+        
+        Pairs are independent, so each worker generates and stores the
+        signals of one pair at a time with its own SignalRunner. Pairs are
+        submitted as `tasks` produces them, so a generator can hand over
+        each pair as soon as an earlier stage (indicators) finishes it.
+        
+        Args:
+            tasks: Iterable of (symbol, timeframe)
+            max_workers: Worker processes (default: CPU count)
+        
+        Yields:
+            (symbol, timeframe, signals generated) as pairs complete
+        """
+        workers = max_workers or os.cpu_count() or 1
+        if isinstance(tasks, (list, tuple)):
+            workers = min(workers, len(tasks))
+        
+        # Not worth starting a pool for a single pair
+        if workers <= 1:
+            for symbol, timeframe in tasks:
+                yield symbol, timeframe, self.process_symbol_timeframe(symbol, timeframe)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT,
+                                 initializer=_init_worker) as executor:
+            futures = {}
+            for symbol, timeframe in tasks:
+                futures[executor.submit(_process_partition, symbol, timeframe)] = (symbol, timeframe)
+            
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future]
+                try:
+                    count = future.result()
+                except Exception as e:
+                    print(f"  ✗ Error generating signals for {symbol} {timeframe}: {e}")
+                    count = 0
+                
+                yield symbol, timeframe, count
+    
     def run_for_all_symbols(self, symbols: List[str], timeframes: List[str]):
         """
         Generate signals for all symbols and timeframes
@@ -178,6 +261,31 @@ class SignalRunner:
         print("=" * 80)
 
 
+# ============================================
+# PROCESS POOL WORKERS
+# ============================================
+
+_worker_runner = None
+
+
+def _init_worker():
+    """
+    Set up one SignalRunner per worker process
+    
+    Workers start from POOL_CONTEXT, not a fork of the caller; any pooled
+    connections they still inherit are dropped (without closing them) so
+    each worker opens its own.
+    """
+    global _worker_runner
+    engine.dispose(close=False)
+    _worker_runner = SignalRunner(banner=False)
+
+
+def _process_partition(symbol: str, timeframe: str) -> int:
+    """Generate and store signals for one symbol/timeframe in a worker"""
+    return _worker_runner.process_symbol_timeframe(symbol, timeframe)
+
+
 # ============================================
 # TEST SCRIPT
 # ============================================
@@ -198,14 +306,14 @@ if __name__ == "__main__":
     
     if candles:
         for candle in candles:
-            print(f"  Candle #{candle['id']}: {candle['datetime']}")
+            print(f"  Candle #{candle.id}: {candle.datetime}")
         
         # Test generating signal for first candle
         print("\nTest 2: Generate signal for first candle")
         print("-" * 80)
         
         test_candle = candles[0]
-        print(f"Processing Candle #{test_candle['id']}: {test_candle['datetime']}")
+        print(f"Processing Candle #{test_candle.id}: {test_candle.datetime}")
         
         signal_data = runner.generate_signal_for_candle(test_candle)
         
@@ -225,7 +333,7 @@ if __name__ == "__main__":
             success = runner.store_signal(signal_data)
             
             if success:
-                print(f"  ✓ Successfully stored signal for Candle #{test_candle['id']}")
+                print(f"  ✓ Successfully stored signal for Candle #{test_candle.id}")
             else:
                 print(f"  ✗ Failed to store signal")
         else:
@@ -10,29 +10,67 @@ This script:
 4. Shows progress and statistics
 """
 
+import os
+import io
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import pandas as pd
+from psycopg2.extras import execute_values
 from indicators.rsi import RSICalculator
 from indicators.macd import MACDCalculator
 from indicators.ema import EMACalculator
 from sqlalchemy import text
 from database import engine
 
+# Above this many rows per symbol/timeframe, store through COPY
+COPY_THRESHOLD = 1000
+
+# Candle rows read from the server-side cursor at a time
+FETCH_CHUNK_SIZE = 10000
+
+# Rows per COPY transaction (override with INDICATOR_BATCH_SIZE)
+BATCH_SIZE = int(os.getenv('INDICATOR_BATCH_SIZE', 20000))
+
 def get_symbol_timeframe_combinations():
     """
     Get all unique symbol/timeframe combinations from candles table
     
+    Also returns where the stored indicators stop, so each combination
+    can be updated incrementally (one query shared by all calculators).
+    
     Returns:
-        List of tuples: [(symbol, timeframe, count), ...]
+        List of tuples: [(symbol, timeframe, count, last_indicator_dt, new_count), ...]
+        last_indicator_dt is None when no indicators exist yet; new_count
+        is the number of candles after it
     """
     try:
         with engine.connect() as connection:
             result = connection.execute(text("""
+                WITH combos AS (
+                    SELECT 
+                        c.symbol,
+                        c.timeframe,
+                        COUNT(*) as candle_count,
+                        MAX(c.datetime) FILTER (WHERE i.rsi IS NOT NULL) as last_indicator_dt
+                    FROM candles c
+                    LEFT JOIN indicators i ON c.id = i.candle_id
+                    GROUP BY c.symbol, c.timeframe
+                )
                 SELECT 
-                    symbol,
-                    timeframe,
-                    COUNT(*) as candle_count
-                FROM candles
-                GROUP BY symbol, timeframe
-                ORDER BY symbol, timeframe
+                    combos.symbol,
+                    combos.timeframe,
+                    combos.candle_count,
+                    combos.last_indicator_dt,
+                    (
+                        SELECT COUNT(*)
+                        FROM candles c
+                        WHERE c.symbol = combos.symbol
+                          AND c.timeframe = combos.timeframe
+                          AND (combos.last_indicator_dt IS NULL
+                               OR c.datetime > combos.last_indicator_dt)
+                    ) as new_count
+                FROM combos
+                ORDER BY combos.symbol, combos.timeframe
             """))
             
             combinations = result.fetchall()
@@ -41,12 +79,315 @@ def get_symbol_timeframe_combinations():
         print(f"✗ Error getting combinations: {e}")
         return []
 
-def calculate_all_indicators():
+def fetch_closes(symbol: str, timeframe: str, limit: int,
+                 latest: bool = False) -> pd.DataFrame:
+    """
+    Fetch candle ids and close prices (all RSI/MACD/EMA need)
+    
+    Args:
+        symbol: Trading pair
+        timeframe: Candle timeframe
+        limit: Number of candles
+        latest: Take the most recent candles instead of the oldest
+    
+    Returns:
+        DataFrame with id, datetime, close (oldest first)
+    """
+    order = 'DESC' if latest else 'ASC'
+    query = text(f"""
+        SELECT id, datetime, close
+        FROM candles
+        WHERE symbol = :symbol
+          AND timeframe = :timeframe
+        ORDER BY datetime {order}
+        LIMIT :limit
+    """)
+    
+    # Server-side cursor: rows arrive in chunks instead of one fetchall
+    with engine.connect().execution_options(
+        stream_results=True, yield_per=FETCH_CHUNK_SIZE
+    ) as connection:
+        chunks = pd.read_sql(query, connection, params={
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'limit': limit
+        }, coerce_float=True, chunksize=FETCH_CHUNK_SIZE)
+        
+        df = pd.concat(list(chunks), ignore_index=True)
+    
+    if latest:
+        df = df.iloc[::-1].reset_index(drop=True)
+    
+    return df
+
+def store_indicator_columns(df: pd.DataFrame, columns: List[str],
+                            batch_size: int = 1000) -> int:
+    """
+    Upsert the given indicator columns in multi-row INSERTs
+    
+    Only `columns` are written, so other indicators already stored for
+    the same candles are left alone.
+    
+    Args:
+        df: DataFrame with id and the indicator columns
+        columns: Indicator columns to store
+        batch_size: Rows per INSERT statement
+    
+    Returns:
+        Number of rows stored
+    """
+    if df.empty:
+        return 0
+    
+    update_set = ', '.join(f'{col} = EXCLUDED.{col}' for col in columns)
+    query = f"""
+        INSERT INTO indicators (candle_id, {', '.join(columns)})
+        VALUES %s
+        ON CONFLICT (candle_id)
+        DO UPDATE SET {update_set}
+    """
+    
+    # NaN (warm-up rows) is stored as NULL
+    values = df[columns].astype(object).where(df[columns].notna(), None)
+    values.insert(0, 'candle_id', df['id'].astype(int).astype(object))
+    
+    with engine.begin() as connection:
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            execute_values(cursor, query, list(values.itertuples(index=False, name=None)),
+                           page_size=batch_size)
+    
+    return len(values)
+
+def bulk_copy_indicators(df: pd.DataFrame, columns: List[str]) -> int:
+    """
+    Store the given indicator columns through COPY FROM STDIN
+    
+    Rows are streamed as CSV into a temporary staging table and upserted
+    from there in one statement (COPY itself cannot resolve conflicts
+    with rows already in indicators). Meant for full-history loads.
+    
+    Args:
+        df: DataFrame with id and the indicator columns
+        columns: Indicator columns to store
+    
+    Returns:
+        Number of rows stored
+    """
+    if df.empty:
+        return 0
+    
+    column_list = ', '.join(['candle_id'] + columns)
+    update_set = ', '.join(f'{col} = EXCLUDED.{col}' for col in columns)
+    
+    # Empty CSV fields (NaN warm-up rows) are loaded as NULL
+    frame = df[['id'] + columns]
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"""
+            CREATE TEMP TABLE indicators_stage ON COMMIT DROP AS
+            SELECT {column_list} FROM indicators WITH NO DATA
+        """)
+        cursor.copy_expert(f"COPY indicators_stage ({column_list}) FROM STDIN WITH CSV", buffer)
+        cursor.execute(f"""
+            INSERT INTO indicators ({column_list})
+            SELECT {column_list} FROM indicators_stage
+            ON CONFLICT (candle_id)
+            DO UPDATE SET {update_set}
+        """)
+        raw.commit()
+        return len(frame)
+    
+    except Exception:
+        raw.rollback()
+        raise
+    
+    finally:
+        raw.close()
+
+def calculate_all_for_symbol(symbol: str, timeframe: str, calculators: list,
+                             limit: int, latest: bool = False,
+                             store_last: Optional[int] = None) -> int:
+    """
+    Calculate RSI, MACD and EMA for one symbol/timeframe in a single pass
+    
+    Candles are read once, every calculator runs on the same DataFrame
+    and all their columns are written in one upsert (through COPY, in
+    transactions of BATCH_SIZE rows, for more than COPY_THRESHOLD rows).
+    
+    Args:
+        symbol: Trading pair
+        timeframe: Candle timeframe
+        calculators: Calculators to run (RSI, MACD, EMA)
+        limit: Number of candles
+        latest: Use the most recent `limit` candles
+        store_last: Only store the last N rows (the rest are warm-up)
+    
+    Returns:
+        Number of candles stored
+    """
+    try:
+        df = fetch_closes(symbol, timeframe, limit, latest=latest)
+        
+        if df.empty:
+            print(f"  ⚠️  No candles found for {symbol} {timeframe}")
+            return 0
+        
+        print(f"  📊 Fetched {len(df):,} candles")
+        
+        columns = []
+        for calc in calculators:
+            df = calc.calculate(df)
+            # Too few candles leaves the calculator's columns out
+            calc_columns = [col for col in calc.get_indicator_columns() if col in df]
+            if calc_columns:
+                columns += calc_columns
+                print(f"  ✓ Calculated {calc.indicator_name}")
+        
+        if not columns:
+            return 0
+        
+        if store_last is not None:
+            df = df.tail(store_last)
+        
+        if len(df) > COPY_THRESHOLD:
+            # Committed per batch so no single transaction grows unbounded
+            stored = 0
+            for start in range(0, len(df), BATCH_SIZE):
+                stored += bulk_copy_indicators(df.iloc[start:start + BATCH_SIZE], columns)
+            return stored
+        
+        return store_indicator_columns(df, columns)
+    
+    except Exception as e:
+        print(f"  ✗ Error calculating indicators for {symbol} {timeframe}: {e}")
+        import traceback
+        traceback.print_exc()
+        return 0
+
+def drop_indicator_indexes() -> List[str]:
+    """
+    Drop the secondary indexes of the indicators table
+    
+    Unique indexes (the primary key and candle_id, which the upserts
+    rely on) are kept.
+    
+    Returns:
+        CREATE INDEX statements of the dropped indexes
+    """
+    with engine.begin() as connection:
+        indexes = connection.execute(text("""
+            SELECT schemaname, indexname, indexdef
+            FROM pg_indexes
+            WHERE tablename = 'indicators'
+              AND schemaname = current_schema()
+              AND indexdef NOT LIKE 'CREATE UNIQUE INDEX%'
+            ORDER BY indexname
+        """)).fetchall()
+        
+        for schema, name, definition in indexes:
+            # Printed so they can be recreated by hand if the load dies
+            print(f"   Dropping {name}: {definition}")
+            connection.execute(text(f'DROP INDEX IF EXISTS "{schema}"."{name}"'))
+    
+    return [definition for _, _, definition in indexes]
+
+def recreate_indexes(definitions: List[str], max_workers: int = 4):
+    """
+    Run CREATE INDEX statements concurrently, one connection each
+    
+    Args:
+        definitions: CREATE INDEX statements
+        max_workers: Indexes built at the same time
+    """
+    def create(definition):
+        with engine.begin() as connection:
+            connection.execute(text(definition))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(create, definition): definition for definition in definitions}
+        
+        for future in as_completed(futures):
+            try:
+                future.result()
+                print(f"   ✓ {futures[future]}")
+            except Exception as e:
+                print(f"   ✗ Error recreating index ({futures[future]}): {e}")
+
+_calculators = None
+
+def get_calculators() -> list:
+    """
+    RSI, MACD and EMA calculators with the dashboard settings
+    
+    Built once per process (each pool worker gets its own).
+    """
+    global _calculators
+    if _calculators is None:
+        _calculators = [
+            RSICalculator(rsi_length=14, rsi_ema_length=21),
+            MACDCalculator(fast=9, slow=21, signal=5, ma_type='EMA', signal_type='EMA'),
+            EMACalculator(ema_44=44, ema_100=100, ema_200=200)
+        ]
+    return _calculators
+
+def _init_worker():
+    """
+    Drop pooled connections inherited from the parent (without closing
+    them) so each worker process opens its own
+    """
+    engine.dispose(close=False)
+
+def process_one(symbol: str, timeframe: str, count: int, processed: int,
+                run_args: dict) -> int:
+    """
+    Calculate and store RSI/MACD/EMA for one symbol/timeframe
+    
+    Top-level so it can run in a worker process.
+    
+    Args:
+        symbol: Trading pair
+        timeframe: Candle timeframe
+        count: Total candles of the combination
+        processed: Candles being (re)calculated
+        run_args: limit/latest/store_last for calculate_all_for_symbol
+    
+    Returns:
+        Number of candles stored
+    """
+    print("\n" + "─" * 80)
+    print(f"Processing {symbol} {timeframe} ({processed:,} of {count:,} candles)")
+    print("─" * 80)
+    
+    stored = calculate_all_for_symbol(symbol, timeframe, get_calculators(), **run_args)
+    print(f"   ✓ {symbol} {timeframe}: stored {stored:,} RSI/MACD/EMA values")
+    
+    return stored
+
+def calculate_all_indicators(full: bool = False, reindex: bool = False,
+                             max_workers: Optional[int] = None):
     """
     Calculate RSI, MACD, and EMA for all symbol/timeframe combinations
+    
+    By default only candles after the last stored indicator are
+    recalculated, on top of a warm-up window so EMA/MACD seeds match a
+    full run. Combinations without indicators get the full history.
+    
+    Args:
+        full: Recalculate the full history of every combination
+        reindex: Drop the secondary indicators indexes for the load and
+            rebuild them afterwards (worth it for large full loads)
+        max_workers: Worker processes (default: CPU count)
     """
     print("=" * 80)
-    print("CALCULATE ALL INDICATORS - Full Historical Data")
+    if full:
+        print("CALCULATE ALL INDICATORS - Full Historical Data")
+    else:
+        print("CALCULATE ALL INDICATORS - New Candles Only")
     print("=" * 80)
     
     # Get all combinations
@@ -57,38 +398,63 @@ def calculate_all_indicators():
         return
     
     print(f"\n📊 Found {len(combinations)} symbol/timeframe combinations:")
-    for symbol, timeframe, count in combinations:
-        print(f"   {symbol:<15} {timeframe:<6} {count:>6,} candles")
+    for symbol, timeframe, count, last_dt, new_count in combinations:
+        print(f"   {symbol:<15} {timeframe:<6} {count:>6,} candles ({new_count:,} new)")
     
     # Initialize calculators
-    rsi_calc = RSICalculator(rsi_length=14, rsi_ema_length=21)
-    macd_calc = MACDCalculator(fast=9, slow=21, signal=5, ma_type='EMA', signal_type='EMA')
-    ema_calc = EMACalculator(ema_44=44, ema_100=100, ema_200=200)
+    rsi_calc, macd_calc, ema_calc = get_calculators()
     
-    # Process each combination
-    total_processed = 0
+    # Candles before the first new one, so EMA/MACD are seeded as in a full
+    # run: the seed's weight in an EMA decays as (1 - 2/(n+1))^k, i.e. to
+    # ~e^-10 after 5 periods of the longest EMA (EMA 200 also refuses to
+    # calculate on fewer than 250 candles)
+    warmup = 5 * max(ema_calc.ema_200, macd_calc.slow + macd_calc.signal)
     
-    for symbol, timeframe, count in combinations:
-        print("\n" + "─" * 80)
-        print(f"Processing {symbol} {timeframe} ({count:,} candles)")
-        print("─" * 80)
-        
-        # Calculate RSI
-        print("\n1️⃣  Calculating RSI...")
-        rsi_stored = rsi_calc.run(symbol, timeframe, limit=count)
-        print(f"   ✓ Stored {rsi_stored:,} RSI values")
-        
-        # Calculate MACD
-        print("\n2️⃣  Calculating MACD...")
-        macd_stored = macd_calc.run(symbol, timeframe, limit=count)
-        print(f"   ✓ Stored {macd_stored:,} MACD values")
+    # One task per combination that needs work
+    tasks = []
+    for symbol, timeframe, count, last_dt, new_count in combinations:
+        if full or last_dt is None:
+            # Full history
+            run_args = {'limit': count}
+            processed = count
+        elif new_count == 0:
+            print(f"\n→ {symbol} {timeframe}: up to date")
+            continue
+        else:
+            # Latest candles only; store just the new ones
+            run_args = {'limit': new_count + warmup, 'latest': True, 'store_last': new_count}
+            processed = new_count
         
-        # Calculate EMA
-        print("\n3️⃣  Calculating EMA...")
-        ema_stored = ema_calc.run(symbol, timeframe, limit=count)
-        print(f"   ✓ Stored {ema_stored:,} EMA values")
-        
-        total_processed += count
+        tasks.append((symbol, timeframe, count, processed, run_args))
+    
+    total_processed = sum(task[3] for task in tasks)
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    
+    dropped_indexes = []
+    if reindex:
+        print("\n🗑️  Dropping secondary indicators indexes...")
+        dropped_indexes = drop_indicator_indexes()
+    
+    try:
+        # Combinations are independent: calculate them in parallel
+        if workers <= 1:
+            for task in tasks:
+                process_one(*task)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                futures = {executor.submit(process_one, *task): task for task in tasks}
+                
+                for future in as_completed(futures):
+                    symbol, timeframe = futures[future][:2]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"  ✗ Error processing {symbol} {timeframe}: {e}")
+    
+    finally:
+        if dropped_indexes:
+            print(f"\n🔨 Recreating {len(dropped_indexes)} indicators indexes...")
+            recreate_indexes(dropped_indexes)
     
     # Final summary
     print("\n" + "=" * 80)
@@ -117,4 +483,16 @@ def calculate_all_indicators():
     print("─" * 80)
 
 if __name__ == "__main__":
-    calculate_all_indicators()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Calculate RSI, MACD and EMA for all candles')
+    parser.add_argument('--full', action='store_true',
+                       help='Recalculate the full history instead of only new candles')
+    parser.add_argument('--reindex', action='store_true',
+                       help='Drop secondary indicators indexes during the load and rebuild them after')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: CPU count)')
+    
+    args = parser.parse_args()
+    
+    calculate_all_indicators(full=args.full, reindex=args.reindex, max_workers=args.workers)
\ No newline at end of file
@@ -9,16 +9,270 @@ Matches TradingView Pine Script entry tracking logic:
 - Recovery tracking
 """
 
+import asyncio
+import logging
 import pandas as pd
+import numpy as np
 from sqlalchemy import text
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from collections import defaultdict
+from contextlib import contextmanager
+from psycopg2.extras import execute_values
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import engine
 
+logger = logging.getLogger(__name__)
+
+# Entries updated at once by update_entry_prices_async (one pooled
+# connection each; database.engine has pool_size=10)
+MAX_CONCURRENT_UPDATES = 10
+
+# Columns written back after each price update, with their SQL types
+# (needed to type NULLs in the bulk VALUES list)
+ENTRY_STATE_TYPES = {
+    'current_price': 'numeric',
+    'peak_price': 'numeric',
+    'peak_datetime': 'timestamp',
+    'current_profit_pct': 'numeric',
+    'max_profit_pct': 'numeric',
+    'final_profit_pct': 'numeric',
+    
+    'validation_status': 'varchar',
+    'validation_datetime': 'timestamp',
+    'validation_candles_count': 'integer',
+    
+    'exit_status': 'varchar',
+    'exit_price': 'numeric',
+    'exit_datetime': 'timestamp',
+    'exit_reason': 'varchar',
+    
+    'exit_1_hit': 'boolean',
+    'exit_1_datetime': 'timestamp',
+    'exit_1_price': 'numeric',
+    
+    'exit_2_hit': 'boolean',
+    'exit_2_datetime': 'timestamp',
+    'exit_2_price': 'numeric',
+    
+    'exit_3_hit': 'boolean',
+    'exit_3_datetime': 'timestamp',
+    'exit_3_price': 'numeric',
+    
+    'trailing_stop_active': 'boolean',
+    'trailing_stop_price': 'numeric',
+    
+    'recovery_attempt': 'boolean',
+    'recovery_low_price': 'numeric',
+    'recovery_datetime': 'timestamp'
+}
+ENTRY_STATE_COLUMNS = list(ENTRY_STATE_TYPES)
+
+UPDATE_ENTRY_SQL = text(f"""
+    UPDATE entry_tracking SET
+        {', '.join(f'{col} = :{col}' for col in ENTRY_STATE_COLUMNS)},
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = :entry_id
+""")
+
+
+def bulk_update_statement(columns: List[str]) -> Tuple[str, str]:
+    """UPDATE ... FROM (VALUES %s) statement and its execute_values template"""
+    sql = f"""
+    UPDATE entry_tracking AS e SET
+        {', '.join(f'{col} = v.{col}' for col in columns)},
+        updated_at = CURRENT_TIMESTAMP
+    FROM (VALUES %s) AS v(id, {', '.join(columns)})
+    WHERE e.id = v.id
+"""
+    template = '(%(id)s::integer, {})'.format(
+        ', '.join(f'%({col})s::{ENTRY_STATE_TYPES[col]}' for col in columns)
+    )
+    return sql, template
+
+
+# One UPDATE per page of entries for execute_values
+BULK_UPDATE_ENTRIES_SQL, BULK_UPDATE_ENTRIES_TEMPLATE = bulk_update_statement(ENTRY_STATE_COLUMNS)
+
+# Columns a tick moves when it cannot change the entry's stage
+QUIET_ENTRY_COLUMNS = ['current_price', 'peak_price', 'peak_datetime', 'current_profit_pct',
+                       'max_profit_pct', 'validation_candles_count']
+BULK_UPDATE_QUIET_ENTRIES_SQL, BULK_UPDATE_QUIET_ENTRIES_TEMPLATE = bulk_update_statement(QUIET_ENTRY_COLUMNS)
+
+# ATR multiples of the EXIT-1/2/3 targets per timeframe (Intraday up to
+# 4h, Swing above; unknown timeframes count as Swing)
+EXIT_TARGET_MULTIPLIERS = {
+    '15m': (2, 3, 4),
+    '1h': (2, 3, 4),
+    '4h': (2, 3, 4),
+    '1d': (4, 6, 8)
+}
+SWING_TARGET_MULTIPLIERS = (4, 6, 8)
+
+# Exit statuses of entries still being tracked, and the signals that exit them
+LIVE_EXIT_STATUSES = ['ACTIVE', 'EXIT-1', 'EXIT-2', 'TRAILING-STOP', 'RECOVERY']
+EXIT_SIGNALS = ['CAUTION', 'SELL']
+
+# EXIT-1 target of the entry aliased "e", as SQL
+EXIT_1_TARGET_SQL = "(e.entry_price + CASE e.timeframe {} ELSE {} END * COALESCE(e.atr_at_entry, 0))".format(
+    ' '.join(f"WHEN '{tf}' THEN {m[0]}" for tf, m in EXIT_TARGET_MULTIPLIERS.items()),
+    SWING_TARGET_MULTIPLIERS[0]
+)
+
+# Price update of an entry whose stage cannot change on this tick: the SQL
+# form of quiet_entries_mask() + apply_quiet_prices(). Only the trivial
+# case is handled here (INVALIDATED, or VALID/ACTIVE with no target hit,
+# no trailing stop and the price strictly between the stop-loss and the
+# EXIT-1 target, without a CAUTION/SELL signal); every other tick matches
+# no row and goes through evaluate_entry_price().
+UPDATE_QUIET_ENTRY_SQL = f"""
+    UPDATE entry_tracking AS e SET
+        current_price = :current_price,
+        peak_price = GREATEST(e.peak_price, :current_price),
+        peak_datetime = CASE WHEN :current_price > e.peak_price
+                             THEN :current_datetime ELSE e.peak_datetime END,
+        current_profit_pct = (:current_price - e.entry_price) / e.entry_price * 100,
+        max_profit_pct = (GREATEST(e.peak_price, :current_price) - e.entry_price) / e.entry_price * 100,
+        validation_candles_count = e.validation_candles_count + 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE e.id = :entry_id
+      AND e.exit_status IN ({', '.join(f"'{status}'" for status in LIVE_EXIT_STATUSES)})
+      AND (
+          e.validation_status = 'INVALIDATED'
+          OR (
+              e.validation_status = 'VALID'
+              AND e.exit_status = 'ACTIVE'
+              AND NOT (COALESCE(e.exit_1_hit, false) OR COALESCE(e.exit_2_hit, false)
+                       OR COALESCE(e.exit_3_hit, false) OR COALESCE(e.trailing_stop_active, false))
+              AND :current_price > e.stop_loss
+              AND :current_price < {EXIT_1_TARGET_SQL}
+          )
+      )
+      AND COALESCE((
+          SELECT s.signal
+          FROM signals s
+          WHERE s.symbol = e.symbol
+            AND s.timeframe = e.timeframe
+            AND s.datetime <= :current_datetime
+          ORDER BY s.datetime DESC
+          LIMIT 1
+      ), '') NOT IN ({', '.join(f"'{signal}'" for signal in EXIT_SIGNALS)})
+    RETURNING e.id
+"""
+
+# Columns read to evaluate an entry: identity, entry levels and tracked
+# state (numerics come back as floats, see EntryTracker.__init__)
+ENTRY_COLUMNS = ['id', 'symbol', 'timeframe', 'entry_signal', 'entry_datetime',
+                 'entry_price', 'stop_loss', 'target_price', 'atr_at_entry',
+                 'max_validation_candles'] + ENTRY_STATE_COLUMNS
+
+SELECT_ENTRIES_SQL = "SELECT {} FROM entry_tracking".format(', '.join(ENTRY_COLUMNS))
+
+ENTRY_DATETIME_COLUMNS = ['entry_datetime'] + [
+    col for col, sql_type in ENTRY_STATE_TYPES.items() if sql_type == 'timestamp'
+]
+
+# Entries by id, skipping ones that have already exited (nothing to update)
+NOT_EXITED_SQL = " AND exit_status NOT IN ('SIGNAL-EXIT', 'EXIT-3', 'STOP-LOSS')"
+ENTRIES_BY_ID_SQL = text(SELECT_ENTRIES_SQL + " WHERE id = ANY(:entry_ids)" + NOT_EXITED_SQL)
+
+# One round trip per tick: writes a quiet tick (UPDATE_QUIET_ENTRY_SQL)
+# and returns nothing, or leaves the entry untouched and returns it with
+# its latest signal for evaluate_entry_price() (nothing if it has exited)
+UPDATE_QUIET_OR_SELECT_ENTRY_SQL = text(f"""
+    WITH quiet AS ({UPDATE_QUIET_ENTRY_SQL})
+    SELECT {', '.join(f'e.{col}' for col in ENTRY_COLUMNS)},
+           ls.signal AS latest_signal, ls.datetime AS latest_signal_datetime
+    FROM entry_tracking e
+    LEFT JOIN LATERAL (
+        SELECT signal, datetime
+        FROM signals
+        WHERE symbol = e.symbol
+          AND timeframe = e.timeframe
+          AND datetime <= :current_datetime
+        ORDER BY datetime DESC
+        LIMIT 1
+    ) AS ls ON true
+    WHERE e.id = :entry_id
+      AND NOT EXISTS (SELECT 1 FROM quiet)
+      {NOT_EXITED_SQL.strip()}
+""")
+
+# Active entries, newest first, keyed by (filter by symbol, filter by timeframe)
+ACTIVE_ENTRIES_SQL = {
+    (by_symbol, by_timeframe): text(
+        SELECT_ENTRIES_SQL + " WHERE active = true"
+        + (" AND symbol = :symbol" if by_symbol else "")
+        + (" AND timeframe = :timeframe" if by_timeframe else "")
+        + " ORDER BY entry_datetime DESC"
+    )
+    for by_symbol in (False, True)
+    for by_timeframe in (False, True)
+}
+
+# BUY/A-BUY signal with its ATR and the id of any entry already tracking it
+SELECT_SIGNAL_FOR_ENTRY_SQL = text("""
+    SELECT 
+        s.id, s.symbol, s.timeframe, s.datetime, s.signal,
+        s.entry_price, s.stop_loss, s.target_price,
+        s.score_total, s.current_price,
+        i.atr,
+        e.id AS existing_entry_id
+    FROM signals s
+    LEFT JOIN indicators i ON s.candle_id = i.candle_id
+    LEFT JOIN entry_tracking e ON e.signal_id = s.id
+    WHERE s.id = :signal_id
+      AND s.signal IN ('BUY', 'A-BUY')
+    LIMIT 1
+""")
+
+INSERT_ENTRY_SQL = text("""
+    INSERT INTO entry_tracking (
+        signal_id, symbol, timeframe,
+        entry_signal, entry_datetime, entry_price, entry_score,
+        stop_loss, target_price, atr_at_entry,
+        peak_price, current_price,
+        max_validation_candles
+    ) VALUES (
+        :signal_id, :symbol, :timeframe,
+        :entry_signal, :entry_datetime, :entry_price, :entry_score,
+        :stop_loss, :target_price, :atr_at_entry,
+        :peak_price, :current_price,
+        :max_validation_candles
+    )
+    RETURNING id
+""")
+
+# Latest signal at or before a datetime, for one / many symbol-timeframes
+LATEST_SIGNAL_SQL = text("""
+    SELECT signal, datetime
+    FROM signals 
+    WHERE symbol = :symbol 
+    AND timeframe = :timeframe 
+    AND datetime <= :current_datetime
+    ORDER BY datetime DESC
+    LIMIT 1
+""")
+
+# One LIMIT 1 index seek per pair (idx_signals_sym_tf_dt), instead of
+# reading and ranking every earlier signal of the pair
+LATEST_SIGNALS_SQL = text("""
+    SELECT p.symbol, p.timeframe, s.signal, s.datetime
+    FROM unnest(:symbols, :timeframes) AS p(symbol, timeframe)
+    CROSS JOIN LATERAL (
+        SELECT signal, datetime
+        FROM signals
+        WHERE symbol = p.symbol
+          AND timeframe = p.timeframe
+          AND datetime <= :as_of
+        ORDER BY datetime DESC
+        LIMIT 1
+    ) AS s
+""")
+
 class EntryTracker:
     """
     Track and manage trading entries
@@ -32,7 +286,27 @@ class EntryTracker:
     """
     
     def __init__(self):
-        self.engine = engine
+        # NUMERIC columns come back as floats (see database.DECIMAL_AS_FLOAT)
+        self.engine = engine.execution_options(decimal_as_float=True)
+    
+    @contextmanager
+    def _connection(self, conn=None, savepoint: bool = False):
+        """
+        Yield the caller's connection, or a pooled one committed on exit
+        
+        Batch drivers pass one connection to every helper instead of each
+        helper checking one out. Statements that may fail on a shared
+        connection run in a SAVEPOINT so they do not abort the batch.
+        """
+        if conn is None:
+            with self.engine.connect() as own:
+                yield own
+                own.commit()
+        elif savepoint:
+            with conn.begin_nested():
+                yield conn
+        else:
+            yield conn
     
     def create_entry_from_signal(self, signal_id: int, max_validation_candles: int = 3):
         """
@@ -46,65 +320,29 @@ class EntryTracker:
             entry_id or None if failed
         """
         try:
-            with self.engine.connect() as conn:
-                # Fetch signal details
-                query = text("""
-                    SELECT 
-                        id, symbol, timeframe, datetime, signal,
-                        entry_price, stop_loss, target_price,
-                        score_total, current_price
-                    FROM signals
-                    WHERE id = :signal_id
-                      AND signal IN ('BUY', 'A-BUY')
-                """)
+            # Autocommit: the lookup needs no transaction and the INSERT is
+            # a single statement
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                # Fetch signal details, its ATR and any existing entry in one query
+                query = SELECT_SIGNAL_FOR_ENTRY_SQL
                 
                 result = conn.execute(query, {'signal_id': signal_id}).fetchone()
                 
                 if result is None:
-                    print(f"  ⚠️  Signal {signal_id} not found or not a BUY signal")
+                    logger.warning("Signal %s not found or not a BUY signal", signal_id)
                     return None
                 
                 signal = dict(result._mapping)
                 
                 # Check if entry already exists
-                check_query = text("""
-                    SELECT id FROM entry_tracking WHERE signal_id = :signal_id
-                """)
-                existing = conn.execute(check_query, {'signal_id': signal_id}).fetchone()
-                
-                if existing:
-                    print(f"  ⚠️  Entry already exists for signal {signal_id}")
-                    return existing[0]
-                
-                # Fetch ATR
-                atr_query = text("""
-                    SELECT i.atr
-                    FROM signals s
-                    JOIN indicators i ON s.candle_id = i.candle_id
-                    WHERE s.id = :signal_id
-                """)
-                atr_result = conn.execute(atr_query, {'signal_id': signal_id}).fetchone()
-                atr = float(atr_result[0]) if atr_result and atr_result[0] else 0.0
+                if signal['existing_entry_id'] is not None:
+                    logger.info("Entry already exists for signal %s", signal_id)
+                    return signal['existing_entry_id']
+                
+                atr = float(signal['atr']) if signal['atr'] else 0.0
                 
                 # Create entry
-                insert_query = text("""
-                    INSERT INTO entry_tracking (
-                        signal_id, symbol, timeframe,
-                        entry_signal, entry_datetime, entry_price, entry_score,
-                        stop_loss, target_price, atr_at_entry,
-                        peak_price, current_price,
-                        max_validation_candles
-                    ) VALUES (
-                        :signal_id, :symbol, :timeframe,
-                        :entry_signal, :entry_datetime, :entry_price, :entry_score,
-                        :stop_loss, :target_price, :atr_at_entry,
-                        :peak_price, :current_price,
-                        :max_validation_candles
-                    )
-                    RETURNING id
-                """)
-                
-                entry_id = conn.execute(insert_query, {
+                entry_id = conn.execute(INSERT_ENTRY_SQL, {
                     'signal_id': signal['id'],
                     'symbol': signal['symbol'],
                     'timeframe': signal['timeframe'],
@@ -120,410 +358,864 @@ class EntryTracker:
                     'max_validation_candles': max_validation_candles
                 }).fetchone()[0]
                 
-                conn.commit()
-                
-                print(f"  ✓ Created entry #{entry_id} for {signal['symbol']} {signal['timeframe']} {signal['signal']}")
+                logger.info("✓ Created entry #%s for %s %s %s", entry_id,
+                            signal['symbol'], signal['timeframe'], signal['signal'])
                 return entry_id
         
-        except Exception as e:
-            print(f"  ✗ Error creating entry from signal {signal_id}: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error creating entry from signal %s", signal_id)
             return None
     
     def get_active_entries(self, symbol: Optional[str] = None, 
-                          timeframe: Optional[str] = None) -> List[Dict]:
+                          timeframe: Optional[str] = None, as_frame: bool = False):
         """
         Get all active entries (not exited)
         
+        Rows are read straight into a DataFrame (float64 numerics, datetime
+        columns parsed) rather than one mapping per row.
+        
+        Args:
+            symbol: Only entries for this symbol
+            timeframe: Only entries for this timeframe
+            as_frame: Return the DataFrame itself (for vectorized callers)
+        
         Returns:
-            List of entry dicts
+            List of entry dicts (None for NULLs), or a DataFrame if as_frame
         """
         try:
-            with self.engine.connect() as conn:
-                query = "SELECT * FROM entry_tracking WHERE active = true"
+            # Read-only: no BEGIN/ROLLBACK around the SELECT
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
                 params = {}
                 
                 if symbol:
-                    query += " AND symbol = :symbol"
                     params['symbol'] = symbol
                 
                 if timeframe:
-                    query += " AND timeframe = :timeframe"
                     params['timeframe'] = timeframe
                 
-                query += " ORDER BY entry_datetime DESC"
-                
-                result = conn.execute(text(query), params)
-                
-                entries = []
-                for row in result:
-                    entry = dict(row._mapping)
-                    # Convert Decimal to float
-                    for key in entry:
-                        if entry[key] is not None and hasattr(entry[key], '__float__'):
-                            entry[key] = float(entry[key])
-                    entries.append(entry)
-                
-                return entries
+                query = ACTIVE_ENTRIES_SQL[bool(symbol), bool(timeframe)]
+                df = pd.read_sql(query, conn, params=params, coerce_float=True,
+                                 parse_dates=ENTRY_DATETIME_COLUMNS)
+            
+            if as_frame:
+                return df
+            
+            return df.astype(object).where(df.notna(), None).to_dict('records')
         
-        except Exception as e:
-            print(f"  ✗ Error getting active entries: {e}")
-            return []
+        except Exception:
+            logger.exception("Error getting active entries")
+            return pd.DataFrame() if as_frame else []
     
-    def update_entry_price(self, entry_id: int, current_price: float, 
-                          current_datetime: datetime):
+    def get_latest_signals(self, pairs: List[Tuple[str, str]], as_of: datetime,
+                           conn=None) -> Optional[Dict[Tuple[str, str], Tuple[str, datetime]]]:
         """
-        Update entry with current price and check for all exit conditions
+        Get the latest signal at or before `as_of` for many symbol/timeframes
         
-        Exit Stages:
-        - EXIT-1: First target hit (2x ATR for Intraday, 4x for Swing)
-        - EXIT-2: Second target hit (3x ATR for Intraday, 6x for Swing)
-        - EXIT-3: Final target hit (4x ATR for Intraday, 8x for Swing)
-        - STOP-LOSS: Stop loss hit
-        - RECOVERY: Attempting recovery after drawdown
+        One query (a LIMIT 1 seek per pair) replaces a lookup per entry.
+        
+        Args:
+            pairs: (symbol, timeframe) pairs
+            as_of: Latest signal datetime to consider
+            conn: Connection to reuse (default: a pooled one)
+        
+        Returns:
+            {(symbol, timeframe): (signal, datetime)} (pairs without a signal
+            are missing), or None if the query failed
         """
+        if not pairs:
+            return {}
+        
         try:
-            with self.engine.connect() as conn:
-                # Fetch entry
-                query = text("SELECT * FROM entry_tracking WHERE id = :entry_id")
-                result = conn.execute(query, {'entry_id': entry_id}).fetchone()
+            with self._connection(conn, savepoint=True) as conn:
+                query = LATEST_SIGNALS_SQL
                 
-                if result is None:
-                    return
+                result = conn.execute(query, {
+                    'symbols': [symbol for symbol, _ in pairs],
+                    'timeframes': [timeframe for _, timeframe in pairs],
+                    'as_of': as_of
+                })
                 
-                entry = dict(result._mapping)
+                return {(row[0], row[1]): (row[2], row[3]) for row in result}
+        
+        except Exception:
+            logger.exception("Error getting latest signals")
+            return None
+    
+    def update_entries(self, updates: List[Tuple[Dict, float, datetime]]):
+        """
+        Update many entries, looking their exit signals up in batches
+        
+        Updates are applied in datetime order; all entries priced at the
+        same datetime share one get_latest_signals() query. Entry state is
+        carried in memory from one update to the next and the final state
+        of every entry is written in one bulk UPDATE and one commit.
+        
+        Args:
+            updates: (entry dict, current_price, current_datetime) tuples
+        """
+        if not updates:
+            return
+        
+        try:
+            # One pooled connection and transaction for the whole batch
+            with self.engine.begin() as conn:
+                # Fresh rows, in case the caller's entry dicts are stale
+                entry_ids = list({entry['id'] for entry, _, _ in updates})
+                query = ENTRIES_BY_ID_SQL
+                states = {
+                    entry['id']: dict(entry)
+                    for entry in conn.execute(query, {'entry_ids': entry_ids}).mappings().all()
+                }
                 
-                # Skip if already exited (prevents duplicate SIGNAL-EXIT processing)
-                if entry['exit_status'] in ['SIGNAL-EXIT', 'EXIT-3', 'STOP-LOSS']:
-                    return
+                by_datetime = defaultdict(list)
+                for entry, current_price, current_datetime in updates:
+                    by_datetime[current_datetime].append((entry, current_price))
                 
-                # Convert Decimal to float
-                for key in ['entry_price', 'stop_loss', 'target_price', 'peak_price', 
-                           'current_price', 'trailing_stop_price', 'atr_at_entry']:
-                    if entry.get(key) is not None:
-                        entry[key] = float(entry[key])
-                
-                # Get timeframe type for multiplier
-                tf_type = 'Intraday' if entry['timeframe'] in ['15m', '1h', '4h'] else 'Swing'
-                atr = entry.get('atr_at_entry', 0)
-                
-                # Calculate exit targets
-                if tf_type == 'Intraday':
-                    exit_1_target = entry['entry_price'] + (2 * atr)
-                    exit_2_target = entry['entry_price'] + (3 * atr)
-                    exit_3_target = entry['entry_price'] + (4 * atr)
-                else:  # Swing
-                    exit_1_target = entry['entry_price'] + (4 * atr)
-                    exit_2_target = entry['entry_price'] + (6 * atr)
-                    exit_3_target = entry['entry_price'] + (8 * atr)
-                
-                # Update peak price if new high
-                peak_price = entry['peak_price']
-                peak_datetime = entry.get('peak_datetime')
-                
-                if current_price > peak_price:
-                    peak_price = current_price
-                    peak_datetime = current_datetime
-                
-                # Calculate profit percentages
-                current_profit_pct = ((current_price - entry['entry_price']) / entry['entry_price']) * 100
-                max_profit_pct = ((peak_price - entry['entry_price']) / entry['entry_price']) * 100
-                
-                # Initialize variables
-                trailing_stop_active = entry.get('trailing_stop_active', False)
-                trailing_stop_price = entry.get('trailing_stop_price')
-                
-                # Check validation status
-                validation_status = entry['validation_status']
-                validation_candles = entry['validation_candles_count'] + 1
-                validation_datetime = entry.get('validation_datetime')
-                
-                if validation_status == 'VALIDATING':
-                    # Check if price confirms entry (above entry price)
-                    if current_price >= entry['entry_price']:
-                        validation_status = 'VALID'
-                        validation_datetime = current_datetime
-                        print(f"    ✓ Entry #{entry_id} VALIDATED at ${current_price:.2f}")
-                    elif validation_candles >= entry['max_validation_candles']:
-                        validation_status = 'INVALIDATED'
-                        validation_datetime = current_datetime
-                        print(f"    ✗ Entry #{entry_id} INVALIDATED (price below entry after {validation_candles} candles)")
-                
-                # Exit condition tracking
-                exit_status = entry['exit_status']
-                exit_price = entry.get('exit_price')
-                exit_datetime = entry.get('exit_datetime')
-                exit_reason = entry.get('exit_reason')
-                
-                exit_1_hit = entry.get('exit_1_hit', False)
-                exit_1_datetime = entry.get('exit_1_datetime')
-                exit_1_price = entry.get('exit_1_price')
-                
-                exit_2_hit = entry.get('exit_2_hit', False)
-                exit_2_datetime = entry.get('exit_2_datetime')
-                exit_2_price = entry.get('exit_2_price')
-                
-                exit_3_hit = entry.get('exit_3_hit', False)
-                exit_3_datetime = entry.get('exit_3_datetime')
-                exit_3_price = entry.get('exit_3_price')
-                
-                recovery_attempt = entry.get('recovery_attempt', False)
-                recovery_low_price = entry.get('recovery_low_price')
-                recovery_datetime = entry.get('recovery_datetime')
-                final_profit_pct = entry.get('final_profit_pct')
-                
-                # =====================================================
-                # CHECK FOR SIGNAL-BASED EXIT (CAUTION/SELL)
-                # Exit on CAUTION/SELL even if entry not validated yet
-                # =====================================================
-                signal_query = text("""
-                    SELECT signal, datetime
-                    FROM signals 
-                    WHERE symbol = :symbol 
-                    AND timeframe = :timeframe 
-                    AND datetime <= :current_datetime
-                    ORDER BY datetime DESC
-                    LIMIT 1
-                """)
-
-                current_signal = conn.execute(signal_query, {
-                    'symbol': entry['symbol'],
-                    'timeframe': entry['timeframe'],
-                    'current_datetime': current_datetime
-                }).fetchone()
-                
-                # If latest signal is CAUTION or SELL, exit immediately (even if not validated)
-                if current_signal and current_signal[0] in ['CAUTION', 'SELL']:
-                    # Allow signal exit from VALIDATING, ACTIVE, EXIT-1, EXIT-2, TRAILING-STOP
-                    if exit_status in ['ACTIVE', 'EXIT-1', 'EXIT-2', 'TRAILING-STOP'] or validation_status == 'VALIDATING':
-                        exit_status = 'SIGNAL-EXIT'
-                        validation_status = 'INVALIDATED'  # Mark as invalidated since exiting early
-                        exit_price = current_price
-                        exit_datetime = current_datetime
-                        exit_reason = f'{current_signal[0]} signal at {current_signal[1]} - immediate exit'
-                        final_profit_pct = current_profit_pct
-                        print(f"    🚨 Entry #{entry_id} SIGNAL EXIT ({current_signal[0]})! Profit: {current_profit_pct:+.2f}%")
-                        
-                        # Update DB and return immediately
-                        update_query = text("""
-                            UPDATE entry_tracking SET
-                                current_price = :current_price,
-                                peak_price = :peak_price,
-                                peak_datetime = :peak_datetime,
-                                current_profit_pct = :current_profit_pct,
-                                max_profit_pct = :max_profit_pct,
-                                final_profit_pct = :final_profit_pct,
-                                validation_status = :validation_status,
-                                exit_status = :exit_status,
-                                exit_price = :exit_price,
-                                exit_datetime = :exit_datetime,
-                                exit_reason = :exit_reason,
-                                updated_at = CURRENT_TIMESTAMP
-                            WHERE id = :entry_id
-                        """)
-                        
-                        conn.execute(update_query, {
-                            'entry_id': entry_id,
-                            'current_price': current_price,
-                            'peak_price': peak_price,
-                            'peak_datetime': peak_datetime,
-                            'current_profit_pct': current_profit_pct,
-                            'max_profit_pct': max_profit_pct,
-                            'final_profit_pct': final_profit_pct,
-                            'validation_status': validation_status,
-                            'exit_status': exit_status,
-                            'exit_price': exit_price,
-                            'exit_datetime': exit_datetime,
-                            'exit_reason': exit_reason
-                        })
-                        
-                        conn.commit()
-                        return
+                changed = set()
                 
-                # Only process normal exits if validated
-                if validation_status == 'VALID':
-                    
-                    # =====================================================
-                    # NORMAL EXIT LOGIC (only if not signal-exited)
-                    # =====================================================
-                    
-                    # Check EXIT-3 (highest target)
-                    if not exit_3_hit and current_price >= exit_3_target:
-                        exit_3_hit = True
-                        exit_3_datetime = current_datetime
-                        exit_3_price = current_price
-                        exit_status = 'EXIT-3'
-                        exit_price = current_price
-                        exit_datetime = current_datetime
-                        exit_reason = 'Final target reached (EXIT-3) - Full exit'
-                        final_profit_pct = current_profit_pct
-                        print(f"    🎯🎯🎯 Entry #{entry_id} reached EXIT-3 FINAL target! Profit: +{current_profit_pct:.2f}%")
+                for current_datetime in sorted(by_datetime):
+                    group = by_datetime[current_datetime]
+                    pairs = list({(entry['symbol'], entry['timeframe']) for entry, _ in group})
+                    latest_signals = self.get_latest_signals(pairs, current_datetime, conn)
                     
-                    # Check EXIT-2 (second target)
-                    elif not exit_2_hit and current_price >= exit_2_target:
-                        exit_2_hit = True
-                        exit_2_datetime = current_datetime
-                        exit_2_price = current_price
-                        exit_status = 'EXIT-2'
-                        # Move trailing stop tighter
-                        trailing_stop_active = True
-                        trailing_stop_price = entry['entry_price'] + atr  # Entry + 1 ATR
-                        print(f"    🎯🎯 Entry #{entry_id} reached EXIT-2 target! Trailing stop → ${trailing_stop_price:.2f}")
-                    
-                    # Check EXIT-1 (first target)
-                    elif not exit_1_hit and current_price >= exit_1_target:
-                        exit_1_hit = True
-                        exit_1_datetime = current_datetime
-                        exit_1_price = current_price
-                        exit_status = 'EXIT-1'
-                        # Activate trailing stop at breakeven
-                        trailing_stop_active = True
-                        trailing_stop_price = entry['entry_price']
-                        print(f"    🎯 Entry #{entry_id} reached EXIT-1 target! Trailing stop → ${trailing_stop_price:.2f}")
-                    
-                    # Check trailing stop (if active and not fully exited)
-                    if trailing_stop_active and exit_status != 'EXIT-3':
-                        # Update trailing stop if price makes new high
-                        if exit_2_hit:
-                            # After EXIT-2, trail at Entry + 1 ATR from peak
-                            new_trailing_stop = peak_price - (2 * atr)
-                            if new_trailing_stop > trailing_stop_price:
-                                trailing_stop_price = new_trailing_stop
-                        elif exit_1_hit:
-                            # After EXIT-1, trail at breakeven until EXIT-2
-                            new_trailing_stop = entry['entry_price']
-                            trailing_stop_price = max(trailing_stop_price or 0, new_trailing_stop)
-                        
-                        # Check if trailing stop hit
-                        if current_price <= trailing_stop_price:
-                            exit_status = 'TRAILING-STOP'
-                            exit_price = current_price
-                            exit_datetime = current_datetime
-                            exit_reason = f'Trailing stop hit at ${trailing_stop_price:.2f}'
-                            final_profit_pct = current_profit_pct
-                            print(f"    ⚠️ Entry #{entry_id} trailing stop hit. Profit: {current_profit_pct:+.2f}%")
-                    
-                    # Check regular stop-loss (if not exited and no trailing stop)
-                    if exit_status == 'ACTIVE' and not trailing_stop_active:
-                        if current_price <= entry['stop_loss']:
-                            exit_status = 'STOP-LOSS'
-                            exit_price = current_price
-                            exit_datetime = current_datetime
-                            exit_reason = 'Stop loss hit'
-                            final_profit_pct = current_profit_pct
-                            print(f"    ❌ Entry #{entry_id} stop loss hit. Loss: {current_profit_pct:.2f}%")
-                    
-                    # Check recovery attempt (after deep drawdown)
-                    if exit_status in ['EXIT-1', 'EXIT-2'] and not exit_3_hit:
-                        # If price drops more than 50% from peak after hitting EXIT-1/2
-                        drawdown_pct = ((peak_price - current_price) / peak_price) * 100
-                        
-                        if drawdown_pct > 50 and not recovery_attempt:
-                            recovery_attempt = True
-                            recovery_low_price = current_price
-                            recovery_datetime = current_datetime
-                            exit_status = 'RECOVERY'
-                            print(f"    🔄 Entry #{entry_id} in RECOVERY mode. Drawdown: -{drawdown_pct:.1f}%")
-                        
-                        # Track lowest price during recovery
-                        if recovery_attempt:
-                            if current_price < (recovery_low_price or float('inf')):
-                                recovery_low_price = current_price
-                                recovery_datetime = current_datetime
-                
-                # Update database
-                update_query = text("""
-                    UPDATE entry_tracking SET
-                        current_price = :current_price,
-                        peak_price = :peak_price,
-                        peak_datetime = :peak_datetime,
-                        current_profit_pct = :current_profit_pct,
-                        max_profit_pct = :max_profit_pct,
-                        final_profit_pct = :final_profit_pct,
-                        
-                        validation_status = :validation_status,
-                        validation_datetime = :validation_datetime,
-                        validation_candles_count = :validation_candles_count,
+                    for entry, current_price in group:
+                        state = states.get(entry['id'])
+                        if state is None:
+                            continue
                         
-                        exit_status = :exit_status,
-                        exit_price = :exit_price,
-                        exit_datetime = :exit_datetime,
-                        exit_reason = :exit_reason,
+                        if latest_signals is not None:
+                            current_signal = latest_signals.get((state['symbol'], state['timeframe']))
+                        else:
+                            current_signal = self.get_latest_signal(
+                                state['symbol'], state['timeframe'], current_datetime, conn
+                            )
                         
-                        exit_1_hit = :exit_1_hit,
-                        exit_1_datetime = :exit_1_datetime,
-                        exit_1_price = :exit_1_price,
+                        entry_updates = self.evaluate_entry_price(
+                            state, current_price, current_datetime, current_signal
+                        )
                         
-                        exit_2_hit = :exit_2_hit,
-                        exit_2_datetime = :exit_2_datetime,
-                        exit_2_price = :exit_2_price,
-                        
-                        exit_3_hit = :exit_3_hit,
-                        exit_3_datetime = :exit_3_datetime,
-                        exit_3_price = :exit_3_price,
-                        
-                        trailing_stop_active = :trailing_stop_active,
-                        trailing_stop_price = :trailing_stop_price,
-                        
-                        recovery_attempt = :recovery_attempt,
-                        recovery_low_price = :recovery_low_price,
-                        recovery_datetime = :recovery_datetime,
-                        
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = :entry_id
-                """)
+                        if entry_updates:
+                            state.update(entry_updates)
+                            changed.add(state['id'])
                 
-                conn.execute(update_query, {
-                    'entry_id': entry_id,
+                self.bulk_update_entries([states[entry_id] for entry_id in changed], conn=conn)
+        
+        except Exception:
+            logger.exception("Error updating entries")
+    
+    def bulk_update_entries(self, entries: List[Dict], page_size: int = 500,
+                            conn=None, quiet: bool = False) -> int:
+        """
+        Write the tracked state of many entries in one transaction
+        
+        Rows are sent with execute_values as
+        UPDATE ... FROM (VALUES ...) AS v WHERE e.id = v.id.
+        
+        Args:
+            entries: Entry dicts (id plus ENTRY_STATE_COLUMNS)
+            page_size: Rows per UPDATE statement
+            conn: Connection to reuse (default: a pooled one, committed)
+            quiet: Only write QUIET_ENTRY_COLUMNS (entries whose stage did
+                   not change)
+        
+        Returns:
+            Number of entries written (0 if the transaction failed)
+        """
+        if not entries:
+            return 0
+        
+        if quiet:
+            columns = QUIET_ENTRY_COLUMNS
+            sql, template = BULK_UPDATE_QUIET_ENTRIES_SQL, BULK_UPDATE_QUIET_ENTRIES_TEMPLATE
+        else:
+            columns = ENTRY_STATE_COLUMNS
+            sql, template = BULK_UPDATE_ENTRIES_SQL, BULK_UPDATE_ENTRIES_TEMPLATE
+        
+        try:
+            params = [
+                {'id': entry['id'], **{col: entry.get(col) for col in columns}}
+                for entry in entries
+            ]
+            
+            with self._connection(conn) as conn:
+                with conn.connection.dbapi_connection.cursor() as cursor:
+                    execute_values(cursor, sql, params, template=template, page_size=page_size)
+            
+            return len(entries)
+        
+        except Exception:
+            logger.exception("Error bulk updating entries")
+            return 0
+    
+    def get_latest_signal(self, symbol: str, timeframe: str, 
+                          as_of: datetime, conn=None) -> Optional[Tuple[str, datetime]]:
+        """
+        Get the latest (signal, datetime) at or before `as_of`
+        """
+        
+        params = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'current_datetime': as_of
+        }
+        
+        with self._connection(conn) as conn:
+            return conn.execute(LATEST_SIGNAL_SQL, params).fetchone()
+    
+    def evaluate_entry_price(self, entry: Dict, current_price: float, 
+                             current_datetime: datetime,
+                             current_signal: Optional[Tuple[str, datetime]]) -> Optional[Dict]:
+        """
+        Apply one price to an entry and check for all exit conditions
+        
+        Exit Stages:
+        - EXIT-1: First target hit (2x ATR for Intraday, 4x for Swing)
+        - EXIT-2: Second target hit (3x ATR for Intraday, 6x for Swing)
+        - EXIT-3: Final target hit (4x ATR for Intraday, 8x for Swing)
+        - STOP-LOSS: Stop loss hit
+        - RECOVERY: Attempting recovery after drawdown
+        
+        Args:
+            entry: Entry state (an ENTRY_COLUMNS row)
+            current_price: Price to apply
+            current_datetime: Datetime of the price
+            current_signal: Latest (signal, datetime) at current_datetime
+        
+        Returns:
+            Changed columns (ENTRY_STATE_COLUMNS) or None if the entry has
+            already exited
+        """
+        # Skip if already exited (prevents duplicate SIGNAL-EXIT processing)
+        if entry['exit_status'] in ['SIGNAL-EXIT', 'EXIT-3', 'STOP-LOSS']:
+            return None
+        
+        # Calculate exit targets
+        m1, m2, m3 = EXIT_TARGET_MULTIPLIERS.get(entry['timeframe'], SWING_TARGET_MULTIPLIERS)
+        atr = entry.get('atr_at_entry') or 0.0
+        
+        exit_1_target = entry['entry_price'] + m1 * atr
+        exit_2_target = entry['entry_price'] + m2 * atr
+        exit_3_target = entry['entry_price'] + m3 * atr
+        
+        # Update peak price if new high
+        peak_price = entry['peak_price']
+        peak_datetime = entry.get('peak_datetime')
+        
+        if current_price > peak_price:
+            peak_price = current_price
+            peak_datetime = current_datetime
+        
+        # Calculate profit percentages
+        current_profit_pct = ((current_price - entry['entry_price']) / entry['entry_price']) * 100
+        max_profit_pct = ((peak_price - entry['entry_price']) / entry['entry_price']) * 100
+        
+        # Initialize variables
+        trailing_stop_active = entry.get('trailing_stop_active', False)
+        trailing_stop_price = entry.get('trailing_stop_price')
+        
+        # Check validation status
+        validation_status = entry['validation_status']
+        validation_candles = entry['validation_candles_count'] + 1
+        validation_datetime = entry.get('validation_datetime')
+        
+        if validation_status == 'VALIDATING':
+            # Check if price confirms entry (above entry price)
+            if current_price >= entry['entry_price']:
+                validation_status = 'VALID'
+                validation_datetime = current_datetime
+                logger.info("✓ Entry #%s VALIDATED at $%.2f", entry['id'], current_price)
+            elif validation_candles >= entry['max_validation_candles']:
+                validation_status = 'INVALIDATED'
+                validation_datetime = current_datetime
+                logger.info("✗ Entry #%s INVALIDATED (price below entry after %s candles)",
+                            entry['id'], validation_candles)
+        
+        # Exit condition tracking
+        exit_status = entry['exit_status']
+        exit_price = entry.get('exit_price')
+        exit_datetime = entry.get('exit_datetime')
+        exit_reason = entry.get('exit_reason')
+        
+        exit_1_hit = entry.get('exit_1_hit', False)
+        exit_1_datetime = entry.get('exit_1_datetime')
+        exit_1_price = entry.get('exit_1_price')
+        
+        exit_2_hit = entry.get('exit_2_hit', False)
+        exit_2_datetime = entry.get('exit_2_datetime')
+        exit_2_price = entry.get('exit_2_price')
+        
+        exit_3_hit = entry.get('exit_3_hit', False)
+        exit_3_datetime = entry.get('exit_3_datetime')
+        exit_3_price = entry.get('exit_3_price')
+        
+        recovery_attempt = entry.get('recovery_attempt', False)
+        recovery_low_price = entry.get('recovery_low_price')
+        recovery_datetime = entry.get('recovery_datetime')
+        final_profit_pct = entry.get('final_profit_pct')
+        
+        # =====================================================
+        # CHECK FOR SIGNAL-BASED EXIT (CAUTION/SELL)
+        # Exit on CAUTION/SELL even if entry not validated yet
+        # =====================================================
+        
+        # If latest signal is CAUTION or SELL, exit immediately (even if not validated)
+        if current_signal and current_signal[0] in ['CAUTION', 'SELL']:
+            # Allow signal exit from VALIDATING, ACTIVE, EXIT-1, EXIT-2, TRAILING-STOP
+            if exit_status in ['ACTIVE', 'EXIT-1', 'EXIT-2', 'TRAILING-STOP'] or validation_status == 'VALIDATING':
+                exit_status = 'SIGNAL-EXIT'
+                validation_status = 'INVALIDATED'  # Mark as invalidated since exiting early
+                exit_price = current_price
+                exit_datetime = current_datetime
+                exit_reason = f'{current_signal[0]} signal at {current_signal[1]} - immediate exit'
+                final_profit_pct = current_profit_pct
+                logger.info("🚨 Entry #%s SIGNAL EXIT (%s)! Profit: %+.2f%%",
+                            entry['id'], current_signal[0], current_profit_pct)
+                
+                # Only the exit is recorded
+                return {
                     'current_price': current_price,
                     'peak_price': peak_price,
                     'peak_datetime': peak_datetime,
                     'current_profit_pct': current_profit_pct,
                     'max_profit_pct': max_profit_pct,
                     'final_profit_pct': final_profit_pct,
-                    
                     'validation_status': validation_status,
-                    'validation_datetime': validation_datetime,
-                    'validation_candles_count': validation_candles,
-                    
                     'exit_status': exit_status,
                     'exit_price': exit_price,
                     'exit_datetime': exit_datetime,
-                    'exit_reason': exit_reason,
-                    
-                    'exit_1_hit': exit_1_hit,
-                    'exit_1_datetime': exit_1_datetime,
-                    'exit_1_price': exit_1_price if exit_1_price else None,
-                    
-                    'exit_2_hit': exit_2_hit,
-                    'exit_2_datetime': exit_2_datetime,
-                    'exit_2_price': exit_2_price if exit_2_price else None,
-                    
-                    'exit_3_hit': exit_3_hit,
-                    'exit_3_datetime': exit_3_datetime,
-                    'exit_3_price': exit_3_price if exit_3_price else None,
-                    
-                    'trailing_stop_active': trailing_stop_active,
-                    'trailing_stop_price': trailing_stop_price,
-                    
-                    'recovery_attempt': recovery_attempt,
-                    'recovery_low_price': recovery_low_price,
-                    'recovery_datetime': recovery_datetime
-                })
+                    'exit_reason': exit_reason
+                }
+        
+        # Only process normal exits if validated
+        if validation_status == 'VALID':
+            
+            # =====================================================
+            # NORMAL EXIT LOGIC (only if not signal-exited)
+            # =====================================================
+            
+            # Check EXIT-3 (highest target)
+            if not exit_3_hit and current_price >= exit_3_target:
+                exit_3_hit = True
+                exit_3_datetime = current_datetime
+                exit_3_price = current_price
+                exit_status = 'EXIT-3'
+                exit_price = current_price
+                exit_datetime = current_datetime
+                exit_reason = 'Final target reached (EXIT-3) - Full exit'
+                final_profit_pct = current_profit_pct
+                logger.info("🎯🎯🎯 Entry #%s reached EXIT-3 FINAL target! Profit: +%.2f%%",
+                            entry['id'], current_profit_pct)
+            
+            # Check EXIT-2 (second target)
+            elif not exit_2_hit and current_price >= exit_2_target:
+                exit_2_hit = True
+                exit_2_datetime = current_datetime
+                exit_2_price = current_price
+                exit_status = 'EXIT-2'
+                # Move trailing stop tighter
+                trailing_stop_active = True
+                trailing_stop_price = entry['entry_price'] + atr  # Entry + 1 ATR
+                logger.info("🎯🎯 Entry #%s reached EXIT-2 target! Trailing stop → $%.2f",
+                            entry['id'], trailing_stop_price)
+            
+            # Check EXIT-1 (first target)
+            elif not exit_1_hit and current_price >= exit_1_target:
+                exit_1_hit = True
+                exit_1_datetime = current_datetime
+                exit_1_price = current_price
+                exit_status = 'EXIT-1'
+                # Activate trailing stop at breakeven
+                trailing_stop_active = True
+                trailing_stop_price = entry['entry_price']
+                logger.info("🎯 Entry #%s reached EXIT-1 target! Trailing stop → $%.2f",
+                            entry['id'], trailing_stop_price)
+            
+            # Check trailing stop (if active and not fully exited)
+            if trailing_stop_active and exit_status != 'EXIT-3':
+                # Update trailing stop if price makes new high
+                if exit_2_hit:
+                    # After EXIT-2, trail at Entry + 1 ATR from peak
+                    new_trailing_stop = peak_price - (2 * atr)
+                    if new_trailing_stop > trailing_stop_price:
+                        trailing_stop_price = new_trailing_stop
+                elif exit_1_hit:
+                    # After EXIT-1, trail at breakeven until EXIT-2
+                    new_trailing_stop = entry['entry_price']
+                    trailing_stop_price = max(trailing_stop_price or 0, new_trailing_stop)
+                
+                # Check if trailing stop hit
+                if current_price <= trailing_stop_price:
+                    exit_status = 'TRAILING-STOP'
+                    exit_price = current_price
+                    exit_datetime = current_datetime
+                    exit_reason = f'Trailing stop hit at ${trailing_stop_price:.2f}'
+                    final_profit_pct = current_profit_pct
+                    logger.info("⚠️ Entry #%s trailing stop hit. Profit: %+.2f%%",
+                                entry['id'], current_profit_pct)
+            
+            # Check regular stop-loss (if not exited and no trailing stop)
+            if exit_status == 'ACTIVE' and not trailing_stop_active:
+                if current_price <= entry['stop_loss']:
+                    exit_status = 'STOP-LOSS'
+                    exit_price = current_price
+                    exit_datetime = current_datetime
+                    exit_reason = 'Stop loss hit'
+                    final_profit_pct = current_profit_pct
+                    logger.info("❌ Entry #%s stop loss hit. Loss: %.2f%%", entry['id'], current_profit_pct)
+            
+            # Check recovery attempt (after deep drawdown)
+            if exit_status in ['EXIT-1', 'EXIT-2'] and not exit_3_hit:
+                # If price drops more than 50% from peak after hitting EXIT-1/2
+                drawdown_pct = ((peak_price - current_price) / peak_price) * 100
+                
+                if drawdown_pct > 50 and not recovery_attempt:
+                    recovery_attempt = True
+                    recovery_low_price = current_price
+                    recovery_datetime = current_datetime
+                    exit_status = 'RECOVERY'
+                    logger.info("🔄 Entry #%s in RECOVERY mode. Drawdown: -%.1f%%", entry['id'], drawdown_pct)
+                
+                # Track lowest price during recovery
+                if recovery_attempt:
+                    if current_price < (recovery_low_price or float('inf')):
+                        recovery_low_price = current_price
+                        recovery_datetime = current_datetime
+        
+        return {
+            'current_price': current_price,
+            'peak_price': peak_price,
+            'peak_datetime': peak_datetime,
+            'current_profit_pct': current_profit_pct,
+            'max_profit_pct': max_profit_pct,
+            'final_profit_pct': final_profit_pct,
+            
+            'validation_status': validation_status,
+            'validation_datetime': validation_datetime,
+            'validation_candles_count': validation_candles,
+            
+            'exit_status': exit_status,
+            'exit_price': exit_price,
+            'exit_datetime': exit_datetime,
+            'exit_reason': exit_reason,
+            
+            'exit_1_hit': exit_1_hit,
+            'exit_1_datetime': exit_1_datetime,
+            'exit_1_price': exit_1_price,
+            
+            'exit_2_hit': exit_2_hit,
+            'exit_2_datetime': exit_2_datetime,
+            'exit_2_price': exit_2_price,
+            
+            'exit_3_hit': exit_3_hit,
+            'exit_3_datetime': exit_3_datetime,
+            'exit_3_price': exit_3_price,
+            
+            'trailing_stop_active': trailing_stop_active,
+            'trailing_stop_price': trailing_stop_price,
+            
+            'recovery_attempt': recovery_attempt,
+            'recovery_low_price': recovery_low_price,
+            'recovery_datetime': recovery_datetime
+        }
+    
+    def evaluate_entries_frame(self, df: pd.DataFrame, current_price: pd.Series,
+                               current_datetime: pd.Series, signal: pd.Series,
+                               signal_datetime: pd.Series) -> pd.DataFrame:
+        """
+        Vectorized evaluate_entry_price() over many entries at once
+        
+        Same state machine, computed with boolean masks over columns
+        instead of one Python branch ladder per entry.
+        
+        Args:
+            df: Entry states (entry_tracking columns), one row per entry
+            current_price: Price to apply, aligned with df
+            current_datetime: Datetime of each price
+            signal: Latest signal at that datetime (None if there is none)
+            signal_datetime: Datetime of that signal
+        
+        Returns:
+            New states for the entries that have not exited yet (rows of
+            already-exited entries are dropped, as evaluate_entry_price
+            returns None for them)
+        """
+        # Stage events are logged per entry only if INFO is enabled
+        info = logger.isEnabledFor(logging.INFO)
+        
+        live = ~df['exit_status'].isin(['SIGNAL-EXIT', 'EXIT-3', 'STOP-LOSS'])
+        df = df[live].copy()
+        price = current_price[live].astype(float)
+        now = current_datetime[live]
+        signal = signal[live]
+        signal_datetime = signal_datetime[live]
+        
+        old = df.copy()
+        entry_price = df['entry_price'].astype(float)
+        atr = df['atr_at_entry'].astype(float).fillna(0.0)
+        for col in ['exit_1_hit', 'exit_2_hit', 'exit_3_hit', 'trailing_stop_active', 'recovery_attempt']:
+            df[col] = df[col].fillna(False).astype(bool)
+        
+        # Exit targets
+        multipliers = np.array(
+            [EXIT_TARGET_MULTIPLIERS.get(tf, SWING_TARGET_MULTIPLIERS) for tf in df['timeframe']],
+            dtype=float
+        ).reshape(-1, 3)
+        exit_1_target = entry_price + multipliers[:, 0] * atr
+        exit_2_target = entry_price + multipliers[:, 1] * atr
+        exit_3_target = entry_price + multipliers[:, 2] * atr
+        
+        # Peak price and profit percentages
+        new_peak = price > df['peak_price'].astype(float)
+        df['peak_price'] = df['peak_price'].astype(float).where(~new_peak, price)
+        df['peak_datetime'] = df['peak_datetime'].where(~new_peak, now)
+        df['current_price'] = price
+        df['current_profit_pct'] = (price - entry_price) / entry_price * 100
+        df['max_profit_pct'] = (df['peak_price'] - entry_price) / entry_price * 100
+        
+        # Validation
+        df['validation_candles_count'] = df['validation_candles_count'] + 1
+        validating = df['validation_status'] == 'VALIDATING'
+        validated = validating & (price >= entry_price)
+        invalidated = validating & ~validated & (df['validation_candles_count'] >= df['max_validation_candles'])
+        df.loc[validated, 'validation_status'] = 'VALID'
+        df.loc[invalidated, 'validation_status'] = 'INVALIDATED'
+        df['validation_datetime'] = df['validation_datetime'].where(~(validated | invalidated), now)
+        
+        if info:
+            for entry_id, p in price[validated].items():
+                logger.info("✓ Entry #%s VALIDATED at $%.2f", df.at[entry_id, 'id'], p)
+            for entry_id in df.index[invalidated]:
+                logger.info("✗ Entry #%s INVALIDATED (price below entry after %s candles)",
+                            df.at[entry_id, 'id'], df.at[entry_id, 'validation_candles_count'])
+        
+        # Signal-based exit (CAUTION/SELL), even if not validated yet
+        signal_exit = signal.isin(['CAUTION', 'SELL']) & (
+            df['exit_status'].isin(['ACTIVE', 'EXIT-1', 'EXIT-2', 'TRAILING-STOP'])
+            | (df['validation_status'] == 'VALIDATING')
+        )
+        
+        # Normal exits only for validated entries
+        valid = ~signal_exit & (df['validation_status'] == 'VALID')
+        
+        hit_3 = valid & ~df['exit_3_hit'] & (price >= exit_3_target)
+        hit_2 = valid & ~hit_3 & ~df['exit_2_hit'] & (price >= exit_2_target)
+        hit_1 = valid & ~hit_3 & ~hit_2 & ~df['exit_1_hit'] & (price >= exit_1_target)
+        
+        for stage, hit in [(3, hit_3), (2, hit_2), (1, hit_1)]:
+            df.loc[hit, f'exit_{stage}_hit'] = True
+            df[f'exit_{stage}_datetime'] = df[f'exit_{stage}_datetime'].where(~hit, now)
+            df[f'exit_{stage}_price'] = df[f'exit_{stage}_price'].where(~hit, price)
+            df.loc[hit, 'exit_status'] = f'EXIT-{stage}'
+        
+        exited = hit_3.copy()
+        df.loc[hit_3, 'exit_reason'] = 'Final target reached (EXIT-3) - Full exit'
+        
+        # EXIT-2 tightens the trailing stop to Entry + 1 ATR, EXIT-1 to breakeven
+        df.loc[hit_2 | hit_1, 'trailing_stop_active'] = True
+        df['trailing_stop_price'] = df['trailing_stop_price'].astype(float).where(
+            ~hit_2, entry_price + atr).where(~hit_1, entry_price)
+        
+        if info:
+            for entry_id in df.index[hit_3]:
+                logger.info("🎯🎯🎯 Entry #%s reached EXIT-3 FINAL target! Profit: +%.2f%%",
+                            df.at[entry_id, 'id'], df.at[entry_id, 'current_profit_pct'])
+            for entry_id in df.index[hit_2]:
+                logger.info("🎯🎯 Entry #%s reached EXIT-2 target! Trailing stop → $%.2f",
+                            df.at[entry_id, 'id'], df.at[entry_id, 'trailing_stop_price'])
+            for entry_id in df.index[hit_1]:
+                logger.info("🎯 Entry #%s reached EXIT-1 target! Trailing stop → $%.2f",
+                            df.at[entry_id, 'id'], df.at[entry_id, 'trailing_stop_price'])
+        
+        # Trailing stop (if active and not fully exited)
+        trailing = valid & df['trailing_stop_active'] & (df['exit_status'] != 'EXIT-3')
+        stop = df['trailing_stop_price']
+        after_2 = trailing & df['exit_2_hit']
+        after_1 = trailing & ~df['exit_2_hit'] & df['exit_1_hit']
+        trail_2 = df['peak_price'] - 2 * atr
+        stop = stop.where(~(after_2 & (trail_2 > stop)), trail_2)
+        stop = stop.where(~after_1, np.maximum(stop.fillna(0), entry_price))
+        df['trailing_stop_price'] = stop
+        
+        trailing_hit = trailing & (price <= stop)
+        df.loc[trailing_hit, 'exit_status'] = 'TRAILING-STOP'
+        df.loc[trailing_hit, 'exit_reason'] = [f"Trailing stop hit at ${p:.2f}" for p in stop[trailing_hit]]
+        if info:
+            for entry_id in df.index[trailing_hit]:
+                logger.info("⚠️ Entry #%s trailing stop hit. Profit: %+.2f%%",
+                            df.at[entry_id, 'id'], df.at[entry_id, 'current_profit_pct'])
+        exited |= trailing_hit
+        
+        # Regular stop-loss (if not exited and no trailing stop)
+        stop_loss = (valid & (df['exit_status'] == 'ACTIVE') & ~df['trailing_stop_active']
+                     & (price <= df['stop_loss'].astype(float)))
+        df.loc[stop_loss, 'exit_status'] = 'STOP-LOSS'
+        df.loc[stop_loss, 'exit_reason'] = 'Stop loss hit'
+        if info:
+            for entry_id in df.index[stop_loss]:
+                logger.info("❌ Entry #%s stop loss hit. Loss: %.2f%%",
+                            df.at[entry_id, 'id'], df.at[entry_id, 'current_profit_pct'])
+        exited |= stop_loss
+        
+        df['exit_price'] = df['exit_price'].where(~exited, price)
+        df['exit_datetime'] = df['exit_datetime'].where(~exited, now)
+        df['final_profit_pct'] = df['final_profit_pct'].where(~exited, df['current_profit_pct'])
+        
+        # Recovery attempt (more than 50% drawdown from peak after EXIT-1/2)
+        in_recovery = valid & df['exit_status'].isin(['EXIT-1', 'EXIT-2']) & ~df['exit_3_hit']
+        drawdown_pct = (df['peak_price'] - price) / df['peak_price'] * 100
+        start_recovery = in_recovery & (drawdown_pct > 50) & ~df['recovery_attempt']
+        df.loc[start_recovery, 'recovery_attempt'] = True
+        df.loc[start_recovery, 'exit_status'] = 'RECOVERY'
+        if info:
+            for entry_id in df.index[start_recovery]:
+                logger.info("🔄 Entry #%s in RECOVERY mode. Drawdown: -%.1f%%",
+                            df.at[entry_id, 'id'], drawdown_pct[entry_id])
+        
+        # Track lowest price during recovery
+        new_low = in_recovery & df['recovery_attempt'] & (
+            start_recovery | (price < df['recovery_low_price'].astype(float).fillna(np.inf))
+        )
+        df['recovery_low_price'] = df['recovery_low_price'].astype(float).where(~new_low, price)
+        df['recovery_datetime'] = df['recovery_datetime'].where(~new_low, now)
+        
+        # Signal exits only record the exit itself
+        if signal_exit.any():
+            kept = ['validation_datetime', 'validation_candles_count',
+                    'exit_1_hit', 'exit_1_datetime', 'exit_1_price',
+                    'exit_2_hit', 'exit_2_datetime', 'exit_2_price',
+                    'exit_3_hit', 'exit_3_datetime', 'exit_3_price',
+                    'trailing_stop_active', 'trailing_stop_price',
+                    'recovery_attempt', 'recovery_low_price', 'recovery_datetime']
+            df.loc[signal_exit, kept] = old.loc[signal_exit, kept]
+            df.loc[signal_exit, 'validation_status'] = 'INVALIDATED'
+            df.loc[signal_exit, 'exit_status'] = 'SIGNAL-EXIT'
+            df['exit_price'] = df['exit_price'].where(~signal_exit, price)
+            df['exit_datetime'] = df['exit_datetime'].where(~signal_exit, now)
+            df['final_profit_pct'] = df['final_profit_pct'].where(~signal_exit, df['current_profit_pct'])
+            df.loc[signal_exit, 'exit_reason'] = [
+                f'{sig} signal at {sig_datetime} - immediate exit'
+                for sig, sig_datetime in zip(signal[signal_exit], signal_datetime[signal_exit])
+            ]
+            if info:
+                for entry_id in df.index[signal_exit]:
+                    logger.info("🚨 Entry #%s SIGNAL EXIT (%s)! Profit: %+.2f%%",
+                                df.at[entry_id, 'id'], signal[entry_id], df.at[entry_id, 'current_profit_pct'])
+        
+        return df
+    
+    def quiet_entries_mask(self, df: pd.DataFrame, current_price: pd.Series,
+                           signal: pd.Series) -> pd.Series:
+        """
+        Entries whose stage this tick cannot change
+        
+        Live entries without a CAUTION/SELL signal that are either
+        INVALIDATED, or VALID and ACTIVE with no target hit, no trailing
+        stop and the price strictly between the stop-loss and the EXIT-1
+        target. Only their price, peak, profit and candle count move.
+        
+        UPDATE_QUIET_ENTRY_SQL applies the same predicate in SQL; keep
+        the two in step.
+        
+        Returns:
+            Boolean mask aligned with df
+        """
+        multipliers = np.array(
+            [EXIT_TARGET_MULTIPLIERS.get(tf, SWING_TARGET_MULTIPLIERS)[0] for tf in df['timeframe']],
+            dtype=float
+        )
+        exit_1_target = df['entry_price'] + multipliers * df['atr_at_entry'].fillna(0.0)
+        
+        no_stage = ~(df['exit_1_hit'].fillna(False).astype(bool)
+                     | df['exit_2_hit'].fillna(False).astype(bool)
+                     | df['exit_3_hit'].fillna(False).astype(bool)
+                     | df['trailing_stop_active'].fillna(False).astype(bool))
+        
+        between = (current_price > df['stop_loss']) & (current_price < exit_1_target)
+        
+        return (
+            df['exit_status'].isin(LIVE_EXIT_STATUSES)
+            & ~signal.isin(EXIT_SIGNALS)
+            & (
+                (df['validation_status'] == 'INVALIDATED')
+                | ((df['validation_status'] == 'VALID') & (df['exit_status'] == 'ACTIVE')
+                   & no_stage & between)
+            )
+        )
+    
+    def apply_quiet_prices(self, df: pd.DataFrame, current_price: pd.Series,
+                           current_datetime: pd.Series) -> pd.DataFrame:
+        """
+        Apply prices to entries from quiet_entries_mask() (QUIET_ENTRY_COLUMNS only)
+        """
+        df = df.copy()
+        new_peak = current_price > df['peak_price']
+        df['peak_price'] = df['peak_price'].where(~new_peak, current_price)
+        df['peak_datetime'] = df['peak_datetime'].where(~new_peak, current_datetime)
+        df['current_price'] = current_price
+        df['current_profit_pct'] = (current_price - df['entry_price']) / df['entry_price'] * 100
+        df['max_profit_pct'] = (df['peak_price'] - df['entry_price']) / df['entry_price'] * 100
+        df['validation_candles_count'] = df['validation_candles_count'] + 1
+        return df
+    
+    def update_entries_batch(self, price_map: Dict[Tuple[str, str], Tuple[float, datetime]]) -> pd.DataFrame:
+        """
+        Apply one tick of prices to every active entry at once
+        
+        Entries are loaded into a DataFrame and split in two: entries
+        whose stage cannot change (quiet_entries_mask) only get their
+        price columns moved, the rest are evaluated with
+        evaluate_entries_frame(). Each group is written with one bulk
+        UPDATE.
+        
+        Args:
+            price_map: {(symbol, timeframe): (current_price, current_datetime)}
+        
+        Returns:
+            New states of the updated entries (empty if nothing was updated)
+        """
+        try:
+            with self.engine.begin() as conn:
+                df = pd.read_sql(
+                    ACTIVE_ENTRIES_SQL[False, False],
+                    conn, coerce_float=True,
+                    parse_dates=ENTRY_DATETIME_COLUMNS
+                )
+                
+                keys = list(zip(df['symbol'], df['timeframe']))
+                df = df[[key in price_map for key in keys]]
+                if df.empty:
+                    return df
+                
+                keys = list(zip(df['symbol'], df['timeframe']))
+                current_price = pd.Series([price_map[key][0] for key in keys], index=df.index)
+                current_datetime = pd.Series([price_map[key][1] for key in keys], index=df.index)
+                
+                # Latest signal per pair, one query per distinct price datetime
+                latest = {}
+                by_datetime = defaultdict(set)
+                for key, (_, as_of) in price_map.items():
+                    by_datetime[as_of].add(key)
+                for as_of, pairs in by_datetime.items():
+                    signals = self.get_latest_signals(list(pairs), as_of, conn) or {}
+                    latest.update({key: signals.get(key) for key in pairs})
+                
+                signal = pd.Series([(latest.get(key) or (None, None))[0] for key in keys], index=df.index)
+                signal_datetime = pd.Series([(latest.get(key) or (None, None))[1] for key in keys], index=df.index)
                 
-                conn.commit()
+                quiet = self.quiet_entries_mask(df, current_price, signal)
+                
+                quiet_df = self.apply_quiet_prices(df[quiet], current_price[quiet],
+                                                   current_datetime[quiet])
+                evaluated_df = self.evaluate_entries_frame(
+                    df[~quiet], current_price[~quiet], current_datetime[~quiet],
+                    signal[~quiet], signal_datetime[~quiet]
+                )
+                
+                for frame, is_quiet in [(quiet_df, True), (evaluated_df, False)]:
+                    rows = frame.astype(object).where(frame.notna(), None).to_dict('records')
+                    self.bulk_update_entries(rows, conn=conn, quiet=is_quiet)
+                
+                return pd.concat([quiet_df, evaluated_df]).sort_index()
         
-        except Exception as e:
-            print(f"  ✗ Error updating entry {entry_id}: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error batch updating entries")
+            return pd.DataFrame()
+    
+    def update_entry_price(self, entry_id: int, current_price: float, 
+                          current_datetime: datetime,
+                          latest_signals: Optional[Dict[Tuple[str, str], Tuple[str, datetime]]] = None,
+                          conn=None):
+        """
+        Update entry with current price and check for all exit conditions
+        (see evaluate_entry_price)
+        
+        latest_signals (from get_latest_signals() for current_datetime)
+        replaces the per-entry signal lookup when given. Pass conn to reuse
+        one connection across calls (the caller then commits).
+        
+        Ticks that cannot change the entry's stage are written in SQL;
+        the same statement returns every other entry, with its latest
+        signal, for the full evaluation (UPDATE_QUIET_OR_SELECT_ENTRY_SQL).
+        """
+        try:
+            with self._connection(conn) as conn:
+                # Quiet tick written, or the entry to evaluate, in one round trip
+                result = conn.execute(UPDATE_QUIET_OR_SELECT_ENTRY_SQL, {
+                    'entry_id': entry_id,
+                    'current_price': current_price,
+                    'current_datetime': current_datetime
+                }).mappings().first()
+                
+                # Quiet tick already written, or entry missing/exited
+                if result is None:
+                    return
+                
+                entry = dict(result)
+                latest_signal = (entry.pop('latest_signal'), entry.pop('latest_signal_datetime'))
+                
+                if latest_signals is not None:
+                    current_signal = latest_signals.get((entry['symbol'], entry['timeframe']))
+                else:
+                    current_signal = latest_signal if latest_signal[0] is not None else None
+                
+                entry_updates = self.evaluate_entry_price(
+                    entry, current_price, current_datetime, current_signal
+                )
+                
+                if entry_updates is None:
+                    return
+                
+                # Update database (columns not in entry_updates keep their values)
+                entry.update(entry_updates)
+                params = {col: entry.get(col) for col in ENTRY_STATE_COLUMNS}
+                params['entry_id'] = entry_id
+                
+                conn.execute(UPDATE_ENTRY_SQL, params)
+        
+        except Exception:
+            logger.exception("Error updating entry %s", entry_id)
+    
+    async def update_entry_prices_async(self, updates: List[Tuple[int, float, datetime]],
+                                        max_concurrent: int = MAX_CONCURRENT_UPDATES):
+        """
+        Run update_entry_price for many entries with overlapping DB I/O
+        
+        Each entry's updates run in a worker thread on its own pooled
+        connection, at most max_concurrent entries at a time. Updates of
+        one entry are applied in datetime order, never concurrently.
+        
+        Args:
+            updates: (entry_id, current_price, current_datetime) tuples
+            max_concurrent: Entries updated at the same time
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        by_entry = defaultdict(list)
+        for entry_id, current_price, current_datetime in updates:
+            by_entry[entry_id].append((current_datetime, current_price))
+        
+        def update_one(entry_id, prices):
+            for current_datetime, current_price in sorted(prices, key=lambda p: p[0]):
+                self.update_entry_price(entry_id, current_price, current_datetime)
+        
+        async def run_one(entry_id, prices):
+            async with semaphore:
+                await asyncio.to_thread(update_one, entry_id, prices)
+        
+        await asyncio.gather(*(run_one(entry_id, prices) for entry_id, prices in by_entry.items()))
+    
+    def update_entry_prices(self, updates: List[Tuple[int, float, datetime]],
+                            max_concurrent: int = MAX_CONCURRENT_UPDATES):
+        """Blocking wrapper around update_entry_prices_async"""
+        asyncio.run(self.update_entry_prices_async(updates, max_concurrent))
 
 # ============================================
 # TEST SCRIPT
 # ============================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='    %(message)s')
+    
     print("=" * 80)
     print("ENTRY TRACKER TEST")
     print("=" * 80)
@@ -9,14 +9,50 @@ Features:
 """
 
 import re
+import time
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime
 from sqlalchemy import text
 from typing import Dict, List, Optional
+from psycopg2.extras import execute_values
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import engine
 
+# Seconds a get_magic_line result is reused before it is read again
+MAGIC_LINE_CACHE_TTL = 5.0
+
+# One "SYMBOL:PRICE" pair of a bulk import string, delimited by commas
+# (fragments that do not match are skipped)
+BULK_PAIR_RE = re.compile(
+    r'(?:^|,)\s*([A-Za-z0-9/_\-]+)\s*:\s*([0-9]+(?:\.[0-9]*)?|\.[0-9]+)\s*(?=,|$)'
+)
+
+# Upsert of Magic Lines, one VALUES row per symbol (execute_values)
+UPSERT_MAGIC_LINES_SQL = """
+    INSERT INTO magic_lines 
+        (symbol, magic_line_price, notes, line_color, line_width, line_style, active, updated_at)
+    VALUES %s
+    ON CONFLICT (symbol)
+    DO UPDATE SET
+        magic_line_price = EXCLUDED.magic_line_price,
+        notes = EXCLUDED.notes,
+        line_color = EXCLUDED.line_color,
+        line_width = EXCLUDED.line_width,
+        line_style = EXCLUDED.line_style,
+        active = EXCLUDED.active,
+        updated_at = CURRENT_TIMESTAMP
+"""
+UPSERT_MAGIC_LINES_TEMPLATE = (
+    "(%(symbol)s, %(price)s, %(notes)s, %(color)s, %(width)s, %(style)s, %(active)s, CURRENT_TIMESTAMP)"
+)
+
+# Price vs Magic Line statuses, indexed in check_prices_vs_magic_lines
+MAGIC_LINE_STATUSES = np.array(['AT', 'ABOVE', 'BELOW', 'NOT_SET'])
+
 class MagicLineManager:
     """
     Manage user-defined Magic Line price levels
@@ -27,6 +63,9 @@ class MagicLineManager:
     
     def __init__(self):
         self.engine = engine
+        
+        # symbol -> (fetched at, price or None), see get_magic_line
+        self._cache = {}
     
     def set_magic_line(self, symbol: str, price: float, notes: str = "", 
                        line_color: str = 'purple', line_width: int = 2, 
@@ -44,7 +83,8 @@ class MagicLineManager:
             active: Whether this Magic Line is active (default True)
         """
         try:
-            with self.engine.connect() as conn:
+            # One BEGIN/COMMIT, committed when the block exits
+            with self.engine.begin() as conn:
                 query = text("""
                     INSERT INTO magic_lines 
                         (symbol, magic_line_price, notes, line_color, line_width, line_style, active, updated_at)
@@ -70,12 +110,12 @@ class MagicLineManager:
                     'style': line_style,
                     'active': active
                 })
-                
-                conn.commit()
-                
-                print(f"✓ Set Magic Line for {symbol}: {price:.2f}")
-                if notes:
-                    print(f"  Note: {notes}")
+            
+            self.invalidate(symbol)
+            
+            print(f"✓ Set Magic Line for {symbol}: {price:.2f}")
+            if notes:
+                print(f"  Note: {notes}")
         
         except Exception as e:
             print(f"✗ Error setting Magic Line for {symbol}: {e}")
@@ -97,53 +137,76 @@ class MagicLineManager:
             return
         
         try:
-            # Split by comma
-            pairs = bulk_input.split(',')
+            notes = f"Bulk import on {self._get_current_time()}"
             
-            count = 0
-            for pair in pairs:
-                pair = pair.strip()
-                
-                # Split by colon
-                if ':' not in pair:
-                    print(f"  ⚠️  Skipping invalid format: {pair}")
-                    continue
-                
-                parts = pair.split(':')
-                if len(parts) != 2:
-                    print(f"  ⚠️  Skipping invalid format: {pair}")
-                    continue
-                
-                symbol = parts[0].strip().upper()
+            # Parse every pair first; a symbol listed twice keeps its last price
+            rows = {}
+            matched = 0
+            
+            for match in BULK_PAIR_RE.finditer(bulk_input):
+                matched += 1
+                symbol = match.group(1).upper()
+                price = float(match.group(2))
                 
                 # Add /USDT if not present (for convenience)
                 if '/' not in symbol:
                     symbol = symbol + '/USDT'
                 
-                try:
-                    price = float(parts[1].strip())
-                    
-                    # Set Magic Line
-                    self.set_magic_line(symbol, price, notes=f"Bulk import on {self._get_current_time()}")
-                    count += 1
+                rows[symbol] = {
+                    'symbol': symbol,
+                    'price': price,
+                    'notes': notes,
+                    'color': 'purple',
+                    'width': 2,
+                    'style': 'Solid',
+                    'active': True
+                }
+            
+            skipped = sum(1 for pair in bulk_input.split(',') if pair.strip()) - matched
+            if skipped > 0:
+                print(f"  ⚠️  Skipped {skipped} entries not in SYMBOL:PRICE format")
+            
+            # All Magic Lines in one INSERT and one transaction
+            if rows:
+                with self.engine.begin() as conn:
+                    with conn.connection.dbapi_connection.cursor() as cursor:
+                        execute_values(
+                            cursor, UPSERT_MAGIC_LINES_SQL, list(rows.values()),
+                            template=UPSERT_MAGIC_LINES_TEMPLATE, page_size=1000
+                        )
+                
+                for symbol in rows:
+                    self.invalidate(symbol)
                 
-                except ValueError:
-                    print(f"  ✗ Invalid price for {symbol}: {parts[1]}")
+                for row in rows.values():
+                    print(f"✓ Set Magic Line for {row['symbol']}: {row['price']:.2f}")
             
-            print(f"\n✅ Bulk import complete: {count} Magic Lines imported")
+            print(f"\n✅ Bulk import complete: {len(rows)} Magic Lines imported")
         
         except Exception as e:
             print(f"✗ Error in bulk import: {e}")
     
-    def get_magic_line(self, symbol: str) -> Optional[float]:
+    def get_magic_line(self, symbol: str, conn=None) -> Optional[float]:
         """
         Get Magic Line price for symbol
         
+        Results (including "not set") are cached for MAGIC_LINE_CACHE_TTL
+        seconds; writes through this manager invalidate them.
+        
+        Args:
+            symbol: Trading pair (e.g., 'BTC/USDT')
+            conn: Connection to reuse (default: a pooled one)
+        
         Returns:
             Magic Line price (float) or None if not set
         """
+        now = time.monotonic()
+        hit = self._cache.get(symbol)
+        if hit is not None and now - hit[0] < MAGIC_LINE_CACHE_TTL:
+            return hit[1]
+        
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 query = text("""
                     SELECT magic_line_price
                     FROM magic_lines
@@ -153,27 +216,28 @@ class MagicLineManager:
                 
                 result = conn.execute(query, {'symbol': symbol}).fetchone()
                 
-                if result:
-                    return float(result[0])
-                else:
-                    return None
+                price = float(result[0]) if result else None
+                self._cache[symbol] = (now, price)
+                
+                return price
         
         except Exception as e:
             print(f"Error getting Magic Line for {symbol}: {e}")
             return None
     
-    def get_all_magic_lines(self, active_only: bool = True) -> List[Dict]:
+    def get_all_magic_lines(self, active_only: bool = True, conn=None) -> List[Dict]:
         """
         Get all Magic Lines
         
         Args:
             active_only: Only return active Magic Lines (default True)
+            conn: Connection to reuse (default: a pooled one)
         
         Returns:
             List of dicts with symbol, price, notes, etc.
         """
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 if active_only:
                     query = text("""
                         SELECT symbol, magic_line_price, notes, line_color, line_width, line_style, active
@@ -208,52 +272,133 @@ class MagicLineManager:
             print(f"Error getting Magic Lines: {e}")
             return []
     
-    def check_price_vs_magic_line(self, symbol: str, current_price: float) -> Dict:
+    def get_magic_lines(self, symbols: List[str], conn=None) -> Dict[str, Optional[float]]:
         """
-        Compare current price to Magic Line
+        Get Magic Line prices for many symbols in one query
+        
+        Symbols cached by get_magic_line are served from the cache; the
+        rest are read with a single SELECT and cached the same way.
+        
+        Args:
+            symbols: Trading pairs (e.g., ['BTC/USDT', 'ETH/USDT'])
+            conn: Connection to reuse (default: a pooled one)
         
         Returns:
-            {
+            Dict of symbol -> Magic Line price (float) or None if not set
+        """
+        now = time.monotonic()
+        magic_lines = {}
+        missing = []
+        
+        for symbol in dict.fromkeys(symbols):
+            hit = self._cache.get(symbol)
+            if hit is not None and now - hit[0] < MAGIC_LINE_CACHE_TTL:
+                magic_lines[symbol] = hit[1]
+            else:
+                missing.append(symbol)
+        
+        if not missing:
+            return magic_lines
+        
+        try:
+            with self._connection(conn) as conn:
+                query = text("""
+                    SELECT symbol, magic_line_price
+                    FROM magic_lines
+                    WHERE active = true
+                      AND symbol = ANY(:symbols)
+                """)
+                
+                result = conn.execute(query, {'symbols': missing}).fetchall()
+                found = {row[0]: float(row[1]) for row in result}
+            
+            for symbol in missing:
+                price = found.get(symbol)
+                self._cache[symbol] = (now, price)
+                magic_lines[symbol] = price
+        
+        except Exception as e:
+            print(f"Error getting Magic Lines for {len(missing)} symbols: {e}")
+            for symbol in missing:
+                magic_lines[symbol] = None
+        
+        return magic_lines
+    
+    def check_prices_vs_magic_lines(self, prices: Dict[str, float],
+                                    conn=None) -> Dict[str, Dict]:
+        """
+        Compare current prices of many symbols to their Magic Lines
+        
+        All Magic Lines are fetched in one query (see get_magic_lines).
+        
+        Args:
+            prices: Dict of symbol -> current price
+            conn: Connection to reuse (default: a pooled one)
+        
+        Returns:
+            Dict of symbol -> {
                 'magic_line': float or None,
                 'status': 'ABOVE' / 'BELOW' / 'AT' / 'NOT_SET',
                 'distance_pct': float (percentage distance)
             }
         """
-        magic_line = self.get_magic_line(symbol)
+        magic_lines = self.get_magic_lines(list(prices), conn)
         
-        if magic_line is None:
-            return {
-                'magic_line': None,
-                'status': 'NOT_SET',
-                'distance_pct': 0.0
-            }
+        symbols = list(prices)
+        current = np.fromiter(prices.values(), dtype=np.float64, count=len(symbols))
+        magic = np.array([magic_lines.get(symbol) for symbol in symbols], dtype=np.float64)
         
-        distance_pct = ((current_price - magic_line) / magic_line) * 100
+        # Whole-array math; symbols without a Magic Line are NaN
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = (current - magic) / magic * 100.0
+        not_set = np.isnan(magic)
+        distance[not_set] = 0.0
         
         # Determine status (within 0.5% = AT)
-        if abs(distance_pct) <= 0.5:
-            status = 'AT'
-        elif current_price > magic_line:
-            status = 'ABOVE'
-        else:
-            status = 'BELOW'
+        status_idx = np.where(
+            not_set, 3, np.where(np.abs(distance) <= 0.5, 0, np.where(current > magic, 1, 2))
+        )
+        statuses = MAGIC_LINE_STATUSES[status_idx].tolist()
         
         return {
-            'magic_line': magic_line,
-            'status': status,
-            'distance_pct': distance_pct
+            symbol: {
+                'magic_line': magic_lines.get(symbol),
+                'status': status,
+                'distance_pct': distance_pct
+            }
+            for symbol, status, distance_pct in zip(symbols, statuses, distance.tolist())
         }
     
+    def check_price_vs_magic_line(self, symbol: str, current_price: float,
+                                  conn=None) -> Dict:
+        """
+        Compare current price to Magic Line
+        
+        Args:
+            symbol: Trading pair (e.g., 'BTC/USDT')
+            current_price: Price to compare
+            conn: Connection to reuse (default: a pooled one)
+        
+        Returns:
+            {
+                'magic_line': float or None,
+                'status': 'ABOVE' / 'BELOW' / 'AT' / 'NOT_SET',
+                'distance_pct': float (percentage distance)
+            }
+        """
+        return self.check_prices_vs_magic_lines({symbol: current_price}, conn)[symbol]
+    
     def delete_magic_line(self, symbol: str):
         """
         Delete Magic Line for symbol
         """
         try:
-            with self.engine.connect() as conn:
+            with self.engine.begin() as conn:
                 query = text("DELETE FROM magic_lines WHERE symbol = :symbol")
                 conn.execute(query, {'symbol': symbol})
-                conn.commit()
-                print(f"✓ Deleted Magic Line for {symbol}")
+            
+            self.invalidate(symbol)
+            print(f"✓ Deleted Magic Line for {symbol}")
         
         except Exception as e:
             print(f"✗ Error deleting Magic Line: {e}")
@@ -263,18 +408,40 @@ class MagicLineManager:
         Deactivate Magic Line (soft delete)
         """
         try:
-            with self.engine.connect() as conn:
+            with self.engine.begin() as conn:
                 query = text("UPDATE magic_lines SET active = false WHERE symbol = :symbol")
                 conn.execute(query, {'symbol': symbol})
-                conn.commit()
-                print(f"✓ Deactivated Magic Line for {symbol}")
+            
+            self.invalidate(symbol)
+            print(f"✓ Deactivated Magic Line for {symbol}")
         
         except Exception as e:
             print(f"✗ Error deactivating Magic Line: {e}")
     
-    def _get_current_time(self):
+    @contextmanager
+    def _connection(self, conn=None):
+        """
+        Yield the caller's connection, or a pooled one for this call
+        
+        Readers take an optional conn so callers looping over symbols
+        can check out one connection instead of one per call.
+        """
+        if conn is None:
+            with self.engine.connect() as own:
+                yield own
+        else:
+            yield conn
+    
+    def invalidate(self, symbol: Optional[str] = None):
+        """Forget the cached Magic Line of a symbol (or of all symbols)"""
+        if symbol is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(symbol, None)
+    
+    @staticmethod
+    def _get_current_time():
         """Get current timestamp as string"""
-        from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 # ============================================
@@ -325,8 +492,9 @@ if __name__ == "__main__":
         'SOL/USDT': 205.0
     }
     
+    results = manager.check_prices_vs_magic_lines(test_prices)
     for symbol, price in test_prices.items():
-        result = manager.check_price_vs_magic_line(symbol, price)
+        result = results[symbol]
         if result['status'] != 'NOT_SET':
             print(f"  {symbol}: ${price:.2f}")
             print(f"    Magic Line: ${result['magic_line']:.2f}")
@@ -18,8 +18,11 @@ Signal Classification:
 """
 
 import pandas as pd
+import numpy as np
 from sqlalchemy import text
-from typing import Dict, Tuple, Optional
+from psycopg2.extras import execute_values
+from typing import Dict, List, Tuple, Optional
+import re
 import sys
 import os
 
@@ -28,6 +31,62 @@ from database import engine
 from calculations.support_resistance import SupportResistanceCalculator
 from calculations.magic_line import MagicLineManager
 
+# Upsert of one signal row on candle_id
+UPSERT_SIGNAL_SQL = """
+    INSERT INTO signals (
+        candle_id, symbol, timeframe, datetime,
+        tf_type, max_score, score_total,
+        score_rsi, score_macd, score_bb, score_ema_stack, score_supertrend,
+        score_vwap, score_volume, score_adx, score_di, score_obv,
+        score_price_action_bonus,
+        signal, entry_price, stop_loss, target_price,
+        current_price, support_level, resistance_level, magic_line_level
+    ) VALUES (
+        :candle_id, :symbol, :timeframe, :datetime,
+        :tf_type, :max_score, :score_total,
+        :score_rsi, :score_macd, :score_bb, :score_ema_stack, :score_supertrend,
+        :score_vwap, :score_volume, :score_adx, :score_di, :score_obv,
+        :score_price_action_bonus,
+        :signal, :entry_price, :stop_loss, :target_price,
+        :current_price, :support_level, :resistance_level, :magic_line_level
+    )
+    ON CONFLICT (candle_id) 
+    DO UPDATE SET
+        symbol = EXCLUDED.symbol,
+        timeframe = EXCLUDED.timeframe,
+        datetime = EXCLUDED.datetime,
+        tf_type = EXCLUDED.tf_type,
+        max_score = EXCLUDED.max_score,
+        score_total = EXCLUDED.score_total,
+        score_rsi = EXCLUDED.score_rsi,
+        score_macd = EXCLUDED.score_macd,
+        score_bb = EXCLUDED.score_bb,
+        score_ema_stack = EXCLUDED.score_ema_stack,
+        score_supertrend = EXCLUDED.score_supertrend,
+        score_vwap = EXCLUDED.score_vwap,
+        score_volume = EXCLUDED.score_volume,
+        score_adx = EXCLUDED.score_adx,
+        score_di = EXCLUDED.score_di,
+        score_obv = EXCLUDED.score_obv,
+        score_price_action_bonus = EXCLUDED.score_price_action_bonus,
+        signal = EXCLUDED.signal,
+        entry_price = EXCLUDED.entry_price,
+        stop_loss = EXCLUDED.stop_loss,
+        target_price = EXCLUDED.target_price,
+        current_price = EXCLUDED.current_price,
+        support_level = EXCLUDED.support_level,
+        resistance_level = EXCLUDED.resistance_level,
+        magic_line_level = EXCLUDED.magic_line_level
+"""
+
+# Multi-row form for execute_values: one VALUES list per page of rows
+UPSERT_SIGNAL_VALUES_SQL = re.sub(
+    r'VALUES \(.*?\)\s*ON CONFLICT', 'VALUES %s\n    ON CONFLICT', UPSERT_SIGNAL_SQL, flags=re.S
+)
+UPSERT_SIGNAL_VALUES_TEMPLATE = '({})'.format(
+    ', '.join(f'%({name})s' for name in dict.fromkeys(re.findall(r':(\w+)', UPSERT_SIGNAL_SQL)))
+)
+
 class SignalGenerator:
     """
     Generate trading signals using complete scoring system
@@ -199,6 +258,7 @@ class SignalGenerator:
         except Exception as e:
             print(f"  ✗ Error fetching indicators for {symbol} {timeframe}: {e}")
             return None
+    
     def fetch_indicator_data_by_id(self, candle_id: int) -> Optional[pd.Series]:
         """
         Fetch indicator data for a specific candle ID
@@ -275,6 +335,77 @@ class SignalGenerator:
         except Exception as e:
             print(f"  ✗ Error fetching indicators for candle_id {candle_id}: {e}")
             return None
+    
+    def fetch_indicator_data_batch(self, candle_ids: List[int]) -> pd.DataFrame:
+        """
+        Fetch indicator data for many candles in one query
+        
+        Args:
+            candle_ids: Candle IDs to fetch
+        
+        Returns:
+            DataFrame with one row per candle (numeric columns as float),
+            oldest first, or an empty DataFrame if none were found
+        """
+        if not candle_ids:
+            return pd.DataFrame()
+        
+        try:
+            with self.engine.connect() as conn:
+                query = text("""
+                    SELECT 
+                        c.id as candle_id,
+                        c.symbol,
+                        c.timeframe,
+                        c.datetime,
+                        c.close as current_price,
+                        c.volume as current_volume,
+                        i.id as indicator_id,
+                        i.rsi,
+                        i.rsi_ema,
+                        i.macd_line,
+                        i.macd_signal,
+                        i.macd_histogram,
+                        i.ema_44,
+                        i.ema_100,
+                        i.ema_200,
+                        i.bb_basis,
+                        i.bb_upper_1,
+                        i.bb_lower_1,
+                        i.bb_upper_2,
+                        i.bb_lower_2,
+                        i.bb_position,
+                        i.bb_squeeze,
+                        i.adx,
+                        i.di_plus,
+                        i.di_minus,
+                        i.atr,
+                        i.obv,
+                        i.obv_ma,
+                        i.vwap,
+                        i.volume_avg,
+                        i.volume_signal,
+                        i.supertrend_1,
+                        i.supertrend_1_direction,
+                        i.supertrend_2,
+                        i.supertrend_2_direction
+                    FROM candles c
+                    LEFT JOIN indicators i ON c.id = i.candle_id
+                    WHERE c.id = ANY(:candle_ids)
+                    ORDER BY c.datetime ASC
+                """)
+                
+                # coerce_float turns NUMERIC (Decimal) columns into float64
+                return pd.read_sql(
+                    query, conn,
+                    params={'candle_ids': [int(candle_id) for candle_id in candle_ids]},
+                    coerce_float=True
+                )
+        
+        except Exception as e:
+            print(f"  ✗ Error fetching indicators for {len(candle_ids)} candles: {e}")
+            return pd.DataFrame()
+    
     def calculate_score_components(self, data: pd.Series, tf_type: str) -> Dict[str, float]:
         """
         Calculate individual score components
@@ -419,6 +550,83 @@ class SignalGenerator:
                 scores['obv'] = 1.0
         
         return scores
+    
+    def calculate_score_components_batch(self, data: pd.DataFrame, tf_type: str) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_score_components() over many candles
+        
+        Same rules as the per-candle version, applied as array comparisons
+        (missing values compare False and score 0).
+        
+        Returns:
+            Dictionary with one score array per component
+        """
+        intraday = tf_type == 'Intraday'
+        
+        def column(name: str) -> np.ndarray:
+            return pd.to_numeric(data[name], errors='coerce').to_numpy(dtype=np.float64)
+        
+        price = column('current_price')
+        rsi = column('rsi')
+        histogram = column('macd_histogram')
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = {
+                'rsi': np.select(
+                    [rsi <= 30, rsi <= 40, rsi <= 50, rsi <= 60],
+                    [4.5, 3.0, 2.0, 1.0], 0.0
+                ),
+                'macd': np.where(
+                    histogram > 0, np.where(column('macd_line') > 0, 5.0, 3.5), 0.0
+                ),
+                'bb': np.select(
+                    [data['bb_position'] == 'BB3↓', data['bb_position'] == 'BB2↓',
+                     data['bb_position'] == 'BB1↓'],
+                    [6.0, 4.0, 2.0], 0.0
+                ),
+            }
+            
+            # EMA Stack Score
+            ema_44_up = column('ema_44') < price
+            ema_100_up = column('ema_100') < price
+            ema_200_up = column('ema_200') < price
+            
+            if intraday:
+                scores['ema_stack'] = 2.5 * ema_44_up + 2.0 * ema_100_up + 1.5 * ema_200_up
+            else:
+                scores['ema_stack'] = 5.0 * ema_200_up + 3.0 * ema_100_up + 1.0 * ema_44_up
+            
+            # SuperTrend Score (price above each SuperTrend line)
+            st1_up = price > column('supertrend_1')
+            st2_up = price > column('supertrend_2')
+            
+            if intraday:
+                scores['supertrend'] = 2.5 * st1_up + 2.5 * st2_up
+            else:
+                scores['supertrend'] = 4.0 * st2_up + 1.0 * st1_up
+            
+            # VWAP Score (price more than 0.5% above VWAP)
+            vwap = column('vwap')
+            scores['vwap'] = np.where((price - vwap) / vwap > 0.005, 2.0, 0.0)
+            
+            # Volume Score (low volume penalty only intraday)
+            volume_signal = data['volume_signal']
+            scores['volume'] = np.select(
+                [volume_signal == 'H', (volume_signal == 'L') & intraday],
+                [2.0, -1.5], 0.0
+            )
+            
+            scores['adx'] = np.where(column('adx') > 25, 1.5, 0.0)
+            scores['di'] = np.where(column('di_plus') > column('di_minus'), 1.0, 0.0)
+            scores['obv'] = np.where(column('obv') > column('obv_ma'), 1.0, 0.0)
+        
+        # Same key order as calculate_score_components()
+        return {
+            key: scores[key]
+            for key in ('rsi', 'macd', 'bb', 'ema_stack', 'supertrend',
+                        'vwap', 'volume', 'adx', 'di', 'obv')
+        }
+    
     def calculate_price_action_bonus(self, current_price: float, 
                                      support: float, resistance: float, 
                                      magic_line: Optional[float]) -> float:
@@ -620,58 +828,152 @@ class SignalGenerator:
             traceback.print_exc()
             return None
     
+    def generate_signals_batch(self, symbol: str, timeframe: str,
+                               candle_ids: List[int]) -> List[Dict]:
+        """
+        Generate signals for many candles of one symbol/timeframe
+        
+        Loads all indicator rows in one query, reads S/R and Magic Line
+        once, and scores every candle in one vectorized pass.
+        
+        Args:
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            candle_ids: Candle IDs to generate signals for
+        
+        Returns:
+            List of signal dicts (same shape as generate_signal()), oldest
+            first; candles missing RSI/MACD are skipped
+        """
+        try:
+            data = self.fetch_indicator_data_batch(candle_ids)
+            
+            if data.empty:
+                print(f"  ⚠️  No indicator data for {symbol} {timeframe}")
+                return []
+            
+            # Check if we have minimum required indicators
+            complete = data['rsi'].notna() & data['macd_histogram'].notna()
+            if not complete.all():
+                print(f"  ⚠️  Missing required indicators (RSI/MACD) for "
+                      f"{int((~complete).sum())} candles of {symbol} {timeframe}")
+                data = data[complete].reset_index(drop=True)
+            
+            if data.empty:
+                return []
+            
+            # Classify timeframe
+            tf_type, max_score = self.classify_timeframe(timeframe)
+            
+            # Get S/R levels and Magic Line (per symbol/timeframe, not per candle)
+            auto_sr_mode = self.settings.get('auto_sr_mode', 'Enabled')
+            sr = self.sr_calc.get_effective_sr(symbol, timeframe, auto_sr_mode)
+            magic_line = self.ml_manager.get_magic_line(symbol)
+            
+            # Calculate score components
+            scores = self.calculate_score_components_batch(data, tf_type)
+            
+            # Calculate price action bonus (same precedence as the scalar version)
+            price = data['current_price'].to_numpy(dtype=np.float64)
+            support, resistance = sr['support'], sr['resistance']
+            max_bonus = self.settings.get('price_action_bonus_points', 2.0)
+            
+            price_bonus = np.select(
+                [
+                    np.full(len(price), resistance > 0) & (price >= resistance * 1.005),
+                    np.full(len(price), support > 0) & (price >= support) & (price <= support * 1.02),
+                    np.full(len(price), bool(magic_line and magic_line > 0))
+                    & (price > (magic_line or 0)) & (price <= (magic_line or 0) * 1.02),
+                ],
+                [max_bonus, max_bonus * 0.8, max_bonus * 0.9], 0.0
+            )
+            
+            # Calculate total score (capped at max score)
+            total_score = np.minimum(sum(scores.values()) + price_bonus, max_score)
+            
+            # Classify signal
+            if tf_type == 'Intraday':
+                prefix = 'intraday'
+                defaults = (29.0, 23.0, 18.0, 13.0, 9.0)
+            else:
+                prefix = 'swing'
+                defaults = (33.0, 26.0, 21.0, 15.0, 10.0)
+            
+            aggressive_buy, buy, early_buy, watch, caution = (
+                self.settings.get(f'{prefix}_{name}_threshold', default)
+                for name, default in zip(
+                    ('aggressive_buy', 'buy', 'early_buy', 'watch', 'caution'), defaults
+                )
+            )
+            
+            rsi_safe = data['rsi'].fillna(50).to_numpy(dtype=np.float64) >= 30
+            signals = np.select(
+                [
+                    (total_score >= aggressive_buy) & rsi_safe,
+                    (total_score >= buy) & rsi_safe,
+                    total_score >= early_buy,
+                    total_score >= watch,
+                    total_score >= caution,
+                ],
+                ['A-BUY', 'BUY', 'EARLY-BUY', 'WATCH', 'CAUTION'], 'SELL'
+            )
+            
+            # Calculate entry/stop/target for buy signals
+            atr = pd.to_numeric(data['atr'], errors='coerce').to_numpy(dtype=np.float64)
+            atr_mult = 1.2 if tf_type == 'Intraday' else 2.0
+            target_mult = 2.0 if tf_type == 'Intraday' else 4.0
+            is_entry = np.isin(signals, ['A-BUY', 'BUY', 'EARLY-BUY'])
+            stop_loss = price - atr * atr_mult
+            target_price = price + atr * target_mult
+            
+            # Build results
+            results = []
+            for i, row in enumerate(data[['candle_id', 'datetime']].itertuples(index=False)):
+                entry = bool(is_entry[i])
+                results.append({
+                    'candle_id': int(row.candle_id),
+                    'symbol': symbol,
+                    'timeframe': timeframe,
+                    'datetime': row.datetime,
+                    'tf_type': tf_type,
+                    'max_score': max_score,
+                    'score_total': float(total_score[i]),
+                    'score_rsi': float(scores['rsi'][i]),
+                    'score_macd': float(scores['macd'][i]),
+                    'score_bb': float(scores['bb'][i]),
+                    'score_ema_stack': float(scores['ema_stack'][i]),
+                    'score_supertrend': float(scores['supertrend'][i]),
+                    'score_vwap': float(scores['vwap'][i]),
+                    'score_volume': float(scores['volume'][i]),
+                    'score_adx': float(scores['adx'][i]),
+                    'score_di': float(scores['di'][i]),
+                    'score_obv': float(scores['obv'][i]),
+                    'score_price_action_bonus': float(price_bonus[i]),
+                    'signal': str(signals[i]),
+                    'entry_price': float(price[i]) if entry else None,
+                    'stop_loss': float(stop_loss[i]) if entry else None,
+                    'target_price': float(target_price[i]) if entry else None,
+                    'current_price': float(price[i]),
+                    'support_level': support,
+                    'resistance_level': resistance,
+                    'magic_line_level': magic_line if magic_line else 0.0
+                })
+            
+            return results
+        
+        except Exception as e:
+            print(f"  ✗ Error generating signals for {symbol} {timeframe}: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+    
     def store_signal(self, signal_data: Dict):
         """
         Store signal in database
         """
         try:
             with self.engine.connect() as conn:
-                query = text("""
-                    INSERT INTO signals (
-                        candle_id, symbol, timeframe, datetime,
-                        tf_type, max_score, score_total,
-                        score_rsi, score_macd, score_bb, score_ema_stack, score_supertrend,
-                        score_vwap, score_volume, score_adx, score_di, score_obv,
-                        score_price_action_bonus,
-                        signal, entry_price, stop_loss, target_price,
-                        current_price, support_level, resistance_level, magic_line_level
-                    ) VALUES (
-                        :candle_id, :symbol, :timeframe, :datetime,
-                        :tf_type, :max_score, :score_total,
-                        :score_rsi, :score_macd, :score_bb, :score_ema_stack, :score_supertrend,
-                        :score_vwap, :score_volume, :score_adx, :score_di, :score_obv,
-                        :score_price_action_bonus,
-                        :signal, :entry_price, :stop_loss, :target_price,
-                        :current_price, :support_level, :resistance_level, :magic_line_level
-                    )
-                    ON CONFLICT (candle_id) 
-                    DO UPDATE SET
-                        symbol = EXCLUDED.symbol,
-                        timeframe = EXCLUDED.timeframe,
-                        datetime = EXCLUDED.datetime,
-                        tf_type = EXCLUDED.tf_type,
-                        max_score = EXCLUDED.max_score,
-                        score_total = EXCLUDED.score_total,
-                        score_rsi = EXCLUDED.score_rsi,
-                        score_macd = EXCLUDED.score_macd,
-                        score_bb = EXCLUDED.score_bb,
-                        score_ema_stack = EXCLUDED.score_ema_stack,
-                        score_supertrend = EXCLUDED.score_supertrend,
-                        score_vwap = EXCLUDED.score_vwap,
-                        score_volume = EXCLUDED.score_volume,
-                        score_adx = EXCLUDED.score_adx,
-                        score_di = EXCLUDED.score_di,
-                        score_obv = EXCLUDED.score_obv,
-                        score_price_action_bonus = EXCLUDED.score_price_action_bonus,
-                        signal = EXCLUDED.signal,
-                        entry_price = EXCLUDED.entry_price,
-                        stop_loss = EXCLUDED.stop_loss,
-                        target_price = EXCLUDED.target_price,
-                        current_price = EXCLUDED.current_price,
-                        support_level = EXCLUDED.support_level,
-                        resistance_level = EXCLUDED.resistance_level,
-                        magic_line_level = EXCLUDED.magic_line_level
-                """)
+                query = text(UPSERT_SIGNAL_SQL)
                 
                 conn.execute(query, signal_data)
                 conn.commit()
@@ -681,6 +983,38 @@ class SignalGenerator:
             import traceback
             traceback.print_exc()
     
+    def store_signals_bulk(self, signals: List[Dict], batch_size: int = 1000) -> int:
+        """
+        Store many signals in one transaction
+        
+        Each batch is sent as one multi-row upsert (execute_values).
+        
+        Args:
+            signals: Signal dicts from generate_signals_batch()
+            batch_size: Number of rows per INSERT statement
+        
+        Returns:
+            Number of signals stored (0 if the transaction failed)
+        """
+        if not signals:
+            return 0
+        
+        try:
+            with self.engine.begin() as conn:
+                with conn.connection.dbapi_connection.cursor() as cursor:
+                    execute_values(
+                        cursor, UPSERT_SIGNAL_VALUES_SQL, signals,
+                        template=UPSERT_SIGNAL_VALUES_TEMPLATE, page_size=batch_size
+                    )
+            
+            return len(signals)
+        
+        except Exception as e:
+            print(f"  ✗ Error bulk storing signals: {e}")
+            import traceback
+            traceback.print_exc()
+            return 0
+    
     def generate_signals_for_symbols(self, symbols: list, timeframes: list):
         """
         Generate signals for multiple symbols and timeframes
@@ -3,7 +3,8 @@ Database Connection Module
 Handles PostgreSQL connections using SQLAlchemy
 """
 
-from sqlalchemy import create_engine, text
+import psycopg2.extensions
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -30,9 +31,28 @@ engine = create_engine(
     pool_size=10,           # Connection pool size
     max_overflow=20,        # Extra connections if needed
     pool_pre_ping=True,     # Test connection before using
+    pool_recycle=1800,      # Replace connections older than 30 minutes
     echo=False              # Set True to see SQL queries in console
 )
 
+# Return NUMERIC/DECIMAL columns as float instead of Decimal, so rows
+# need no per-value conversion loop. Opt-in: only statements run with the
+# decimal_as_float execution option, e.g. through
+# engine.execution_options(decimal_as_float=True); everything else
+# (API routes included) still gets Decimals.
+DECIMAL_AS_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    'DECIMAL_AS_FLOAT',
+    lambda value, cursor: float(value) if value is not None else None
+)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _register_decimal_as_float(conn, cursor, statement, parameters, context, executemany):
+    """Register DECIMAL_AS_FLOAT on the cursor of decimal_as_float statements"""
+    if context is not None and context.execution_options.get('decimal_as_float'):
+        psycopg2.extensions.register_type(DECIMAL_AS_FLOAT, cursor)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
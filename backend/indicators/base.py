@@ -6,7 +6,7 @@ All indicator calculators inherit from this
 import pandas as pd
 import numpy as np
 from sqlalchemy import text
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import sys
 import os
 
@@ -34,7 +34,8 @@ class BaseCalculator:
         self.indicator_name = indicator_name
         self.engine = engine
     
-    def fetch_candles(self, symbol: str, timeframe: str, limit: int = 500) -> pd.DataFrame:
+    def fetch_candles(self, symbol: str, timeframe: str, limit: int = 500,
+                      latest: bool = False) -> pd.DataFrame:
         """
         Fetch candles from database for calculation
         Also fetches existing indicator values (like ATR for SuperTrend)
@@ -43,6 +44,8 @@ class BaseCalculator:
             symbol: Trading pair (e.g., 'BTC/USDT')
             timeframe: Candle timeframe (e.g., '1h')
             limit: Number of candles to fetch
+            latest: Fetch the most recent `limit` candles instead of the
+                oldest (rows are still returned oldest first)
         
         Returns:
             DataFrame with OHLCV data and existing indicator values
@@ -52,7 +55,8 @@ class BaseCalculator:
                 # Fetch candles WITH existing indicator values (LEFT JOIN)
                 # This allows SuperTrend to access ATR, and other indicators
                 # to build on previous calculations
-                query = text("""
+                order = 'DESC' if latest else 'ASC'
+                query = text(f"""
                     SELECT 
                         c.id,
                         c.symbol,
@@ -96,7 +100,7 @@ class BaseCalculator:
                     LEFT JOIN indicators i ON c.id = i.candle_id
                     WHERE c.symbol = :symbol 
                       AND c.timeframe = :timeframe
-                    ORDER BY c.datetime ASC
+                    ORDER BY c.datetime {order}
                     LIMIT :limit
                 """)
                 
@@ -112,6 +116,9 @@ class BaseCalculator:
                     print(f"  ⚠️  No candles found for {symbol} {timeframe}")
                     return df
                 
+                if latest:
+                    df = df.iloc[::-1].reset_index(drop=True)
+                
                 return df
                 
         except Exception as e:
@@ -218,7 +225,8 @@ class BaseCalculator:
             traceback.print_exc()
             return 0
     
-    def run(self, symbol: str, timeframe: str, limit: int = 500) -> int:
+    def run(self, symbol: str, timeframe: str, limit: int = 500,
+            latest: bool = False, store_last: Optional[int] = None) -> int:
         """
         Complete workflow: fetch → calculate → store
         
@@ -226,6 +234,9 @@ class BaseCalculator:
             symbol: Trading pair
             timeframe: Candle timeframe
             limit: Number of candles
+            latest: Use the most recent `limit` candles (see fetch_candles)
+            store_last: Only store the last N calculated rows; the earlier
+                rows just warm the indicators up (incremental updates)
         
         Returns:
             Number of indicators stored
@@ -233,7 +244,7 @@ class BaseCalculator:
         print(f"\n🔧 Calculating {self.indicator_name} for {symbol} {timeframe}...")
         
         # Fetch candles
-        df = self.fetch_candles(symbol, timeframe, limit)
+        df = self.fetch_candles(symbol, timeframe, limit, latest=latest)
         
         if df.empty:
             print(f"✗ No candles found for {symbol} {timeframe}")
@@ -250,6 +261,9 @@ class BaseCalculator:
         
         print(f"  ✓ Calculated {self.indicator_name}")
         
+        if store_last is not None:
+            df = df.tail(store_last)
+        
         # Store in database
         indicator_cols = self.get_indicator_columns()
         stored = self.store_indicators(df, indicator_cols)
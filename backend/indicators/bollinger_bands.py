@@ -236,14 +236,22 @@ class BollingerBandsCalculator(BaseCalculator):
         
         # Step 6: Determine BB Position for each candle
         # This tells us which zone price is in (7 possible zones)
-        df['bb_position'] = df.apply(
-            lambda row: self.get_bb_position(
-                row['close'],
-                row['bb_upper_1'], row['bb_upper_2'], row['bb_upper_3'],
-                row['bb_lower_1'], row['bb_lower_2'], row['bb_lower_3']
-            ) if pd.notna(row['bb_basis']) else None,
-            axis=1
-        )
+        # (vectorized form of get_bb_position, checked from extreme to neutral)
+        close = df['close']
+        bb_position = np.select(
+            [
+                close < df['bb_lower_3'],
+                close < df['bb_lower_2'],
+                close < df['bb_lower_1'],
+                close <= df['bb_upper_1'],
+                close <= df['bb_upper_2'],
+                close <= df['bb_upper_3']
+            ],
+            ['BB3↓', 'BB2↓', 'BB1↓', 'BB~', 'BB1↑', 'BB2↑'],
+            default='BB3↑'
+        ).astype(object)
+        bb_position[df['bb_basis'].isna().to_numpy()] = None
+        df['bb_position'] = bb_position
         
         # Step 7: Round values to appropriate precision
         # BB bands: 8 decimals (price precision)
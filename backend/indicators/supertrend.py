@@ -47,12 +47,85 @@ import numpy as np
 import sys
 import os
 
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the kernel runs as plain Python over NumPy arrays
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from indicators.base import BaseCalculator
 
 
+@njit(cache=True, nogil=True)
+def _supertrend_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       atr: np.ndarray, factor: float) -> np.ndarray:
+    """
+    Compiled band-smoothing and direction loop of calculate_supertrend()
+    
+    Runs both passes in one loop over float64 arrays, carrying the previous
+    final bands and direction in locals. Compiled without the GIL, so
+    SuperTrends for different pairs can also run on threads.
+    """
+    n = len(close)
+    supertrend = np.empty(n)
+    if n == 0:
+        return supertrend
+    
+    hl2 = (high[0] + low[0]) / 2.0
+    final_upper = hl2 + factor * atr[0]
+    final_lower = hl2 - factor * atr[0]
+    direction = 1
+    supertrend[0] = final_lower
+    
+    for i in range(1, n):
+        hl2 = (high[i] + low[i]) / 2.0
+        basic_upper = hl2 + factor * atr[i]
+        basic_lower = hl2 - factor * atr[i]
+        
+        # Upper band: Can only decrease or stay same (resistance)
+        if basic_upper < final_upper or close[i - 1] > final_upper:
+            new_upper = basic_upper
+        else:
+            new_upper = final_upper
+        
+        # Lower band: Can only increase or stay same (support)
+        if basic_lower > final_lower or close[i - 1] < final_lower:
+            new_lower = basic_lower
+        else:
+            new_lower = final_lower
+        
+        final_upper = new_upper
+        final_lower = new_lower
+        
+        # Flip on a close through the active band
+        if direction == 1:
+            if close[i] <= final_lower:
+                direction = -1
+        elif close[i] >= final_upper:
+            direction = 1
+        
+        supertrend[i] = final_lower if direction == 1 else final_upper
+    
+    return supertrend
+
+
+def warm_up_kernel():
+    """
+    Run _supertrend_kernel once on a tiny input
+    
+    Loads (or compiles) the numba kernel up front, e.g. in a pool worker's
+    initializer, so the first real calculation doesn't pay for it.
+    """
+    sample = np.ones(2)
+    _supertrend_kernel(sample, sample, sample, sample, 1.0)
+
+
 class SuperTrendCalculator(BaseCalculator):
     """
     SuperTrend Calculator - Exactly matches your TradingView Pine Script
@@ -146,57 +219,17 @@ class SuperTrendCalculator(BaseCalculator):
         # (first 13 candles have no ATR due to 14-period calculation)
         atr = atr.fillna(0)
         
-        # Step 1: Calculate HL2 (center line)
-        hl2 = (high + low) / 2.0
-        
-        # Step 2: Calculate basic upper and lower bands
-        basic_upper = hl2 + (factor * atr)
-        basic_lower = hl2 - (factor * atr)
-        
-        # Step 3: Apply smoothing rules (bands can only move in favorable direction)
-        final_upper = pd.Series(0.0, index=df.index)
-        final_lower = pd.Series(0.0, index=df.index)
-        supertrend = pd.Series(0.0, index=df.index)
-        direction = pd.Series(1, index=df.index)  # 1 = uptrend, -1 = downtrend
-        
-        for i in range(len(df)):
-            if i == 0:
-                final_upper.iloc[i] = basic_upper.iloc[i]
-                final_lower.iloc[i] = basic_lower.iloc[i]
-            else:
-                # Upper band: Can only decrease or stay same (resistance)
-                final_upper.iloc[i] = basic_upper.iloc[i] if (basic_upper.iloc[i] < final_upper.iloc[i-1]) or (close.iloc[i-1] > final_upper.iloc[i-1]) else final_upper.iloc[i-1]
-                
-                # Lower band: Can only increase or stay same (support)
-                final_lower.iloc[i] = basic_lower.iloc[i] if (basic_lower.iloc[i] > final_lower.iloc[i-1]) or (close.iloc[i-1] < final_lower.iloc[i-1]) else final_lower.iloc[i-1]
-        
-        # Step 4: Determine trend direction and SuperTrend value
-        for i in range(len(df)):
-            if i == 0:
-                direction.iloc[i] = 1
-                supertrend.iloc[i] = final_lower.iloc[i]
-            else:
-                # Determine direction based on previous direction and price position
-                if direction.iloc[i-1] == 1:
-                    # Was in uptrend
-                    if close.iloc[i] <= final_lower.iloc[i]:
-                        direction.iloc[i] = -1  # Flip to downtrend
-                    else:
-                        direction.iloc[i] = 1  # Stay in uptrend
-                else:
-                    # Was in downtrend
-                    if close.iloc[i] >= final_upper.iloc[i]:
-                        direction.iloc[i] = 1  # Flip to uptrend
-                    else:
-                        direction.iloc[i] = -1  # Stay in downtrend
-                
-                # Set SuperTrend value based on direction
-                if direction.iloc[i] == 1:
-                    supertrend.iloc[i] = final_lower.iloc[i]  # Support in uptrend
-                else:
-                    supertrend.iloc[i] = final_upper.iloc[i]  # Resistance in downtrend
+        # Steps 1-4 (HL2, basic bands, band smoothing, direction) run in
+        # a compiled loop over plain float64 arrays
+        values = _supertrend_kernel(
+            high.to_numpy(dtype=np.float64),
+            low.to_numpy(dtype=np.float64),
+            close.to_numpy(dtype=np.float64),
+            atr.to_numpy(dtype=np.float64),
+            float(factor)
+        )
         
-        return supertrend
+        return pd.Series(values, index=df.index)
     
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         """
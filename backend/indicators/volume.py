@@ -201,10 +201,12 @@ class VolumeAnalyzer(BaseCalculator):
         # Step 2: Classify each candle's volume
         # Compare current volume to average
         # Assign H/N/L based on ratio
-        df['volume_signal'] = df.apply(
-            lambda row: self.classify_volume(row['volume'], row['volume_avg'])
-            if pd.notna(row['volume_avg']) else 'N',
-            axis=1
+        # (vectorized form of classify_volume: missing/zero average -> N)
+        ratio = df['volume'] / df['volume_avg'].where(df['volume_avg'] != 0)
+        df['volume_signal'] = np.select(
+            [ratio > self.high_threshold, ratio < self.low_threshold],
+            ['H', 'L'],
+            default='N'
         )
         
         # Step 3: Round volume average to 2 decimal places
@@ -12,6 +12,7 @@ This script:
 
 import sys
 import os
+import logging
 from sqlalchemy import text
 from datetime import datetime
 
@@ -77,6 +78,7 @@ class EntryTrackingUpdater:
             return
         
         updated_count = 0
+        updates = []
         
         for entry in entries:
             entry_id = entry['id']
@@ -97,12 +99,15 @@ class EntryTrackingUpdater:
             
             print(f"  Processing {len(candles)} candles...")
             
-            # Update with each candle
+            # Queue an update for each candle
             for candle_datetime, close_price in candles:
-                self.tracker.update_entry_price(entry_id, close_price, candle_datetime)
+                updates.append((entry, close_price, candle_datetime))
             
             updated_count += 1
         
+        # Entries sharing a candle datetime share one exit-signal lookup
+        self.tracker.update_entries(updates)
+        
         print("\n" + "=" * 80)
         print(f"✅ UPDATED {updated_count} ENTRIES")
         print("=" * 80)
@@ -193,6 +198,9 @@ class EntryTrackingUpdater:
 # ============================================
 
 if __name__ == "__main__":
+    # Entry stage events are logged at INFO
+    logging.basicConfig(level=logging.INFO, format='    %(message)s')
+    
     updater = EntryTrackingUpdater()
     
     # Update all entries
@@ -0,0 +1,16 @@
+-- ============================================
+-- ADD COVERING CANDLE WINDOW INDEX
+-- ============================================
+
+-- Indicator windows are read by (symbol, timeframe) over a datetime range,
+-- with the warm-up boundary found by a backward scan + LIMIT. INCLUDE-ing
+-- the OHLCV columns lets both run as index-only scans (PostgreSQL 11+).
+CREATE INDEX IF NOT EXISTS idx_candles_sym_tf_dt 
+ON candles(symbol, timeframe, datetime DESC) 
+INCLUDE (id, open, high, low, close, volume);
+
+-- Superseded by the covering index above
+DROP INDEX IF EXISTS idx_candles_symbol_tf_datetime;
+
+-- Success message
+SELECT 'Covering candle index added successfully!' AS status;
\ No newline at end of file
@@ -0,0 +1,15 @@
+-- ============================================
+-- ADD CANDLE LOOKUP INDEXES
+-- ============================================
+
+-- Candles are queried by (symbol, timeframe) ordered by datetime when
+-- finding candles without indicators and loading indicator history
+CREATE INDEX IF NOT EXISTS idx_candles_symbol_tf_datetime 
+ON candles(symbol, timeframe, datetime);
+
+-- Anti-join from candles to indicators
+CREATE INDEX IF NOT EXISTS idx_indicators_candle 
+ON indicators(candle_id);
+
+-- Success message
+SELECT 'Candle indexes added successfully!' AS status;
\ No newline at end of file
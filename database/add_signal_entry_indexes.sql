@@ -0,0 +1,30 @@
+-- ============================================
+-- ADD SIGNAL LOOKUP + ACTIVE ENTRY INDEXES
+-- ============================================
+
+-- Entry updates look up the latest signal per (symbol, timeframe) at or
+-- before a datetime (ORDER BY datetime DESC LIMIT 1 / DISTINCT ON).
+-- INCLUDE-ing the signal lets that run as an index-only scan.
+-- CONCURRENTLY keeps signal inserts running while it builds (run outside
+-- a transaction block).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_signals_sym_tf_dt
+ON signals(symbol, timeframe, datetime DESC)
+INCLUDE (signal);
+
+-- Superseded by the covering index above
+DROP INDEX IF EXISTS idx_signals_symbol_tf_datetime;
+
+-- Only active entries are tracked; a partial index keeps exited ones out
+-- of the active-entry scans (filtered by symbol/timeframe, newest first)
+CREATE INDEX IF NOT EXISTS idx_entry_tracking_active_sym_tf_dt
+ON entry_tracking(symbol, timeframe, entry_datetime DESC)
+WHERE active = true;
+
+-- Superseded by the partial index above
+DROP INDEX IF EXISTS idx_entry_tracking_active;
+
+-- Check with: EXPLAIN (ANALYZE, BUFFERS) on the latest-signal query
+-- (expect "Index Only Scan using idx_signals_sym_tf_dt", no Sort)
+
+-- Success message
+SELECT 'Signal and entry tracking indexes added successfully!' AS status;
@@ -0,0 +1,16 @@
+-- ============================================
+-- STORE OSCILLATOR INDICATORS AS REAL
+-- ============================================
+
+-- RSI, ADX and DI are bounded 0-100 and stored with 4 decimals, which
+-- single precision (float4) already covers. Price-scaled indicators
+-- (EMA, MACD, BB, ATR, SuperTrend, VWAP) keep their DECIMAL types.
+ALTER TABLE indicators 
+ALTER COLUMN rsi TYPE REAL,
+ALTER COLUMN rsi_ema TYPE REAL,
+ALTER COLUMN adx TYPE REAL,
+ALTER COLUMN di_plus TYPE REAL,
+ALTER COLUMN di_minus TYPE REAL;
+
+-- Success message
+SELECT 'Oscillator columns converted to REAL successfully!' AS status;
\ No newline at end of file